@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Penyimpanan akun dengan derivasi alamat lazy.
+Private key disimpan apa adanya dan alamatnya baru diturunkan saat dibutuhkan. Alamat
+yang sudah diturunkan disimpan di file cache (di-key dengan hash private key, bukan key-nya),
+sehingga file kunci besar tidak perlu diturunkan ulang setiap start. Lookup dompet per
+indeks O(1).
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from eth_account import Account
+
+ADDRESS_CACHE = os.getenv("ADDRESS_CACHE", "address_cache.json")
+
+def _fingerprint(pk):
+    pk = pk.lower()
+    return hashlib.sha256((pk[2:] if pk.startswith("0x") else pk).encode()).hexdigest()
+
+class Wallet:
+    """Dompet ringan (indeks, alamat, private key) sebagai pengganti LocalAccount."""
+    __slots__ = ("index", "address", "key")
+
+    def __init__(self, index, address, key):
+        self.index = index
+        self.address = address
+        self.key = key
+
+    def __repr__(self):
+        # Jangan pernah menampilkan private key di log
+        return f"Wallet({self.index}, {self.address})"
+
+class AccountStore:
+    """Daftar private key dengan alamat yang diturunkan saat dibutuhkan. Aman dipanggil dari banyak thread."""
+
+    def __init__(self, keys, cache_path=ADDRESS_CACHE):
+        self.cache_path = cache_path
+        self._keys = list(keys)
+        self._lock = threading.Lock()
+        self._addresses = [None] * len(self._keys)
+        self._dirty = False
+        self._cache = self._load_cache()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def _load_cache(self):
+        if not self.cache_path:
+            return {}
+        try:
+            with open(self.cache_path, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def save(self):
+        """Simpan alamat yang baru diturunkan ke file cache."""
+        with self._lock:
+            if not self._dirty or not self.cache_path:
+                return
+            data, self._dirty = dict(self._cache), False
+        # Nama temp unik: beberapa proses (gte.py, auto_swap_liquidity.py) bisa berbagi file cache yang sama
+        with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(os.path.abspath(self.cache_path)), suffix=".tmp", delete=False) as f:
+            json.dump(data, f)
+        os.replace(f.name, self.cache_path)
+
+    def address(self, index):
+        """Alamat dompet ke-`index`, diturunkan dari private key hanya jika belum ada di cache."""
+        address = self._addresses[index]
+        if address is not None:
+            return address
+        fingerprint = _fingerprint(self._keys[index])
+        address = self._cache.get(fingerprint)
+        if address is None:
+            address = Account.from_key(self._keys[index]).address
+            with self._lock:
+                self._cache[fingerprint] = address
+                self._dirty = True
+        with self._lock:
+            self._addresses[index] = address
+        return address
+
+    def key(self, index):
+        return self._keys[index]
+
+    def wallet(self, index):
+        return Wallet(index, self.address(index), self._keys[index])
+
+    def select(self, indices):
+        """Dompet untuk indeks yang dipilih saja; dompet lain tidak diturunkan."""
+        wallets = [self.wallet(i) for i in indices]
+        self.save()
+        return wallets
+
+    def all(self):
+        return self.select(range(len(self._keys)))
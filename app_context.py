@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Konteks aplikasi yang diinisialisasi secara lazy.
+Koneksi Web3, kontrak router, alamat WETH, private key dan akun baru dibuat saat
+pertama kali dipakai lalu di-cache, sehingga modul bisa di-import tanpa akses jaringan.
+"""
+
+import threading
+from functools import cached_property
+
+from abis import ROUTER_ABI
+from account_store import AccountStore
+from approval_cache import ApprovalCache
+from receipt_tracker import ReceiptTracker
+from rpc_pool import get_web3, get_contract
+
+class AppContext:
+    """State bersama skrip (w3, router, WETH, akun) yang dibuat saat pertama dibutuhkan."""
+
+    def __init__(self, rpc_urls, chain_id, router_addr, key_loader, proxy=None):
+        self.rpc_urls = rpc_urls
+        self.chain_id = chain_id
+        self.router_addr = router_addr
+        self.key_loader = key_loader
+        self.proxy = proxy
+        self._connected = False
+        self._lock = threading.Lock()
+
+    @cached_property
+    def w3(self):
+        return get_web3(self.rpc_urls, self.proxy)
+
+    @cached_property
+    def receipts(self):
+        # Semua receipt ditunggu lewat satu pelacak yang polling sekali per blok
+        return ReceiptTracker(self.w3)
+
+    @cached_property
+    def approvals(self):
+        # Status approve tak terbatas per (akun, token, spender), persisten antar run
+        return ApprovalCache()
+
+    @cached_property
+    def router(self):
+        return get_contract(self.w3, self.router_addr, ROUTER_ABI)
+
+    @cached_property
+    def weth_addr(self):
+        return self.router.functions.WETH().call()
+
+    @cached_property
+    def wallets(self):
+        # Alamat diturunkan saat dibutuhkan (dengan cache di file), lookup per indeks/alamat O(1)
+        return AccountStore(self.key_loader())
+
+    @property
+    def pk_list(self):
+        return [self.wallets.key(i) for i in range(len(self.wallets))]
+
+    @property
+    def accounts(self):
+        return self.wallets.all()
+
+    def connect(self):
+        """Cek koneksi dan chain ID sekali per proses. Raise ConnectionError jika gagal."""
+        with self._lock:
+            if self._connected:
+                return
+            if not self.w3.is_connected():
+                raise ConnectionError("Koneksi RPC gagal!")
+            chain_id = self.w3.eth.chain_id
+            if chain_id != self.chain_id:
+                raise ConnectionError(f"Chain ID tidak cocok: diharapkan {self.chain_id}, didapat {chain_id}")
+            self._connected = True
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Cache status approve per (akun, token, spender) di SQLite.
+Bot selalu approve `2**256 - 1`, sehingga allowance praktis tidak pernah habis:
+setelah satu kali terbaca cukup, swap dan tambah likuiditas berikutnya tidak perlu
+memanggil `allowance()` lagi. Entri dihapus saat tx yang memakainya revert atau
+saat pembacaan on-chain menunjukkan allowance kurang.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+APPROVAL_DB = os.getenv("APPROVAL_DB", "approvals.db")
+# Allowance di atas batas ini dianggap tak terbatas; allowance terbatas tidak di-cache karena berkurang tiap swap
+UNLIMITED_ALLOWANCE = 2**255
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS approvals (
+    account TEXT NOT NULL,
+    token TEXT NOT NULL,
+    spender TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (account, token, spender)
+);
+"""
+
+def _key(account, token, spender):
+    return account.lower(), token.lower(), spender.lower()
+
+class ApprovalCache:
+    """Set (akun, token, spender) yang sudah approve tak terbatas. Aman dipanggil dari banyak thread."""
+
+    def __init__(self, path=APPROVAL_DB):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._approved = {tuple(row) for row in self._db.execute("SELECT account, token, spender FROM approvals")}
+
+    def is_approved(self, account, token, spender):
+        """True jika allowance tak terbatas sudah tercatat (tanpa panggilan RPC)."""
+        return _key(account, token, spender) in self._approved
+
+    def mark_approved(self, account, token, spender):
+        key = _key(account, token, spender)
+        with self._lock:
+            if key in self._approved:
+                return
+            self._approved.add(key)
+            self._db.execute("INSERT OR REPLACE INTO approvals (account, token, spender, updated_at) VALUES (?, ?, ?, ?)", (*key, time.time()))
+
+    def invalidate(self, account, token, spender):
+        """Lupakan approve; pemakaian berikutnya membaca allowance on-chain lagi."""
+        key = _key(account, token, spender)
+        with self._lock:
+            if key not in self._approved:
+                return
+            self._approved.discard(key)
+            self._db.execute("DELETE FROM approvals WHERE account = ? AND token = ? AND spender = ?", key)
+
+    def record(self, account, token, spender, allowance):
+        """Simpan hasil pembacaan allowance on-chain: tak terbatas dicatat, selain itu dihapus."""
+        if allowance is not None and allowance >= UNLIMITED_ALLOWANCE:
+            self.mark_approved(account, token, spender)
+        else:
+            self.invalidate(account, token, spender)
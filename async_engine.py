@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Engine asyncio berbasis AsyncWeb3 untuk pipeline swap + tambah likuiditas.
+Semua dompet berbagi satu sesi aiohttp, sehingga satu proses bisa menjalankan
+ratusan pipeline dompet sekaligus tanpa satu thread per dompet.
+
+Quote dan rute memakai Quoter/RouteFinder yang sama dengan mode thread. Yang belum didukung:
+semua request lewat satu endpoint RPC (tanpa failover RPC_URLS) dan approve selalu ditunggu
+receipt-nya sebelum swap/tambah likuiditas (PIPELINE_APPROVE diabaikan).
+"""
+
+import asyncio
+import random
+import time
+
+import aiohttp
+from rich.rule import Rule
+from web3 import AsyncWeb3, AsyncHTTPProvider
+
+from abis import ERC20_ABI, ROUTER_ABI
+from checkpoint import STAGE_DONE, STAGE_FAILED, STAGE_SWAPPED
+from fee_oracle import tx_cost
+from journal import JOURNAL, bind, make_console
+from metrics import aiohttp_trace_config, instrument_web3, timed
+from nonce_manager import AsyncNonceManager
+from token_registry import format_units
+
+console = make_console()
+
+def info(msg): console.print(f"[bold cyan][*][/bold cyan] {msg}")
+def success(msg): console.print(f"[bold green][+][/bold green] {msg}")
+def error(msg): console.print(f"[bold red][!][/bold red] {msg}")
+def warning(msg): console.print(f"[bold yellow][-][/bold yellow] {msg}")
+
+class AsyncSwapEngine:
+    """
+    Versi async dari chk_native, ensure_approve, do_swap dan add_liquidity.
+    Gas dan fee diambil dari `fee_oracle` (FeeOracle); `gas_approve`/`gas_swap` hanya batas aman jika estimasi gagal.
+    Jika `checkpoint` diberikan, tx swap/likuiditas dicatat saat broadcast dan receipt-nya saat terkonfirmasi.
+    Jika `approvals` (ApprovalCache) diberikan, allowance yang sudah tak terbatas tidak dibaca ulang.
+    Jika `quoter` (Quoter) dan `routes` (RouteFinder) diberikan, quote dan rute dihitung dari reserve
+    yang di-cache; router.getAmountsOut hanya dipakai sebagai fallback.
+    Jika `receipts` (ReceiptTracker) diberikan, receipt ditunggu lewat polling batch bersama,
+    bukan satu loop wait_for_transaction_receipt per tx.
+    """
+
+    def __init__(self, rpc, chain, router_addr, weth_addr, tokens, fee_oracle, gas_approve, gas_swap, slippage, max_connections=100, checkpoint=None, approvals=None,
+                 quoter=None, routes=None, receipts=None):
+        self.rpc = rpc
+        self.chain = chain
+        self.router_addr = router_addr
+        self.weth_addr = weth_addr
+        self.tokens = tokens
+        self.fees = fee_oracle
+        self.gas_approve = gas_approve
+        self.gas_swap = gas_swap
+        self.slippage = slippage
+        self.max_connections = max_connections
+        self.nonces = AsyncNonceManager()
+        self.checkpoint = checkpoint
+        self.approvals = approvals
+        self.quoter = quoter
+        self.routes = routes
+        self.receipts = receipts
+        self._session = None
+        self._w3_cache = {}
+
+    async def __aenter__(self):
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_connections),
+            raise_for_status=True,
+            trace_configs=[aiohttp_trace_config()],
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._session.close()
+
+    async def web3_for(self, proxy=None):
+        """AsyncWeb3 per proxy, semuanya memakai sesi aiohttp yang sama."""
+        proxy_url = proxy["https"] if proxy else None
+        if proxy_url not in self._w3_cache:
+            request_kwargs = {"proxy": proxy_url} if proxy_url else {}
+            provider = AsyncHTTPProvider(self.rpc, request_kwargs=request_kwargs)
+            await provider.cache_async_session(self._session)
+            self._w3_cache[proxy_url] = instrument_web3(AsyncWeb3(provider))
+        return self._w3_cache[proxy_url]
+
+    @timed("wait_for_tx", ok=lambda receipt: receipt is not None)
+    async def wait_for_tx(self, w3_instance, tx_hash, message):
+        info(f"{message} [dim]{tx_hash.hex()}[/dim]")
+        try:
+            if self.receipts is not None:
+                receipt = await self.receipts.wait_async(tx_hash, timeout=180)
+            else:
+                receipt = await w3_instance.eth.wait_for_transaction_receipt(tx_hash, timeout=180)
+        except Exception as e:
+            error(f"Timeout atau error saat menunggu transaksi: {e}")
+            receipt = None
+        JOURNAL.tx(tx_hash, receipt)
+        if self.checkpoint and receipt is not None:
+            self.checkpoint.mark_tx(tx_hash, receipt.status)
+        return receipt
+
+    async def chk_native(self, w3_instance, account, need):
+        balance = await w3_instance.eth.get_balance(account)
+        if balance < need:
+            error(f"Saldo ETH tidak cukup. Butuh: {w3_instance.from_wei(need, 'ether')} ETH")
+            return False
+        return True
+
+    async def find_route(self, router_contract, amt, src_addr, dst_addr):
+        """Rute terbaik dari RouteFinder, fallback ke path langsung via router. Mengembalikan (path, amount_out)."""
+        if self.routes is not None:
+            try:
+                # Refresh reserve memakai Web3 sync, jadi dijalankan di thread agar event loop tidak tertahan
+                route = await asyncio.to_thread(self.routes.best_route, src_addr, dst_addr, amt)
+                if route:
+                    return route
+            except Exception:
+                pass
+        path = [src_addr, dst_addr]
+        try:
+            amounts = await router_contract.functions.getAmountsOut(amt, path).call()
+        except Exception:
+            return path, None
+        return path, amounts[-1]
+
+    async def quote_liquidity_amount(self, router_contract, eth_wei, token_addr):
+        """Jumlah token untuk addLiquidityETH sesuai rumus router, fallback ke router.getAmountsOut."""
+        if self.quoter is not None:
+            try:
+                token_wei = await asyncio.to_thread(self.quoter.liquidity_amount, eth_wei, self.weth_addr, token_addr)
+                if token_wei:
+                    return token_wei
+            except Exception:
+                pass
+        return (await router_contract.functions.getAmountsOut(eth_wei, [self.weth_addr, token_addr]).call())[-1]
+
+    @timed("ensure_approve")
+    async def ensure_approve(self, w3_instance, account, pk, token_addr, amt):
+        if token_addr is None: return True
+        if self.approvals and self.approvals.is_approved(account, token_addr, self.router_addr): return True
+        c = w3_instance.eth.contract(address=token_addr, abi=ERC20_ABI)
+        alw = await c.functions.allowance(account, self.router_addr).call()
+        if self.approvals: self.approvals.record(account, token_addr, self.router_addr, alw)
+        if alw >= amt: return True
+        info(f"Mengirim transaksi approve untuk token...")
+        fn = c.functions.approve(self.router_addr, 2**256 - 1)
+        tx = await fn.build_transaction(await self.fees.async_tx_params(w3_instance, fn, account, token_addr, self.gas_approve))
+        if not await self.chk_native(w3_instance, account, tx_cost(tx)): return False
+        tx_hash = await self.nonces.send(w3_instance, tx, pk)
+        rec = await self.wait_for_tx(w3_instance, tx_hash, "Menunggu konfirmasi approve...")
+        if rec and rec.status == 1:
+            success(f"Approve berhasil: [yellow]{tx_hash.hex()}[/yellow]")
+            if self.approvals: self.approvals.mark_approved(account, token_addr, self.router_addr)
+            return True
+        error(f"Approve gagal: [yellow]{tx_hash.hex()}[/yellow]")
+        return False
+
+    @timed("do_swap")
+    async def do_swap(self, w3_instance, account, pk, src_sym, dst_sym, amt, mass_mode=False):
+        try:
+            src = self.tokens.get(src_sym)
+            dst = self.tokens.get(dst_sym)
+            if not src or not dst:
+                error(f"Token {src_sym} atau {dst_sym} tidak ditemukan.")
+                return False
+            if src_sym == 'ETH' and dst_sym == 'ETH':
+                error('Swap ETH ke ETH tidak didukung.')
+                return False
+            if dst['address'] is None and dst_sym != 'WETH':
+                error(f"Token tujuan {dst_sym} tidak memiliki address valid.")
+                return False
+
+            deadline = int(time.time()) + 120
+            router_contract = w3_instance.eth.contract(address=self.router_addr, abi=ROUTER_ABI)
+            path, amount_out = await self.find_route(router_contract, amt, src['address'] or self.weth_addr, dst['address'] or self.weth_addr)
+            if amount_out is None:
+                if not mass_mode:
+                    error(f"Tidak dapat menemukan pool likuid untuk swap {src_sym} -> {dst_sym}.")
+                return False
+            if len(path) > 2:
+                info(f"Rute {len(path) - 1} hop dipakai untuk {src_sym} -> {dst_sym}")
+
+            min_out = int(amount_out * (1 - self.slippage))
+            if not await self.ensure_approve(w3_instance, account, pk, src['address'], amt):
+                return False
+
+            value = 0
+            if src_sym == "ETH":
+                fn = router_contract.functions.swapExactETHForTokens(min_out, path, account, deadline)
+                value = amt
+            elif dst_sym == "ETH":
+                fn = router_contract.functions.swapExactTokensForETH(amt, min_out, path, account, deadline)
+            else:
+                fn = router_contract.functions.swapExactTokensForTokens(amt, min_out, path, account, deadline)
+
+            tx = await fn.build_transaction(await self.fees.async_tx_params(w3_instance, fn, account, tuple(path), self.gas_swap, value))
+            if not await self.chk_native(w3_instance, account, tx_cost(tx)):
+                return False
+            tx_hash = await self.nonces.send(w3_instance, tx, pk)
+            if self.checkpoint:
+                self.checkpoint.record_tx(account, "swap", tx_hash, dst_sym)
+            rec = await self.wait_for_tx(w3_instance, tx_hash, f"Mengirim swap {src_sym} -> {dst_sym}...")
+            if rec and rec.status == 1:
+                success(f"Swap {src_sym} -> {dst_sym} berhasil! 🎉 Tx Hash: [yellow]{tx_hash.hex()}[/yellow]")
+                return True
+            error(f"Swap {src_sym} -> {dst_sym} gagal! ❌ Tx Hash: [yellow]{tx_hash.hex()}[/yellow]")
+            if rec is not None and self.approvals and src['address']: self.approvals.invalidate(account, src['address'], self.router_addr)
+            return False
+        except Exception as e:
+            error(f"[do_swap] Error fatal: {e}")
+            return False
+
+    @timed("add_liquidity")
+    async def add_liquidity(self, w3_instance, account, pk, token_sym, eth_wei):
+        try:
+            token_addr = self.tokens[token_sym]['address']
+            deadline = int(time.time()) + 120
+            router_contract = w3_instance.eth.contract(address=self.router_addr, abi=ROUTER_ABI)
+            try:
+                token_wei = await self.quote_liquidity_amount(router_contract, eth_wei, token_addr)
+            except Exception as e:
+                error(f"Tidak dapat menghitung jumlah token. Mungkin pool belum ada. Error: {e}")
+                return False
+
+            token_contract = w3_instance.eth.contract(address=token_addr, abi=ERC20_ABI)
+            token_balance = await token_contract.functions.balanceOf(account).call()
+
+            LIQUIDITY_SLIPPAGE = 0.01
+            token_min = int(token_wei * (1 - LIQUIDITY_SLIPPAGE))
+            eth_min = int(eth_wei * (1 - LIQUIDITY_SLIPPAGE))
+            if token_balance < token_min:
+                decimals = self.tokens[token_sym].get('decimals', 18)
+                error(f"Saldo {token_sym} tidak cukup. Butuh minimal: {format_units(token_min, decimals)}, Punya: {format_units(token_balance, decimals)}")
+                return False
+            token_wei = min(token_wei, token_balance)
+
+            if not await self.ensure_approve(w3_instance, account, pk, token_addr, token_wei):
+                return False
+
+            fn = router_contract.functions.addLiquidityETH(token_addr, token_wei, token_min, eth_min, account, deadline)
+            tx = await fn.build_transaction(await self.fees.async_tx_params(w3_instance, fn, account, token_addr, self.gas_swap, eth_wei))
+            if not await self.chk_native(w3_instance, account, tx_cost(tx)):
+                return False
+            tx_hash = await self.nonces.send(w3_instance, tx, pk)
+            if self.checkpoint:
+                self.checkpoint.record_tx(account, "liquidity", tx_hash, token_sym)
+            rec = await self.wait_for_tx(w3_instance, tx_hash, "Menambah likuiditas...")
+            if rec and rec.status == 1:
+                success(f"Likuiditas berhasil ditambah! Tx Hash: [yellow]{tx_hash.hex()}[/yellow]")
+                return True
+            error(f"Gagal menambah likuiditas. Tx Hash: [yellow]{tx_hash.hex()}[/yellow]")
+            if rec is not None and self.approvals: self.approvals.invalidate(account, token_addr, self.router_addr)
+            return False
+        except Exception as e:
+            error(f"[add_liquidity] Error fatal: {e}")
+            return False
+
+    async def process_wallet(self, i, address, pk, proxy, total_wallets, config, available_tokens, resume_token=None):
+        """
+        Pipeline swap + tambah likuiditas untuk satu dompet. Mengembalikan True jika sukses.
+        `resume_token` diisi jika swap dompet ini sudah sukses sebelum restart; swap dilewati.
+        """
+        console.print(Rule(f"Memproses dompet {i+1}/{total_wallets}: {address}", style="bold green"))
+        w3_wallet = await self.web3_for(proxy)
+        swap_amount = round(random.uniform(config['swap_amount_min'], config['swap_amount_max']), 6)
+        liquidity_amount = round(random.uniform(config['liquidity_amount_min'], config['liquidity_amount_max']), 6)
+
+        try:
+            eth_balance = await w3_wallet.eth.get_balance(address)
+        except Exception as e:
+            error(f"Gagal mengecek saldo ETH untuk wallet {address}: {e}")
+            return False
+        if resume_token:
+            swap_amount = 0
+        gas_reserve = (await self.fees.async_reserve_cost(w3_wallet, "swapExactETHForTokens", self.gas_swap) if not resume_token else 0) \
+            + await self.fees.async_reserve_cost(w3_wallet, "approve", self.gas_approve) \
+            + await self.fees.async_reserve_cost(w3_wallet, "addLiquidityETH", self.gas_swap)
+        total_needed = w3_wallet.to_wei(swap_amount + liquidity_amount, 'ether') + gas_reserve
+        if eth_balance < total_needed:
+            warning(f"Saldo tidak cukup untuk operasi lengkap. Diperlukan minimal {w3_wallet.from_wei(total_needed, 'ether'):.6f} ETH")
+            return False
+
+        successful_token = resume_token
+        if successful_token:
+            info(f"Swap ETH -> {successful_token} sudah sukses sebelum restart, lanjut ke tambah likuiditas")
+        else:
+            candidate_tokens = list(available_tokens)
+            random.shuffle(candidate_tokens)
+            for token_sym in candidate_tokens:
+                if await self.do_swap(w3_wallet, address, pk, "ETH", token_sym, w3_wallet.to_wei(swap_amount, 'ether'), mass_mode=True):
+                    successful_token = token_sym
+                    break
+                await asyncio.sleep(2)
+            if successful_token is None:
+                error(f"Gagal melakukan swap untuk dompet {address}")
+                return False
+            if self.checkpoint:
+                self.checkpoint.set_stage(address, STAGE_SWAPPED, successful_token)
+
+        await asyncio.sleep(config['delay_between_operations'])
+        if await self.add_liquidity(w3_wallet, address, pk, successful_token, w3_wallet.to_wei(liquidity_amount, 'ether')):
+            success(f"✅ Dompet {address} berhasil menyelesaikan semua operasi!")
+            return True
+        error(f"❌ Gagal menambah likuiditas untuk dompet {address}")
+        return False
+
+    async def run(self, wallet_jobs, config, available_tokens, concurrency, delay_between_wallets=0):
+        """
+        Jalankan banyak dompet sekaligus dengan batas `concurrency`.
+        `wallet_jobs` berisi tuple (address, pk, proxy) atau (address, pk, proxy, resume_token).
+        Seperti mode thread, tiap slot menunggu `delay_between_wallets` detik sebelum dompet berikutnya.
+        Mengembalikan list hasil per dompet.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        total_wallets = len(wallet_jobs)
+
+        async def run_one(i, address, pk, proxy, resume_token=None):
+            async with semaphore:
+                start = time.time()
+                with bind(wallet=address):
+                    JOURNAL.event("wallet_start", index=i)
+                    try:
+                        ok = await self.process_wallet(i, address, pk, proxy, total_wallets, config, available_tokens, resume_token)
+                    except Exception as e:
+                        error(f"❌ Error tidak terduga untuk dompet {address}: {e}")
+                        ok = False
+                    if self.checkpoint:
+                        self.checkpoint.set_stage(address, STAGE_DONE if ok else STAGE_FAILED)
+                    JOURNAL.event("wallet_done", level="info" if ok else "warning", ok=ok, duration_ms=round((time.time() - start) * 1000, 1))
+                if delay_between_wallets and i < total_wallets - 1:
+                    info(f"Menunggu {delay_between_wallets} detik sebelum lanjut ke dompet berikutnya...")
+                    await asyncio.sleep(delay_between_wallets)
+                return ok
+
+        return await asyncio.gather(*(run_one(i, *job) for i, job in enumerate(wallet_jobs)))
@@ -9,15 +9,35 @@ import os
 import time
 import requests
 import random
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from web3 import Web3
-from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich.rule import Rule
 import web3
-
-console = Console()
+from abis import PAIR_ABI, FACTORY_ABI, ERC20_ABI, ROUTER_ABI
+from batch_reads import eth_balances
+from nonce_manager import NonceManager
+from tx_pipeline import SIGN_PROCESS_MIN_WALLETS, TxPipeline
+from async_engine import AsyncSwapEngine
+from token_registry import TokenRegistry, format_units
+from pool_index import PoolIndex
+from rpc_pool import get_web3, get_contract
+from app_context import AppContext
+from multi_rpc import load_rpc_urls
+from quoter import Quoter
+from route_finder import RouteFinder
+from metrics import METRICS, METRICS_PORT, METRICS_REPORT, timed, serve_prometheus
+from journal import JOURNAL, bind, make_console
+from fee_oracle import FeeOracle, tx_cost
+from checkpoint import Checkpoint, STAGE_DONE, STAGE_FAILED, STAGE_SWAPPED, TX_DROPPED
+from scheduler import Scheduler
+
+# LOG_FORMAT=json: output berupa baris JSONL, tanpa render rich
+console = make_console()
 
 def info(msg): console.print(f"[bold cyan][*][/bold cyan] {msg}")
 def success(msg): console.print(f"[bold green][+][/bold green] {msg}")
@@ -52,26 +72,41 @@ def get_proxy_for_wallet(wallet_index):
     return PROXIES[proxy_index]
 
 def create_web3_with_proxy(proxy=None):
-    """Membuat instance Web3 dengan proxy tertentu."""
-    request_kwargs = {"proxies": proxy} if proxy else {}
-    return Web3(Web3.HTTPProvider(RPC, request_kwargs=request_kwargs))
+    """Instance Web3 untuk proxy tertentu; koneksi HTTP dipakai bersama antar dompet dengan proxy yang sama."""
+    return get_web3(RPC_URLS, proxy)
 
+@timed("wait_for_tx", ok=lambda receipt: receipt is not None)
 def wait_for_tx(w3_instance, tx_hash, message):
+    # Rich hanya mengizinkan satu live display; spinner hanya di thread utama
+    if threading.current_thread() is not threading.main_thread():
+        info(f"{message} [dim]{tx_hash.hex()}[/dim]")
+        try:
+            receipt = CTX.receipts.wait(tx_hash, timeout=180)
+        except Exception as e:
+            error(f"Timeout atau error saat menunggu transaksi: {e}")
+            receipt = None
+        record_receipt(tx_hash, receipt)
+        return receipt
     with console.status(f"[bold green]{message} [dim]{tx_hash.hex()}[/dim][/bold green]", spinner="dots") as status:
         try:
-            receipt = w3_instance.eth.wait_for_transaction_receipt(tx_hash, timeout=180)
-            return receipt
+            receipt = CTX.receipts.wait(tx_hash, timeout=180)
         except Exception as e:
             error(f"Timeout atau error saat menunggu transaksi: {e}")
-            return None
+            receipt = None
+    record_receipt(tx_hash, receipt)
+    return receipt
+
+def record_receipt(tx_hash, receipt):
+    JOURNAL.tx(tx_hash, receipt)
+    if CHECKPOINT is not None and receipt is not None:
+        CHECKPOINT.mark_tx(tx_hash, receipt.status)
 
 # Konfigurasi RPC dan Chain
-RPC = 'https://carrot.megaeth.com/rpc'
+# Beberapa endpoint bisa diisi lewat RPC_URLS (dipisah koma); baca diarahkan ke yang tercepat
+RPC_URLS = load_rpc_urls()
+RPC = RPC_URLS[0]
 CHAIN = 6342
 
-# Buat Web3 instance default (tanpa proxy untuk koneksi awal)
-w3 = create_web3_with_proxy()
-
 def load_private_keys():
     pk_list = []
     try:
@@ -95,81 +130,124 @@ def load_private_keys():
         exit()
     return pk_list
 
-PK_LIST = load_private_keys()
-accounts = [w3.eth.account.from_key(pk) for pk in PK_LIST]
-
-# ABI Definitions
-PAIR_ABI = json.loads("""[{"constant":true,"inputs":[],"name":"getReserves","outputs":[{"internalType":"uint112","name":"_reserve0","type":"uint112"},{"internalType":"uint112","name":"_reserve1","type":"uint112"},{"internalType":"uint32","name":"_blockTimestampLast","type":"uint32"}],"stateMutability":"view","type":"function"}]""")
-FACTORY_ABI = json.loads("""[{"constant":true,"inputs":[{"name":"tokenA","type":"address"},{"name":"tokenB","type":"address"}],"name":"getPair","outputs":[{"name":"pair","type":"address"}],"stateMutability":"view","type":"function"}]""")
-ERC20_ABI = json.loads("""[{"constant":true,"inputs":[{"name":"owner","type":"address"}],"name":"balanceOf","outputs":[{"name":"","type":"uint256"}],"type":"function"},{"constant":true,"inputs":[{"name":"owner","type":"address"},{"name":"spender","type":"address"}],"name":"allowance","outputs":[{"name":"","type":"uint256"}],"type":"function"},{"constant":false,"inputs":[{"name":"spender","type":"address"},{"name":"amount","type":"uint256"}],"name":"approve","outputs":[{"name":"","type":"bool"}],"type":"function"},{"constant":true,"inputs":[],"name":"decimals","outputs":[{"name":"","type":"uint8"}],"type":"function"},{"constant":true,"inputs":[],"name":"symbol","outputs":[{"name":"","type":"string"}],"type":"function"}]""")
-ROUTER_ABI = json.loads("""[{"constant":true,"inputs":[{"name":"amountIn","type":"uint256"},{"name":"path","type":"address[]"}],"name":"getAmountsOut","outputs":[{"name":"","type":"uint256[]"}],"type":"function"},{"inputs":[{"internalType":"uint256","name":"amountIn","type":"uint256"},{"internalType":"uint256","name":"amountOutMin","type":"uint256"},{"internalType":"address[]","name":"path","type":"address[]"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"swapExactTokensForTokens","outputs":[{"internalType":"uint256[]","name":"","type":"uint256[]"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"uint256","name":"amountOutMin","type":"uint256"},{"internalType":"address[]","name":"path","type":"address[]"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"swapExactETHForTokens","outputs":[{"internalType":"uint256[]","name":"","type":"uint256[]"}],"stateMutability":"payable","type":"function"},{"inputs":[{"internalType":"uint256","name":"amountIn","type":"uint256"},{"internalType":"uint256","name":"amountOutMin","type":"uint256"},{"internalType":"address[]","name":"path","type":"address[]"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"swapExactTokensForETH","outputs":[{"internalType":"uint256[]","name":"","type":"uint256[]"}],"stateMutability":"nonpayable","type":"function"},{"constant":true,"inputs":[],"name":"WETH","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"constant":true,"inputs":[],"name":"factory","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"tokenA","type":"address"},{"internalType":"address","name":"tokenB","type":"address"},{"internalType":"uint256","name":"amountADesired","type":"uint256"},{"internalType":"uint256","name":"amountBDesired","type":"uint256"},{"internalType":"uint256","name":"amountAMin","type":"uint256"},{"internalType":"uint256","name":"amountBMin","type":"uint256"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"addLiquidity","outputs":[{"internalType":"uint256","name":"amountA","type":"uint256"},{"internalType":"uint256","name":"amountB","type":"uint256"},{"internalType":"uint256","name":"liquidity","type":"uint256"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"token","type":"address"},{"internalType":"uint256","name":"amountTokenDesired","type":"uint256"},{"internalType":"uint256","name":"amountTokenMin","type":"uint256"},{"internalType":"uint256","name":"amountETHMin","type":"uint256"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"addLiquidityETH","outputs":[{"internalType":"uint256","name":"amountToken","type":"uint256"},{"internalType":"uint256","name":"amountETH","type":"uint256"},{"internalType":"uint256","name":"liquidity","type":"uint256"}],"stateMutability":"payable","type":"function"}]""")
-
 # Konfigurasi
 ROUTER_ADDR = Web3.to_checksum_address("0xa6b579684e943f7d00d616a48cf99b5147fc57a5")
-router = w3.eth.contract(address=ROUTER_ADDR, abi=ROUTER_ABI)
-WETH_ADDR = router.functions.WETH().call()
+# w3, router, WETH dan akun baru dibuat saat pertama dipakai (import modul tidak menyentuh jaringan)
+CTX = AppContext(RPC_URLS, CHAIN, ROUTER_ADDR, key_loader=load_private_keys)
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
-GAS_P = w3.to_wei('0.001', 'gwei')
+# Gas limit dan fee diestimasi per panggilan; konstanta ini hanya batas aman jika estimasi gagal
 GAS_AP, GAS_SW = 200_000, 500_000
+FEES = FeeOracle(CHAIN)
 SLIPPAGE = 0.11
 TOKENS = {}
-
-info("Menyambungkan ke RPC...")
-if not w3.is_connected(): 
-    error("Koneksi RPC gagal!")
-    exit()
-if w3.eth.chain_id != CHAIN: 
-    error(f"Chain ID tidak cocok: diharapkan {CHAIN}, didapat {w3.eth.chain_id}")
-    exit()
-success("RPC terhubung dengan sukses.")
+TOKEN_REGISTRY = TokenRegistry()
+POOLS = None
+QUOTER = None
+ROUTES = None
+# Checkpoint siklus (SQLite), dibuat saat run otomatis pertama
+CHECKPOINT = None
+NONCES = NonceManager()
+# Tanda tangan, broadcast ber-batch dan pendaftaran receipt untuk semua dompet
+TXS = TxPipeline(NONCES, on_broadcast=lambda tx_hash: CTX.receipts.track(tx_hash))
+# Kirim approve dan swap/addLiquidityETH berurutan tanpa menunggu receipt approve
+PIPELINE_APPROVE = os.getenv("PIPELINE_APPROVE", "false").lower() == 'true'
+
+# Nama lama tetap bisa diakses dari luar modul (mis. auto_swap_liquidity.w3)
+_LAZY_ATTRS = {"w3": "w3", "router": "router", "WETH_ADDR": "weth_addr", "accounts": "accounts", "PK_LIST": "pk_list", "RECEIPTS": "receipts"}
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        return getattr(CTX, _LAZY_ATTRS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def connect_rpc():
+    info("Menyambungkan ke RPC...")
+    try:
+        CTX.connect()
+    except Exception as e:
+        error(str(e))
+        exit()
+    success("RPC terhubung dengan sukses.")
 
 def fetch_and_load_tokens():
-    global TOKENS, router, WETH_ADDR, ZERO_ADDRESS
-    router = w3.eth.contract(address=ROUTER_ADDR, abi=ROUTER_ABI)
-    WETH_ADDR = router.functions.WETH().call()
-    ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
-    
-    API_URL = "https://api-testnet.gte.xyz/v1/markets?sortBy=volume&limit=100"
-    headers = {
-        'accept': 'application/json, text/plain, */*',
-        'origin': 'https://testnet.gte.xyz',
-        'referer': 'https://testnet.gte.xyz/',
-        'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36'
-    }
+    global TOKENS
     
     # Gunakan proxy pertama untuk fetch token data
     proxy_to_use = PROXIES[0] if PROXIES else None
     
-    with console.status("[bold yellow]Memuat data token...[/bold yellow]", spinner="dots"):
-        try:
-            resp = requests.get(API_URL, headers=headers, timeout=10, proxies=proxy_to_use)
-            resp.raise_for_status()
-            markets = resp.json()
-            
-            if not isinstance(markets, list):
-                error("Format data market tidak terduga dari API.")
-                return
-
-            for market in markets:
-                for token_type in ['baseToken', 'quoteToken']:
-                    token_data = market.get(token_type)
-                    if token_data:
-                        sym = token_data.get("symbol", "").upper().strip()
-                        if not sym: continue
-                        addr_raw = token_data.get("address", "")
-                        if not (isinstance(addr_raw, str) and addr_raw.startswith('0x') and len(addr_raw) == 42):
-                            continue
-                        if sym not in TOKENS:
-                            addr = Web3.to_checksum_address(addr_raw)
-                            TOKENS[sym] = {"address": addr, "decimals": token_data.get("decimals", 18)}
-            
-            TOKENS["ETH"] = {"address": None, "decimals": 18}
-            TOKENS["WETH"] = {"address": WETH_ADDR, "decimals": 18}
-        except Exception as e: 
-            error(f"Gagal memuat data token: {e}")
-            exit()
+    if TOKEN_REGISTRY.tokens:
+        # Startup dari cache lokal; API hanya dicek di background jika cache kedaluwarsa
+        if TOKEN_REGISTRY.is_stale():
+            info("Cache token kedaluwarsa, memperbarui di background...")
+            TOKEN_REGISTRY.refresh_in_background(proxy_to_use)
+    else:
+        with console.status("[bold yellow]Memuat data token...[/bold yellow]", spinner="dots"):
+            try:
+                TOKEN_REGISTRY.refresh(proxy_to_use)
+            except Exception as e: 
+                error(f"Gagal memuat data token: {e}")
+                exit()
+    
+    # Decimals diverifikasi on-chain sekali, hasilnya ikut tersimpan di registry
+    try:
+        TOKEN_REGISTRY.verify_onchain(CTX.w3)
+    except Exception as e:
+        warning(f"Gagal memverifikasi decimals token on-chain: {e}")
+    
+    TOKENS = TOKEN_REGISTRY.token_map()
+    TOKENS["ETH"] = {"address": None, "decimals": 18}
+    TOKENS["WETH"] = {"address": CTX.weth_addr, "decimals": 18}
     success(f"Berhasil memuat {len(TOKENS)} token.")
 
+def refresh_pool_index():
+    """Perbarui indeks pair token ke WETH/quote token dan tandai token yang likuid di registry."""
+    global POOLS, QUOTER, ROUTES
+    if POOLS is None:
+        POOLS = PoolIndex(CTX.w3, CTX.router.functions.factory().call())
+        QUOTER = Quoter(POOLS)
+        ROUTES = RouteFinder(QUOTER)
+    tradable = {s: t['address'] for s, t in TOKENS.items() if s not in ['ETH', 'WETH'] and t.get('address')}
+    # Hub untuk rute multi-hop: WETH dan token yang dipakai sebagai quote token market
+    hubs = list(dict.fromkeys([CTX.weth_addr] + TOKEN_REGISTRY.quote_tokens()))
+    POOLS.refresh([(addr, hub) for addr in tradable.values() for hub in hubs if addr != hub])
+    TOKEN_REGISTRY.set_liquidity({s: POOLS.is_liquid(addr, CTX.weth_addr) for s, addr in tradable.items()})
+
+def quote_amounts_out(router_contract, amt, path):
+    """Quote dari reserve yang di-cache (tanpa RPC), fallback ke router.getAmountsOut."""
+    if QUOTER is not None:
+        try:
+            amounts = QUOTER.amounts_out(amt, path)
+            if amounts and amounts[-1] > 0:
+                return amounts
+        except Exception:
+            pass
+    return router_contract.functions.getAmountsOut(amt, path).call()
+
+def quote_liquidity_amount(router_contract, eth_wei, token_addr):
+    """Jumlah token untuk addLiquidityETH sesuai rumus router, fallback ke router.getAmountsOut."""
+    if QUOTER is not None:
+        try:
+            token_wei = QUOTER.liquidity_amount(eth_wei, CTX.weth_addr, token_addr)
+            if token_wei:
+                return token_wei
+        except Exception:
+            pass
+    return router_contract.functions.getAmountsOut(eth_wei, [CTX.weth_addr, token_addr]).call()[-1]
+
+def find_route(router_contract, amt, src_addr, dst_addr):
+    """Rute terbaik 1-3 hop dari graf pool, fallback ke path langsung. Mengembalikan (path, amount_out)."""
+    if ROUTES is not None:
+        try:
+            route = ROUTES.best_route(src_addr, dst_addr, amt)
+            if route:
+                return route
+        except Exception:
+            pass
+    try:
+        return [src_addr, dst_addr], quote_amounts_out(router_contract, amt, [src_addr, dst_addr])[-1]
+    except Exception:
+        return None, None
+
 def chk_native(w3_instance, account, need):
     balance = w3_instance.eth.get_balance(account)
     if balance < need: 
@@ -177,31 +255,72 @@ def chk_native(w3_instance, account, need):
         return False
     return True
 
-def ensure_approve(w3_instance, account, pk, token_addr, amt):
-    if token_addr is None: return True
-    c = w3_instance.eth.contract(address=token_addr, abi=ERC20_ABI)
+def send_approve(w3_instance, account, pk, token_addr, amt):
+    """
+    Kirim approve jika allowance kurang, tanpa menunggu receipt.
+    Mengembalikan (ok, tx_hash); tx_hash bernilai None jika approve tidak diperlukan.
+    """
+    if token_addr is None: return True, None
+    # Approve tak terbatas yang sudah tercatat: tidak perlu membaca allowance lagi
+    if CTX.approvals.is_approved(account, token_addr, ROUTER_ADDR): return True, None
+    c = get_contract(w3_instance, token_addr, ERC20_ABI)
     alw = c.functions.allowance(account, ROUTER_ADDR).call()
-    if alw < amt:
-        info(f"Mengirim transaksi approve untuk token...")
-        tx = c.functions.approve(ROUTER_ADDR, 2**256 - 1).build_transaction({
-            'from': account, 
-            'nonce': w3_instance.eth.get_transaction_count(account), 
-            'gas': GAS_AP, 
-            'gasPrice': GAS_P, 
-            'chainId': CHAIN
-        })
-        if not chk_native(w3_instance, account, tx['gas'] * tx['gasPrice']): return False
-        sig = w3_instance.eth.account.sign_transaction(tx, pk)
-        tx_hash = w3_instance.eth.send_raw_transaction(sig.raw_transaction)
-        rec = wait_for_tx(w3_instance, tx_hash, "Menunggu konfirmasi approve...")
-        if rec and rec.status == 1: 
-            success(f"Approve berhasil: [yellow]{tx_hash.hex()}[/yellow]")
-            return True
-        else: 
-            error(f"Approve gagal: [yellow]{tx_hash.hex()}[/yellow]")
-            return False
-    return True
+    CTX.approvals.record(account, token_addr, ROUTER_ADDR, alw)
+    if alw >= amt: return True, None
+    info(f"Mengirim transaksi approve untuk token...")
+    fn = c.functions.approve(ROUTER_ADDR, 2**256 - 1)
+    tx = fn.build_transaction(FEES.tx_params(w3_instance, fn, account, token_addr, GAS_AP))
+    if not chk_native(w3_instance, account, tx_cost(tx)): return False, None
+    return True, TXS.send(w3_instance, tx, pk)
+
+@timed("ensure_approve")
+def ensure_approve(w3_instance, account, pk, token_addr, amt):
+    ok, tx_hash = send_approve(w3_instance, account, pk, token_addr, amt)
+    if not ok or tx_hash is None:
+        return ok
+    rec = wait_for_tx(w3_instance, tx_hash, "Menunggu konfirmasi approve...")
+    if rec and rec.status == 1: 
+        success(f"Approve berhasil: [yellow]{tx_hash.hex()}[/yellow]")
+        CTX.approvals.mark_approved(account, token_addr, ROUTER_ADDR)
+        return True
+    else: 
+        error(f"Approve gagal: [yellow]{tx_hash.hex()}[/yellow]")
+        return False
 
+def collect_receipts(w3_instance, pending):
+    """Kumpulkan receipt untuk daftar (tx_hash, pesan) yang sudah di-broadcast."""
+    for tx_hash, _ in pending:
+        CTX.receipts.track(tx_hash)
+    return [wait_for_tx(w3_instance, tx_hash, message) for tx_hash, message in pending]
+
+def confirm_after_approve(w3_instance, account, token_addr, approve_hash, tx_hash, message):
+    """
+    Tunggu receipt approve dan transaksi dependen yang di-broadcast bersamaan.
+    Transaksi dependen dianggap gagal jika approve revert atau tidak terkonfirmasi.
+    Jika transaksi dependen revert, cache approve token tersebut dihapus.
+    """
+    if approve_hash is None:
+        rec = wait_for_tx(w3_instance, tx_hash, message)
+        if rec is not None and rec.status != 1 and token_addr is not None:
+            # Revert bisa karena allowance ternyata kurang: baca ulang on-chain di pemakaian berikutnya
+            CTX.approvals.invalidate(account, token_addr, ROUTER_ADDR)
+        return rec
+    approve_rec, rec = collect_receipts(w3_instance, [
+        (approve_hash, "Menunggu konfirmasi approve..."),
+        (tx_hash, message),
+    ])
+    if approve_rec and approve_rec.status == 1:
+        success(f"Approve berhasil: [yellow]{approve_hash.hex()}[/yellow]")
+        if rec is None or rec.status == 1:
+            CTX.approvals.mark_approved(account, token_addr, ROUTER_ADDR)
+        return rec
+    error(f"Approve gagal: [yellow]{approve_hash.hex()}[/yellow]. Transaksi dependen ditandai gagal.")
+    if approve_rec is None:
+        # Approve belum masuk blok, nonce lokal berikutnya tidak bisa dipercaya
+        NONCES.reset(account)
+    return None
+
+@timed("do_swap")
 def do_swap(w3_instance, account, pk, src_sym, dst_sym, amt, mass_mode=False):
     try:
         src = TOKENS.get(src_sym)
@@ -212,8 +331,8 @@ def do_swap(w3_instance, account, pk, src_sym, dst_sym, amt, mass_mode=False):
 
         deadline = int(time.time()) + 120
 
-        src_addr = src['address'] if src['address'] else WETH_ADDR
-        dst_addr = dst['address'] if dst['address'] else WETH_ADDR
+        src_addr = src['address'] if src['address'] else CTX.weth_addr
+        dst_addr = dst['address'] if dst['address'] else CTX.weth_addr
 
         if src_sym == 'ETH' and dst_sym == 'ETH':
             error('Swap ETH ke ETH tidak didukung.')
@@ -222,56 +341,44 @@ def do_swap(w3_instance, account, pk, src_sym, dst_sym, amt, mass_mode=False):
             error(f"Token tujuan {dst_sym} tidak memiliki address valid.")
             return False
 
-        if src_addr and dst_addr:
-            paths = [[src_addr, dst_addr]]
-        elif src_addr:
-            paths = [[src_addr, WETH_ADDR]]
-        else:
-            paths = [[WETH_ADDR, dst_addr]]
-
-        amount_out = None
-        chosen_path = None
+        router_contract = get_contract(w3_instance, ROUTER_ADDR, ROUTER_ABI)
         
-        router_contract = w3_instance.eth.contract(address=ROUTER_ADDR, abi=ROUTER_ABI)
-        
-        for p in paths:
-            if None in p:
-                continue
-            try:
-                amounts = router_contract.functions.getAmountsOut(amt, p).call()
-                amount_out, chosen_path = amounts[-1], p
-                break
-            except Exception as e:
-                if not mass_mode:
-                    error(f"Tidak dapat menemukan pool likuid untuk swap {src_sym} -> {dst_sym}.")
-                continue
-                
+        chosen_path, amount_out = find_route(router_contract, amt, src_addr, dst_addr)
         if amount_out is None:
             if not mass_mode:
                 error(f"Tidak dapat menemukan pool likuid untuk swap {src_sym} -> {dst_sym}.")
             return False
+        if len(chosen_path) > 2:
+            info(f"Rute {len(chosen_path) - 1} hop dipakai untuk {src_sym} -> {dst_sym}")
             
         min_out = int(amount_out * (1 - SLIPPAGE))
-        if not ensure_approve(w3_instance, account, pk, src['address'], amt):
+        approve_hash = None
+        if PIPELINE_APPROVE:
+            ok, approve_hash = send_approve(w3_instance, account, pk, src['address'], amt)
+            if not ok:
+                return False
+        elif not ensure_approve(w3_instance, account, pk, src['address'], amt):
             return False
-            
-        nonce = w3_instance.eth.get_transaction_count(account)
 
-        tx_params = {'from': account, 'nonce': nonce, 'gas': GAS_SW, 'gasPrice': GAS_P}
+        value = 0
         if src_sym == "ETH":
             fn = router_contract.functions.swapExactETHForTokens(min_out, chosen_path, account, deadline)
-            tx_params['value'] = amt
+            value = amt
         elif dst_sym == "ETH":
             fn = router_contract.functions.swapExactTokensForETH(amt, min_out, chosen_path, account, deadline)
         else:
             fn = router_contract.functions.swapExactTokensForTokens(amt, min_out, chosen_path, account, deadline)
 
-        tx = fn.build_transaction(tx_params)
-        if not chk_native(w3_instance, account, tx['gas'] * tx['gasPrice'] + tx.get('value', 0)):
+        # Estimasi gas di-cache per fungsi + rute (jumlah hop menentukan gas)
+        tx = fn.build_transaction(FEES.tx_params(w3_instance, fn, account, tuple(chosen_path), GAS_SW, value))
+        # Biaya approve yang masih pending belum terpotong dari saldo
+        reserved = FEES.reserve_cost(w3_instance, "approve", GAS_AP) if approve_hash else 0
+        if not chk_native(w3_instance, account, tx_cost(tx) + reserved):
             return False
-        sig = w3_instance.eth.account.sign_transaction(tx, pk)
-        tx_hash = w3_instance.eth.send_raw_transaction(sig.raw_transaction)
-        rec = wait_for_tx(w3_instance, tx_hash, f"Mengirim swap {src_sym} -> {dst_sym}...")
+        tx_hash = TXS.send(w3_instance, tx, pk)
+        if CHECKPOINT is not None:
+            CHECKPOINT.record_tx(account, "swap", tx_hash, dst_sym)
+        rec = confirm_after_approve(w3_instance, account, src['address'], approve_hash, tx_hash, f"Mengirim swap {src_sym} -> {dst_sym}...")
         if rec and rec.status == 1:
             success(f"Swap {src_sym} -> {dst_sym} berhasil! 🎉 Tx Hash: [yellow]{tx_hash.hex()}[/yellow]")
             return True
@@ -284,6 +391,7 @@ def do_swap(w3_instance, account, pk, src_sym, dst_sym, amt, mass_mode=False):
         error(traceback.format_exc())
         return False
 
+@timed("add_liquidity")
 def add_liquidity(w3_instance, account, pk, token_sym, eth_wei):
     try:
         token_data = TOKENS[token_sym]
@@ -292,17 +400,17 @@ def add_liquidity(w3_instance, account, pk, token_sym, eth_wei):
         
         info(f"Mencoba menambah likuiditas untuk {w3_instance.from_wei(eth_wei, 'ether')} ETH dan {token_sym}...")
         
-        router_contract = w3_instance.eth.contract(address=ROUTER_ADDR, abi=ROUTER_ABI)
+        router_contract = get_contract(w3_instance, ROUTER_ADDR, ROUTER_ABI)
         
         try:
-            _, amounts = router_contract.functions.getAmountsOut(eth_wei, [WETH_ADDR, token_addr]).call()
-            token_wei = amounts
+            token_wei = quote_liquidity_amount(router_contract, eth_wei, token_addr)
         except Exception as e: 
             error(f"Tidak dapat menghitung jumlah token. Mungkin pool belum ada. Error: {e}")
             return False
         
-        info(f"Dibutuhkan [bold]{w3_instance.from_wei(token_wei, 'ether')} {token_sym}[/bold] untuk dipasangkan dengan {w3_instance.from_wei(eth_wei, 'ether')} ETH.")
-        token_contract = w3_instance.eth.contract(address=token_addr, abi=ERC20_ABI)
+        token_decimals = token_data.get('decimals', 18)
+        info(f"Dibutuhkan [bold]{format_units(token_wei, token_decimals)} {token_sym}[/bold] untuk dipasangkan dengan {w3_instance.from_wei(eth_wei, 'ether')} ETH.")
+        token_contract = get_contract(w3_instance, token_addr, ERC20_ABI)
         token_balance = token_contract.functions.balanceOf(account).call()
         
         LIQUIDITY_SLIPPAGE = 0.01
@@ -310,31 +418,31 @@ def add_liquidity(w3_instance, account, pk, token_sym, eth_wei):
         eth_min = int(eth_wei * (1 - LIQUIDITY_SLIPPAGE))
         
         if token_balance < token_min:
-            error(f"Saldo {token_sym} tidak cukup. Butuh minimal: {w3_instance.from_wei(token_min, 'ether')}, Punya: {w3_instance.from_wei(token_balance, 'ether')}")
+            error(f"Saldo {token_sym} tidak cukup. Butuh minimal: {format_units(token_min, token_decimals)}, Punya: {format_units(token_balance, token_decimals)}")
             return False
         else:
             if token_balance < token_wei:
                 info(f"Saldo cukup dengan toleransi slippage 1%. Menggunakan jumlah yang tersedia.")
                 token_wei = token_balance
         
-        if not ensure_approve(w3_instance, account, pk, token_addr, token_wei): 
+        approve_hash = None
+        if PIPELINE_APPROVE:
+            ok, approve_hash = send_approve(w3_instance, account, pk, token_addr, token_wei)
+            if not ok:
+                return False
+        elif not ensure_approve(w3_instance, account, pk, token_addr, token_wei): 
             return False
         
         fn = router_contract.functions.addLiquidityETH(token_addr, token_wei, token_min, eth_min, account, deadline)
-        tx_params = {
-            'from': account, 
-            'value': eth_wei, 
-            'nonce': w3_instance.eth.get_transaction_count(account), 
-            'gas': GAS_SW, 
-            'gasPrice': GAS_P
-        }
-        tx = fn.build_transaction(tx_params)
-        if not chk_native(w3_instance, account, tx['gas'] * tx['gasPrice'] + tx.get('value', 0)): 
+        tx = fn.build_transaction(FEES.tx_params(w3_instance, fn, account, token_addr, GAS_SW, eth_wei))
+        reserved = FEES.reserve_cost(w3_instance, "approve", GAS_AP) if approve_hash else 0
+        if not chk_native(w3_instance, account, tx_cost(tx) + reserved): 
             return False
         
-        sig = w3_instance.eth.account.sign_transaction(tx, pk)
-        tx_hash = w3_instance.eth.send_raw_transaction(sig.raw_transaction)
-        rec = wait_for_tx(w3_instance, tx_hash, "Menambah likuiditas...")
+        tx_hash = TXS.send(w3_instance, tx, pk)
+        if CHECKPOINT is not None:
+            CHECKPOINT.record_tx(account, "liquidity", tx_hash, token_sym)
+        rec = confirm_after_approve(w3_instance, account, token_addr, approve_hash, tx_hash, "Menambah likuiditas...")
         if rec and rec.status == 1: 
             success(f"Likuiditas berhasil ditambah! Tx Hash: [yellow]{tx_hash.hex()}[/yellow]")
             return True
@@ -347,42 +455,190 @@ def add_liquidity(w3_instance, account, pk, token_sym, eth_wei):
         error(traceback.format_exc())
         return False
 
+def process_wallet(i, wallet, total_wallets, config, available_tokens, resume_token=None):
+    """
+    Jalankan pipeline swap + tambah likuiditas untuk satu dompet. Mengembalikan True jika sukses.
+    `resume_token` diisi jika swap dompet ini sudah sukses sebelum restart; swap dilewati.
+    """
+    console.print(Rule(f"Memproses dompet {i+1}/{total_wallets}: {wallet.address}", style="bold green"))
+    
+    # Generate random amounts untuk wallet ini
+    random_swap_amount = round(random.uniform(config['swap_amount_min'], config['swap_amount_max']), 6)
+    random_liquidity_amount = round(random.uniform(config['liquidity_amount_min'], config['liquidity_amount_max']), 6)
+    
+    info(f"Wallet ini akan menggunakan:")
+    info(f"  - Swap amount: {random_swap_amount} ETH")
+    info(f"  - Liquidity amount: {random_liquidity_amount} ETH")
+    
+    # Dapatkan proxy untuk wallet ini
+    wallet_proxy = get_proxy_for_wallet(i)
+    if wallet_proxy:
+        info(f"Menggunakan proxy untuk wallet ini")
+    else:
+        info(f"Menjalankan tanpa proxy")
+    
+    # Buat Web3 instance dengan proxy untuk wallet ini
+    w3_wallet = create_web3_with_proxy(wallet_proxy)
+    pk = wallet.key
+    
+    # Cek saldo ETH dengan error handling
+    try:
+        eth_balance = w3_wallet.eth.get_balance(wallet.address)
+        eth_balance_human = w3_wallet.from_wei(eth_balance, 'ether')
+        info(f"Saldo ETH: {eth_balance_human:.6f} ETH")
+    except Exception as e:
+        error(f"Gagal mengecek saldo ETH untuk wallet {wallet.address}: {e}")
+        warning(f"Melanjutkan ke wallet berikutnya...")
+        time.sleep(5)
+        return False
+    
+    if resume_token:
+        random_swap_amount = 0
+    # Cek apakah saldo cukup untuk operasi
+    # Biaya gas dari estimasi yang sudah di-cache (swap, approve token, addLiquidityETH) dengan fee saat ini
+    gas_reserve = (FEES.reserve_cost(w3_wallet, "swapExactETHForTokens", GAS_SW) if not resume_token else 0) \
+        + FEES.reserve_cost(w3_wallet, "approve", GAS_AP) + FEES.reserve_cost(w3_wallet, "addLiquidityETH", GAS_SW)
+    total_needed = w3_wallet.to_wei(random_swap_amount + random_liquidity_amount, 'ether') + gas_reserve
+    if eth_balance < total_needed:
+        warning(f"Saldo tidak cukup untuk operasi lengkap. Diperlukan minimal {w3_wallet.from_wei(total_needed, 'ether'):.6f} ETH")
+        return False
+    
+    # Langkah 1: Swap ETH ke token random
+    # Salinan per dompet agar urutan acak tidak saling menimpa antar worker
+    candidate_tokens = list(available_tokens)
+    random.shuffle(candidate_tokens)
+    swap_successful = resume_token is not None
+    successful_token = resume_token
+    if swap_successful:
+        info(f"Swap ETH -> {resume_token} sudah sukses sebelum restart, lanjut ke tambah likuiditas")
+        candidate_tokens = []
+    
+    for token_sym in candidate_tokens:
+        info(f"Mencoba swap ETH -> {token_sym}...")
+        amount_wei = w3_wallet.to_wei(random_swap_amount, 'ether')
+        
+        try:
+            if do_swap(w3_wallet, wallet.address, pk, "ETH", token_sym, amount_wei, mass_mode=True):
+                swap_successful = True
+                successful_token = token_sym
+                if CHECKPOINT is not None:
+                    CHECKPOINT.set_stage(wallet.address, STAGE_SWAPPED, token_sym)
+                break
+            else:
+                info(f"Swap ke {token_sym} gagal. Mencoba token berikutnya...")
+                time.sleep(2)
+        except Exception as e:
+            error(f"Error saat swap ke {token_sym}: {e}")
+            info(f"Mencoba token berikutnya...")
+            time.sleep(2)
+            continue
+    
+    if not swap_successful:
+        error(f"Gagal melakukan swap untuk dompet {wallet.address}")
+        return False
+    
+    # Jeda sebelum add liquidity
+    info(f"Menunggu {config['delay_between_operations']} detik sebelum menambah likuiditas...")
+    time.sleep(config['delay_between_operations'])
+    
+    # Langkah 2: Add Liquidity
+    info(f"Menambah likuiditas untuk pasangan ETH / {successful_token}...")
+    liquidity_eth_wei = w3_wallet.to_wei(random_liquidity_amount, 'ether')
+    
+    try:
+        if add_liquidity(w3_wallet, wallet.address, pk, successful_token, liquidity_eth_wei):
+            success(f"✅ Dompet {wallet.address} berhasil menyelesaikan semua operasi!")
+            return True
+        else:
+            error(f"❌ Gagal menambah likuiditas untuk dompet {wallet.address}")
+    except Exception as e:
+        error(f"❌ Error saat menambah likuiditas untuk dompet {wallet.address}: {e}")
+        warning(f"Melanjutkan ke wallet berikutnya...")
+    return False
+
+async def run_wallets_async(jobs, config, available_tokens, concurrency, resume, delay_between_wallets=0):
+    """Jalankan pipeline dompet (list (indeks, wallet)) memakai AsyncWeb3 dengan satu sesi aiohttp bersama."""
+    engine = AsyncSwapEngine(RPC, CHAIN, ROUTER_ADDR, CTX.weth_addr, TOKENS, FEES, GAS_AP, GAS_SW, SLIPPAGE, checkpoint=CHECKPOINT, approvals=CTX.approvals,
+                             quoter=QUOTER, routes=ROUTES, receipts=CTX.receipts)
+    wallet_jobs = [(w.address, w.key, get_proxy_for_wallet(i), resume.get(w.address)) for i, w in jobs]
+    async with engine:
+        return await engine.run(wallet_jobs, config, available_tokens, concurrency, delay_between_wallets)
+
+def recheck_pending(account):
+    """Cek ulang tx dompet yang di-broadcast sebelum restart tetapi belum punya receipt."""
+    for kind, tx_hash, token in CHECKPOINT.pending_txs(account):
+        rec = wait_for_tx(CTX.w3, Web3.to_bytes(hexstr=tx_hash), f"Memeriksa ulang tx {kind} dari run sebelumnya...")
+        if rec is None:
+            # Tx tidak pernah masuk blok; nonce lokal harus disinkron ulang dari node
+            CHECKPOINT.mark_tx(tx_hash, TX_DROPPED)
+            NONCES.reset(account)
+
+def resume_cycle(wallets):
+    """
+    Status dompet pada siklus yang dilanjutkan setelah restart.
+    Mengembalikan (set alamat yang sudah selesai, dict alamat -> token hasil swap yang sudah sukses).
+    """
+    pending = set(CHECKPOINT.wallets_with_pending())
+    done, swapped = set(), {}
+    for wallet in wallets:
+        if wallet.address in pending:
+            recheck_pending(wallet.address)
+        stage, _ = CHECKPOINT.wallet_state(wallet.address)
+        if stage == STAGE_DONE or CHECKPOINT.confirmed_token(wallet.address, "liquidity"):
+            done.add(wallet.address)
+            CHECKPOINT.set_stage(wallet.address, STAGE_DONE)
+            continue
+        token = CHECKPOINT.confirmed_token(wallet.address, "swap")
+        if token and token in TOKENS:
+            swapped[wallet.address] = token
+    return done, swapped
+
+def target_wallets(wallet_target):
+    """Dompet sesuai WALLET_TARGET ('all' atau indeks); hanya dompet ini yang diturunkan alamatnya."""
+    if wallet_target.lower() == 'all':
+        return CTX.wallets.all()
+    try:
+        wallet_index = int(wallet_target)
+    except ValueError:
+        raise ValueError(f"Target dompet '{wallet_target}' tidak valid. Gunakan nomor atau 'all'.") from None
+    if not 0 <= wallet_index < len(CTX.wallets):
+        raise ValueError(f"Indeks dompet {wallet_index} tidak valid.")
+    return CTX.wallets.select([wallet_index])
+
 def automated_swap_and_liquidity():
     """Fungsi utama untuk swap dan tambah likuiditas otomatis"""
     info("Memulai proses otomatis Swap + Add Liquidity...")
+    METRICS.begin_run()
     
     # Konfigurasi dari environment variables atau default
-    swap_amount_min = float(os.getenv("SWAP_AMOUNT_MIN", "0.0001"))
-    swap_amount_max = float(os.getenv("SWAP_AMOUNT_MAX", "0.002"))
-    liquidity_amount_min = float(os.getenv("LIQUIDITY_AMOUNT_MIN", "0.0001"))
-    liquidity_amount_max = float(os.getenv("LIQUIDITY_AMOUNT_MAX", "0.002"))
+    config = {
+        'swap_amount_min': float(os.getenv("SWAP_AMOUNT_MIN", "0.0001")),
+        'swap_amount_max': float(os.getenv("SWAP_AMOUNT_MAX", "0.002")),
+        'liquidity_amount_min': float(os.getenv("LIQUIDITY_AMOUNT_MIN", "0.0001")),
+        'liquidity_amount_max': float(os.getenv("LIQUIDITY_AMOUNT_MAX", "0.002")),
+        'delay_between_operations': int(os.getenv("DELAY_BETWEEN_OPERATIONS", "5")),
+    }
     wallet_target = os.getenv("WALLET_TARGET", "all")
     delay_between_wallets = int(os.getenv("DELAY_BETWEEN_WALLETS", "10"))
-    delay_between_operations = int(os.getenv("DELAY_BETWEEN_OPERATIONS", "5"))
+    max_concurrent_wallets = max(1, int(os.getenv("MAX_CONCURRENT_WALLETS", "1")))
     
     info(f"Konfigurasi:")
-    info(f"  - Jumlah swap: Random antara {swap_amount_min} - {swap_amount_max} ETH")
-    info(f"  - Jumlah likuiditas: Random antara {liquidity_amount_min} - {liquidity_amount_max} ETH")
+    info(f"  - Jumlah swap: Random antara {config['swap_amount_min']} - {config['swap_amount_max']} ETH")
+    info(f"  - Jumlah likuiditas: Random antara {config['liquidity_amount_min']} - {config['liquidity_amount_max']} ETH")
     info(f"  - Target dompet: {wallet_target}")
     info(f"  - Jeda antar dompet: {delay_between_wallets} detik")
-    info(f"  - Jeda antar operasi: {delay_between_operations} detik")
+    info(f"  - Jeda antar operasi: {config['delay_between_operations']} detik")
+    info(f"  - Dompet paralel: {max_concurrent_wallets}")
     info(f"  - Jumlah proxy tersedia: {len(PROXIES)}")
     
     # Tentukan dompet mana yang akan diproses
-    wallets_to_process = []
+    try:
+        wallets_to_process = target_wallets(wallet_target)
+    except ValueError as e:
+        error(str(e))
+        return
     if wallet_target.lower() == 'all':
-        wallets_to_process = accounts
         info(f"Mode 'all' aktif. Memproses {len(wallets_to_process)} dompet.")
-    else:
-        try:
-            wallet_index = int(wallet_target)
-            if wallet_index >= len(accounts):
-                error(f"Indeks dompet {wallet_index} tidak valid.")
-                return
-            wallets_to_process.append(accounts[wallet_index])
-        except ValueError:
-            error(f"Target dompet '{wallet_target}' tidak valid. Gunakan nomor atau 'all'.")
-            return
     
     # Token yang tersedia untuk swap (exclude ETH dan WETH)
     available_tokens = [s for s in TOKENS if s not in ['ETH', 'WETH'] and TOKENS[s].get('address')]
@@ -390,169 +646,167 @@ def automated_swap_and_liquidity():
         error("Tidak ada token yang tersedia untuk swap.")
         return
     
-    success_count = 0
+    # Hanya coba token yang punya pair WETH dengan reserve memadai
+    try:
+        refresh_pool_index()
+        liquid_tokens = [s for s in available_tokens if POOLS.is_liquid(TOKENS[s]['address'], CTX.weth_addr)]
+        info(f"Indeks pool: {len(liquid_tokens)} dari {len(available_tokens)} token memiliki pool WETH likuid")
+        if liquid_tokens:
+            available_tokens = liquid_tokens
+    except Exception as e:
+        warning(f"Gagal memperbarui indeks pool, mencoba semua token: {e}")
+    
     total_wallets = len(wallets_to_process)
     
-    for i, wallet in enumerate(wallets_to_process):
-        console.print(Rule(f"Memproses dompet {i+1}/{total_wallets}: {wallet.address}", style="bold green"))
-        
-        # Generate random amounts untuk wallet ini
-        random_swap_amount = round(random.uniform(swap_amount_min, swap_amount_max), 6)
-        random_liquidity_amount = round(random.uniform(liquidity_amount_min, liquidity_amount_max), 6)
-        
-        info(f"Wallet ini akan menggunakan:")
-        info(f"  - Swap amount: {random_swap_amount} ETH")
-        info(f"  - Liquidity amount: {random_liquidity_amount} ETH")
-        
-        # Dapatkan proxy untuk wallet ini
-        wallet_proxy = get_proxy_for_wallet(i)
-        if wallet_proxy:
-            info(f"Menggunakan proxy untuk wallet ini")
-        else:
-            info(f"Menjalankan tanpa proxy")
-        
-        # Buat Web3 instance dengan proxy untuk wallet ini
-        w3_wallet = create_web3_with_proxy(wallet_proxy)
-        
-        # Cek saldo ETH dengan error handling
-        try:
-            eth_balance = w3_wallet.eth.get_balance(wallet.address)
-            eth_balance_human = w3_wallet.from_wei(eth_balance, 'ether')
-            info(f"Saldo ETH: {eth_balance_human:.6f} ETH")
-        except Exception as e:
-            error(f"Gagal mengecek saldo ETH untuk wallet {wallet.address}: {e}")
-            warning(f"Melanjutkan ke wallet berikutnya...")
-            time.sleep(5)
-            continue
-        
-        # Cek apakah saldo cukup untuk operasi
-        total_needed = w3_wallet.to_wei(random_swap_amount + random_liquidity_amount, 'ether') + (GAS_SW * GAS_P * 2)
-        if eth_balance < total_needed:
-            warning(f"Saldo tidak cukup untuk operasi lengkap. Diperlukan minimal {w3_wallet.from_wei(total_needed, 'ether'):.6f} ETH")
-            continue
-        
-        # Langkah 1: Swap ETH ke token random
-        random.shuffle(available_tokens)
-        swap_successful = False
-        successful_token = None
-        
-        for token_sym in available_tokens:
-            info(f"Mencoba swap ETH -> {token_sym}...")
-            amount_wei = w3_wallet.to_wei(random_swap_amount, 'ether')
-            
+    # Checkpoint: lanjutkan siklus yang terhenti, lewati dompet yang sudah selesai
+    global CHECKPOINT
+    if CHECKPOINT is None:
+        CHECKPOINT = Checkpoint()
+    done, resume = set(), {}
+    if CHECKPOINT.begin_cycle():
+        done, resume = resume_cycle(wallets_to_process)
+        info(f"Melanjutkan siklus yang terhenti: {len(done)} dompet sudah selesai, {len(resume)} dompet tinggal tambah likuiditas")
+        JOURNAL.event("cycle_resume", done=len(done), swapped=len(resume))
+    jobs = [(i, w) for i, w in enumerate(wallets_to_process) if w.address not in done]
+    TXS.use_processes(len(jobs) >= SIGN_PROCESS_MIN_WALLETS)
+    
+    def run_wallet(i, wallet):
+        start = time.time()
+        with bind(wallet=wallet.address):
+            JOURNAL.event("wallet_start", index=i)
             try:
-                if do_swap(w3_wallet, wallet.address, PK_LIST[accounts.index(wallet)], "ETH", token_sym, amount_wei, mass_mode=True):
-                    swap_successful = True
-                    successful_token = token_sym
-                    break
-                else:
-                    info(f"Swap ke {token_sym} gagal. Mencoba token berikutnya...")
-                    time.sleep(2)
+                ok = process_wallet(i, wallet, total_wallets, config, available_tokens, resume.get(wallet.address))
             except Exception as e:
-                error(f"Error saat swap ke {token_sym}: {e}")
-                info(f"Mencoba token berikutnya...")
-                time.sleep(2)
-                continue
-        
-        if not swap_successful:
-            error(f"Gagal melakukan swap untuk dompet {wallet.address}")
-            continue
-        
-        # Jeda sebelum add liquidity
-        info(f"Menunggu {delay_between_operations} detik sebelum menambah likuiditas...")
-        time.sleep(delay_between_operations)
-        
-        # Langkah 2: Add Liquidity
-        info(f"Menambah likuiditas untuk pasangan ETH / {successful_token}...")
-        liquidity_eth_wei = w3_wallet.to_wei(random_liquidity_amount, 'ether')
-        
-        try:
-            if add_liquidity(w3_wallet, wallet.address, PK_LIST[accounts.index(wallet)], successful_token, liquidity_eth_wei):
-                success_count += 1
-                success(f"✅ Dompet {wallet.address} berhasil menyelesaikan semua operasi!")
-            else:
-                error(f"❌ Gagal menambah likuiditas untuk dompet {wallet.address}")
-        except Exception as e:
-            error(f"❌ Error saat menambah likuiditas untuk dompet {wallet.address}: {e}")
-            warning(f"Melanjutkan ke wallet berikutnya...")
-        
-        # Jeda antar dompet
+                error(f"❌ Error tidak terduga untuk dompet {wallet.address}: {e}")
+                ok = False
+            CHECKPOINT.set_stage(wallet.address, STAGE_DONE if ok else STAGE_FAILED)
+            JOURNAL.event("wallet_done", level="info" if ok else "warning", ok=ok, duration_ms=round((time.time() - start) * 1000, 1))
+        # Jeda antar dompet, dihitung per worker
         if i < total_wallets - 1:
             info(f"Menunggu {delay_between_wallets} detik sebelum lanjut ke dompet berikutnya...")
             time.sleep(delay_between_wallets)
+        return ok
+    
+    if os.getenv("ASYNC_MODE", "false").lower() == 'true':
+        info("Mode async aktif - semua dompet dijalankan di satu event loop")
+        if len(RPC_URLS) > 1:
+            warning(f"Mode async hanya memakai RPC pertama ({RPC}); failover ke {len(RPC_URLS) - 1} endpoint lain di RPC_URLS tidak aktif")
+        if PIPELINE_APPROVE:
+            warning("PIPELINE_APPROVE diabaikan di mode async: approve ditunggu receipt-nya sebelum swap/tambah likuiditas")
+        results = asyncio.run(run_wallets_async(jobs, config, available_tokens, max_concurrent_wallets, resume, delay_between_wallets))
+    elif max_concurrent_wallets == 1:
+        results = [run_wallet(i, wallet) for i, wallet in jobs]
+    else:
+        with ThreadPoolExecutor(max_workers=max_concurrent_wallets) as executor:
+            futures = [executor.submit(run_wallet, i, wallet) for i, wallet in jobs]
+            results = [f.result() for f in futures]
+    CHECKPOINT.finish_cycle()
+    success_count = len(done) + sum(1 for ok in results if ok)
     
     # Ringkasan hasil
     console.print(Rule("RINGKASAN HASIL", style="bold magenta"))
     success(f"Berhasil memproses {success_count} dari {total_wallets} dompet")
     if success_count < total_wallets:
         warning(f"{total_wallets - success_count} dompet gagal diproses")
+    try:
+        report = METRICS.write_json(METRICS_REPORT, wallets=total_wallets, successful=success_count)
+        JOURNAL.event("run_done", wallets=total_wallets, successful=success_count, duration_s=report["duration_s"], rpc_calls=report["rpc"]["calls"])
+        info(f"Metrik run: {report['rpc']['calls']} panggilan RPC ({report['rpc']['calls'] / max(total_wallets, 1):.1f}/dompet), {report['rpc']['retries']} retry" + (f", laporan di [bold]{METRICS_REPORT}[/bold]" if METRICS_REPORT else ""))
+    except Exception as e:
+        warning(f"Gagal menulis laporan metrik: {e}")
     info("Proses otomatis selesai!")
 
 def display_wallet_summary():
+    try:
+        wallets = target_wallets(os.getenv("WALLET_TARGET", "all"))
+    except ValueError:
+        # Target tidak valid dilaporkan saat run dimulai
+        return
     table = Table(title="Ringkasan Dompet", border_style="magenta", show_header=True, header_style="bold cyan")
     table.add_column("Indeks", style="cyan", width=6)
     table.add_column("Alamat Dompet", style="white")
     table.add_column("Saldo ETH", style="green", justify="right")
-    for idx, acc in enumerate(accounts):
-        try:
-            bal_wei = w3.eth.get_balance(acc.address)
-            bal_eth = w3.from_wei(bal_wei, 'ether')
-            table.add_row(str(idx), acc.address, f"{bal_eth:.6f} ETH")
-        except Exception:
-            table.add_row(str(idx), acc.address, "[red]Gagal[/red]")
+    try:
+        balances = eth_balances(CTX.w3, [acc.address for acc in wallets])
+    except Exception:
+        balances = {}
+    for acc in wallets:
+        bal_wei = balances.get(acc.address)
+        if bal_wei is not None:
+            bal_eth = CTX.w3.from_wei(bal_wei, 'ether')
+            table.add_row(str(acc.index), acc.address, f"{bal_eth:.6f} ETH")
+        else:
+            table.add_row(str(acc.index), acc.address, "[red]Gagal[/red]")
     console.print(table)
 
+CYCLE_INTERVAL = 24 * 3600
+
+def wait_for_next_cycle(name, next_run):
+    """Tampilkan jadwal siklus berikutnya; dipanggil penjadwal saat mulai menunggu."""
+    wait_hours = max(0, next_run - time.time()) / 3600
+    next_run_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(next_run))
+    
+    console.print(Rule(f"[bold yellow]Menunggu Siklus Berikutnya[/bold yellow]", style="yellow"))
+    info(f"Bot akan berjalan lagi dalam {wait_hours:.2f} jam")
+    info(f"Jadwal siklus berikutnya: {next_run_time}")
+    JOURNAL.event("cycle_scheduled", next_run=round(next_run, 1))
+
 def run_continuous_automation():
-    """Fungsi untuk menjalankan bot secara kontinyu dengan restart 24 jam"""
+    """
+    Jalankan siklus otomatis setiap 24 jam lewat penjadwal persisten (schedule.db),
+    sehingga restart tidak mengulang siklus yang sudah selesai maupun melewatkan jadwal.
+    """
+    global CHECKPOINT
+    if CHECKPOINT is None:
+        CHECKPOINT = Checkpoint()
     cycle_count = 0
     
-    while True:
+    def run_cycle():
+        nonlocal cycle_count
         cycle_count += 1
         start_time = time.time()
         
         console.print(Rule(f"[bold cyan]Siklus #{cycle_count} - {time.strftime('%Y-%m-%d %H:%M:%S')}[/bold cyan]", style="cyan"))
+        JOURNAL.event("cycle_start", cycle=cycle_count)
         
         try:
+            # Ambil token hasil refresh background dari siklus sebelumnya
+            if cycle_count > 1:
+                fetch_and_load_tokens()
+            
             # Jalankan proses otomatis
             automated_swap_and_liquidity()
             
-            # Hitung waktu selesai
-            end_time = time.time()
-            duration = end_time - start_time
-            duration_hours = duration / 3600
+            # Siklus yang dilanjutkan dihitung dari awal siklus aslinya
+            if CHECKPOINT.started_at:
+                start_time = min(start_time, CHECKPOINT.started_at)
+            duration = time.time() - start_time
             
-            info(f"Siklus #{cycle_count} selesai dalam {duration_hours:.2f} jam")
+            info(f"Siklus #{cycle_count} selesai dalam {duration / 3600:.2f} jam")
+            JOURNAL.event("cycle_done", cycle=cycle_count, duration_s=round(duration, 1))
             
         except Exception as e:
             error(f"Error dalam siklus #{cycle_count}: {e}")
             import traceback
             error(traceback.format_exc())
-        
-        # Hitung waktu tunggu untuk siklus berikutnya
-        hours_to_wait = 24
-        seconds_to_wait = hours_to_wait * 3600
-        
-        # Kurangi waktu yang sudah terpakai
-        actual_wait_time = max(0, seconds_to_wait - duration)
-        actual_wait_hours = actual_wait_time / 3600
-        
-        next_run_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time.time() + actual_wait_time))
-        
-        console.print(Rule(f"[bold yellow]Menunggu Siklus Berikutnya[/bold yellow]", style="yellow"))
-        info(f"Bot akan berjalan lagi dalam {actual_wait_hours:.2f} jam")
-        info(f"Jadwal siklus berikutnya: {next_run_time}")
-        
-        # Tampilkan countdown
-        if actual_wait_time > 0:
-            with console.status(f"[bold green]Menunggu siklus berikutnya... ({actual_wait_hours:.1f} jam tersisa)[/bold green]", spinner="dots") as status:
-                time.sleep(actual_wait_time)
-        
-        console.print(Rule(f"[bold green]Memulai Siklus #{cycle_count + 1}[/bold green]", style="green"))
+    
+    # Satu siklus pada satu waktu, dijalankan di thread utama agar Ctrl+C langsung menghentikannya
+    scheduler = Scheduler(workers=0, on_idle=wait_for_next_cycle)
+    # Belum ada jadwal tersimpan (mis. pertama kali memakai penjadwal): lanjutkan dari siklus terakhir di checkpoint
+    last = CHECKPOINT.last_cycle()
+    first_run = last[0] + CYCLE_INTERVAL if last and last[1] is not None else None
+    scheduler.add("auto_swap_liquidity", run_cycle, CYCLE_INTERVAL, first_run=first_run)
+    scheduler.run()
 
 if __name__ == "__main__":
     try:
         console.print(Rule("[bold magenta]Automated Swap & Liquidity Bot v1.0 (Multi-Proxy Support + 24h Auto-Restart)[/bold magenta]"))
         
+        if serve_prometheus():
+            info(f"Endpoint metrik Prometheus aktif di port {METRICS_PORT} (/metrics)")
+        
+        connect_rpc()
+        
         # Load tokens
         fetch_and_load_tokens()
         
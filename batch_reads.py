@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Lapisan baca batch untuk saldo token, allowance, saldo ETH dan panggilan view kontrak lain (mis. getPair, getReserves).
+Memakai Multicall3 `aggregate3` jika kontraknya ter-deploy di chain,
+lalu JSON-RPC batch biasa, dan terakhir panggilan satu per satu.
+"""
+
+from eth_utils import get_abi_output_types
+from web3 import Web3
+
+from abis import ERC20_ABI, MULTICALL3_ABI
+from rpc_pool import get_contract
+
+# Alamat Multicall3 yang sama di hampir semua chain EVM
+MULTICALL3_ADDR = Web3.to_checksum_address("0xcA11bde05977b3631167028862bE2a173976CA11")
+MULTICALL_CHUNK = 250
+RPC_BATCH_CHUNK = 100
+
+# Cache ketersediaan Multicall3 per endpoint RPC
+_MULTICALL_AVAILABLE = {}
+
+def _endpoint_key(w3_instance):
+    return getattr(w3_instance.provider, "endpoint_uri", None) or id(w3_instance.provider)
+
+def has_multicall(w3_instance):
+    """Cek (sekali per endpoint) apakah Multicall3 ter-deploy."""
+    key = _endpoint_key(w3_instance)
+    if key not in _MULTICALL_AVAILABLE:
+        try:
+            _MULTICALL_AVAILABLE[key] = len(w3_instance.eth.get_code(MULTICALL3_ADDR)) > 0
+        except Exception:
+            _MULTICALL_AVAILABLE[key] = False
+    return _MULTICALL_AVAILABLE[key]
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def _decode_output(w3_instance, contract, fn_name, data):
+    output_types = get_abi_output_types(contract.get_function_by_name(fn_name).abi)
+    values = w3_instance.codec.decode(output_types, data)
+    # Codec mentah mengembalikan alamat huruf kecil; samakan dengan hasil contract.call()
+    values = [Web3.to_checksum_address(v) if t == "address" else v for t, v in zip(output_types, values)]
+    return values[0] if len(values) == 1 else list(values)
+
+def _multicall(w3_instance, calls):
+    multicall = get_contract(w3_instance, MULTICALL3_ADDR, MULTICALL3_ABI)
+    results = []
+    for chunk in _chunks(calls, MULTICALL_CHUNK):
+        payload = [(c.address, True, c.encode_abi(fn_name, args=args)) for c, fn_name, args in chunk]
+        returned = multicall.functions.aggregate3(payload).call()
+        for (c, fn_name, _), (ok, data) in zip(chunk, returned):
+            if not ok or not data:
+                results.append(None)
+                continue
+            try:
+                results.append(_decode_output(w3_instance, c, fn_name, data))
+            except Exception:
+                results.append(None)
+    return results
+
+def _rpc_batch(w3_instance, requests_fn):
+    """Jalankan daftar fungsi pembuat request dalam JSON-RPC batch per potongan."""
+    results = []
+    for chunk in _chunks(requests_fn, RPC_BATCH_CHUNK):
+        with w3_instance.batch_requests() as batch:
+            for make_request in chunk:
+                batch.add(make_request())
+            results.extend(batch.execute())
+    return results
+
+def _sequential(requests_fn):
+    results = []
+    for make_request in requests_fn:
+        try:
+            results.append(make_request())
+        except Exception:
+            results.append(None)
+    return results
+
+def batch_call(w3_instance, calls):
+    """
+    Jalankan banyak panggilan view sekaligus.
+    `calls` berisi tuple (contract, fn_name, args); hasil None untuk panggilan yang gagal.
+    """
+    if not calls:
+        return []
+    if has_multicall(w3_instance):
+        try:
+            return _multicall(w3_instance, calls)
+        except Exception:
+            pass
+    requests_fn = [lambda c=c, fn_name=fn_name, args=args: c.functions[fn_name](*args) for c, fn_name, args in calls]
+    try:
+        return _rpc_batch(w3_instance, requests_fn)
+    except Exception:
+        return _sequential([lambda f=f: f().call() for f in requests_fn])
+
+def token_balances(w3_instance, owner, token_addrs):
+    """Saldo `owner` untuk setiap token. Mengembalikan dict address -> saldo (None jika gagal)."""
+    calls = [(get_contract(w3_instance, addr, ERC20_ABI), "balanceOf", [owner]) for addr in token_addrs]
+    return dict(zip(token_addrs, batch_call(w3_instance, calls)))
+
+def allowances(w3_instance, owner, token_addrs, spender):
+    """Allowance `owner` ke `spender` untuk setiap token. Mengembalikan dict address -> allowance."""
+    calls = [(get_contract(w3_instance, addr, ERC20_ABI), "allowance", [owner, spender]) for addr in token_addrs]
+    return dict(zip(token_addrs, batch_call(w3_instance, calls)))
+
+def eth_balances(w3_instance, addresses):
+    """Saldo ETH untuk banyak alamat. Mengembalikan dict address -> saldo wei (None jika gagal)."""
+    if not addresses:
+        return {}
+    if has_multicall(w3_instance):
+        multicall = get_contract(w3_instance, MULTICALL3_ADDR, MULTICALL3_ABI)
+        try:
+            results = _multicall(w3_instance, [(multicall, "getEthBalance", [addr]) for addr in addresses])
+            return dict(zip(addresses, results))
+        except Exception:
+            pass
+    requests_fn = [lambda addr=addr: w3_instance.eth.get_balance(addr) for addr in addresses]
+    try:
+        return dict(zip(addresses, _rpc_batch(w3_instance, requests_fn)))
+    except Exception:
+        return dict(zip(addresses, _sequential(requests_fn)))
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Server JSON-RPC lokal yang meniru chain MegaETH untuk benchmark offline.
+Menyimulasikan router UniswapV2 (getAmountsOut, swap*, addLiquidityETH), factory,
+pair (getReserves), token ERC20 dan Multicall3. Setiap transaksi langsung ditambang
+ke blok baru sehingga receipt bisa diambil seketika.
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import rlp
+from eth_abi import decode as abi_decode, encode as abi_encode
+from eth_account import Account
+from eth_utils import function_signature_to_4byte_selector, keccak, to_checksum_address
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from batch_reads import MULTICALL3_ADDR  # noqa: E402
+
+CHAIN_ID = 6342
+ROUTER_ADDR = to_checksum_address("0xa6b579684e943f7d00d616a48cf99b5147fc57a5")
+WETH_ADDR = to_checksum_address("0x" + "e1" * 20)
+FACTORY_ADDR = to_checksum_address("0x" + "fa" * 20)
+MAX_UINT = 2**256 - 1
+GAS_USED = 120_000
+BASE_FEE = 10**6
+
+class Revert(Exception):
+    pass
+
+def _addr(i, prefix):
+    return to_checksum_address(f"0x{prefix}{i:0{40 - len(prefix)}x}")
+
+def _hex(value):
+    return hex(value)
+
+def _selector(signature):
+    return function_signature_to_4byte_selector(signature)
+
+# Selector -> (nama, tipe input)
+FUNCTIONS = {}
+for _sig, _name, _types in [
+    ("getAmountsOut(uint256,address[])", "getAmountsOut", ["uint256", "address[]"]),
+    ("swapExactETHForTokens(uint256,address[],address,uint256)", "swapExactETHForTokens", ["uint256", "address[]", "address", "uint256"]),
+    ("swapExactTokensForETH(uint256,uint256,address[],address,uint256)", "swapExactTokensForETH", ["uint256", "uint256", "address[]", "address", "uint256"]),
+    ("swapExactTokensForTokens(uint256,uint256,address[],address,uint256)", "swapExactTokensForTokens", ["uint256", "uint256", "address[]", "address", "uint256"]),
+    ("addLiquidityETH(address,uint256,uint256,uint256,address,uint256)", "addLiquidityETH", ["address", "uint256", "uint256", "uint256", "address", "uint256"]),
+    ("WETH()", "WETH", []),
+    ("factory()", "factory", []),
+    ("getPair(address,address)", "getPair", ["address", "address"]),
+    ("getReserves()", "getReserves", []),
+    ("balanceOf(address)", "balanceOf", ["address"]),
+    ("allowance(address,address)", "allowance", ["address", "address"]),
+    ("approve(address,uint256)", "approve", ["address", "uint256"]),
+    ("decimals()", "decimals", []),
+    ("symbol()", "symbol", []),
+    ("aggregate3((address,bool,bytes)[])", "aggregate3", ["(address,bool,bytes)[]"]),
+    ("getEthBalance(address)", "getEthBalance", ["address"]),
+    ("getBlockNumber()", "getBlockNumber", []),
+]:
+    FUNCTIONS[_selector(_sig)] = (_name, _types)
+
+class FakeChain:
+    """State chain di memori: saldo, reserve pool, allowance, nonce dan receipt."""
+
+    def __init__(self, n_tokens=10, n_quote_only=2, initial_eth=10 * 10**18, multicall=True):
+        self.multicall = multicall
+        self.lock = threading.RLock()
+        self.eth = defaultdict(lambda: initial_eth)
+        self.erc20 = defaultdict(int)
+        self.allow = defaultdict(int)
+        self.nonces = defaultdict(int)
+        self.receipts = {}
+        self.block = 1
+        self.calls = Counter()
+        self.http_requests = 0
+        self.tokens = {}
+        self.pairs = {}
+        self.reserves = {}
+
+        self.quote_token = _addr(1, "c0")
+        self.tokens[self.quote_token] = "USDQ"
+        self._add_pair(WETH_ADDR, self.quote_token, 500 * 10**18, 1_000_000 * 10**18)
+        for i in range(n_tokens):
+            token = _addr(i + 1, "70")
+            self.tokens[token] = f"TK{i + 1}"
+            self._add_pair(WETH_ADDR, token, 100 * 10**18, 100_000 * 10**18)
+        # Token yang hanya punya pool dengan quote token (butuh rute multi-hop)
+        for i in range(n_quote_only):
+            token = _addr(i + 1, "71")
+            self.tokens[token] = f"QT{i + 1}"
+            self._add_pair(self.quote_token, token, 200_000 * 10**18, 100_000 * 10**18)
+
+    # --- state pool ---
+
+    def _add_pair(self, token_a, token_b, amount_a, amount_b):
+        token0, token1 = sorted([token_a, token_b], key=lambda a: int(a, 16))
+        pair = _addr(len(self.pairs) + 1, "9a")
+        self.pairs[(token0, token1)] = pair
+        self.reserves[pair] = [amount_a, amount_b] if token0 == token_a else [amount_b, amount_a]
+
+    def _pair_for(self, token_a, token_b):
+        return self.pairs.get(tuple(sorted([token_a, token_b], key=lambda a: int(a, 16))))
+
+    def _get_reserves(self, token_a, token_b):
+        pair = self._pair_for(token_a, token_b)
+        if pair is None:
+            raise Revert("UniswapV2Library: PAIR_NOT_FOUND")
+        r0, r1 = self.reserves[pair]
+        token0 = min(token_a, token_b, key=lambda a: int(a, 16))
+        return (pair, r0, r1) if token0 == token_a else (pair, r1, r0)
+
+    def _amounts_out(self, amount_in, path):
+        if len(path) < 2:
+            raise Revert("UniswapV2Library: INVALID_PATH")
+        amounts = [amount_in]
+        for token_in, token_out in zip(path, path[1:]):
+            _, reserve_in, reserve_out = self._get_reserves(token_in, token_out)
+            amount_in_with_fee = amounts[-1] * 997
+            amounts.append(amount_in_with_fee * reserve_out // (reserve_in * 1000 + amount_in_with_fee))
+        return amounts
+
+    def _apply_swap(self, amounts, path):
+        for (token_in, token_out), amount_in, amount_out in zip(zip(path, path[1:]), amounts, amounts[1:]):
+            pair, _, _ = self._get_reserves(token_in, token_out)
+            token0 = min(token_in, token_out, key=lambda a: int(a, 16))
+            if token0 == token_in:
+                self.reserves[pair][0] += amount_in
+                self.reserves[pair][1] -= amount_out
+            else:
+                self.reserves[pair][1] += amount_in
+                self.reserves[pair][0] -= amount_out
+
+    def _pull_token(self, token, owner, amount):
+        if self.erc20[(token, owner)] < amount:
+            raise Revert("TransferHelper: TRANSFER_FROM_FAILED (saldo)")
+        allowance = self.allow[(token, owner, ROUTER_ADDR)]
+        if allowance < amount:
+            raise Revert("TransferHelper: TRANSFER_FROM_FAILED (allowance)")
+        if allowance != MAX_UINT:
+            self.allow[(token, owner, ROUTER_ADDR)] = allowance - amount
+        self.erc20[(token, owner)] -= amount
+
+    # --- eksekusi kontrak ---
+
+    def call(self, to, data, sender=None, value=0, write=False):
+        """Jalankan satu panggilan kontrak. Mengembalikan bytes hasil ABI-encode."""
+        to = to_checksum_address(to)
+        entry = FUNCTIONS.get(bytes(data[:4]))
+        if entry is None:
+            raise Revert("fungsi tidak dikenal")
+        name, types = entry
+        args = abi_decode(types, bytes(data[4:])) if types else ()
+
+        if to == ROUTER_ADDR:
+            if name == "WETH":
+                return abi_encode(["address"], [WETH_ADDR])
+            if name == "factory":
+                return abi_encode(["address"], [FACTORY_ADDR])
+            if name == "getAmountsOut":
+                return abi_encode(["uint256[]"], [self._amounts_out(args[0], [to_checksum_address(a) for a in args[1]])])
+            if not write:
+                raise Revert("simulasi eth_call untuk transaksi tidak didukung")
+            return self._router_tx(name, args, sender, value)
+        if to == FACTORY_ADDR and name == "getPair":
+            pair = self._pair_for(to_checksum_address(args[0]), to_checksum_address(args[1]))
+            return abi_encode(["address"], [pair or "0x" + "00" * 20])
+        if to in self.reserves and name == "getReserves":
+            r0, r1 = self.reserves[to]
+            return abi_encode(["uint112", "uint112", "uint32"], [r0, r1, int(time.time()) % 2**32])
+        if to in self.tokens or to == WETH_ADDR:
+            if name == "balanceOf":
+                return abi_encode(["uint256"], [self.erc20[(to, to_checksum_address(args[0]))]])
+            if name == "allowance":
+                return abi_encode(["uint256"], [self.allow[(to, to_checksum_address(args[0]), to_checksum_address(args[1]))]])
+            if name == "decimals":
+                return abi_encode(["uint8"], [18])
+            if name == "symbol":
+                return abi_encode(["string"], [self.tokens.get(to, "WETH")])
+            if name == "approve" and write:
+                self.allow[(to, sender, to_checksum_address(args[0]))] = args[1]
+                return abi_encode(["bool"], [True])
+        if to == MULTICALL3_ADDR and self.multicall:
+            if name == "getEthBalance":
+                return abi_encode(["uint256"], [self.eth[to_checksum_address(args[0])]])
+            if name == "getBlockNumber":
+                return abi_encode(["uint256"], [self.block])
+            if name == "aggregate3":
+                results = []
+                for target, allow_failure, call_data in args[0]:
+                    try:
+                        results.append((True, self.call(target, call_data)))
+                    except Revert:
+                        if not allow_failure:
+                            raise
+                        results.append((False, b""))
+                return abi_encode(["(bool,bytes)[]"], [results])
+        raise Revert(f"{name} tidak didukung di {to}")
+
+    def _router_tx(self, name, args, sender, value):
+        if name == "swapExactETHForTokens":
+            min_out, path, to, _ = args
+            path = [to_checksum_address(a) for a in path]
+            if path[0] != WETH_ADDR:
+                raise Revert("UniswapV2Router: INVALID_PATH")
+            amounts = self._amounts_out(value, path)
+            if amounts[-1] < min_out:
+                raise Revert("UniswapV2Router: INSUFFICIENT_OUTPUT_AMOUNT")
+            self._apply_swap(amounts, path)
+            self.erc20[(path[-1], to_checksum_address(to))] += amounts[-1]
+            return abi_encode(["uint256[]"], [amounts])
+        if name in ("swapExactTokensForETH", "swapExactTokensForTokens"):
+            amount_in, min_out, path, to, _ = args
+            path = [to_checksum_address(a) for a in path]
+            if name == "swapExactTokensForETH" and path[-1] != WETH_ADDR:
+                raise Revert("UniswapV2Router: INVALID_PATH")
+            amounts = self._amounts_out(amount_in, path)
+            if amounts[-1] < min_out:
+                raise Revert("UniswapV2Router: INSUFFICIENT_OUTPUT_AMOUNT")
+            self._pull_token(path[0], sender, amount_in)
+            self._apply_swap(amounts, path)
+            if name == "swapExactTokensForETH":
+                self.eth[to_checksum_address(to)] += amounts[-1]
+            else:
+                self.erc20[(path[-1], to_checksum_address(to))] += amounts[-1]
+            return abi_encode(["uint256[]"], [amounts])
+        if name == "addLiquidityETH":
+            token, token_desired, token_min, eth_min, to, _ = args
+            token = to_checksum_address(token)
+            pair, reserve_weth, reserve_token = self._get_reserves(WETH_ADDR, token)
+            token_optimal = value * reserve_token // reserve_weth
+            if token_optimal <= token_desired:
+                if token_optimal < token_min:
+                    raise Revert("UniswapV2Router: INSUFFICIENT_B_AMOUNT")
+                amount_token, amount_eth = token_optimal, value
+            else:
+                eth_optimal = token_desired * reserve_weth // reserve_token
+                if eth_optimal < eth_min:
+                    raise Revert("UniswapV2Router: INSUFFICIENT_A_AMOUNT")
+                amount_token, amount_eth = token_desired, eth_optimal
+            self._pull_token(token, sender, amount_token)
+            token0 = min(WETH_ADDR, token, key=lambda a: int(a, 16))
+            if token0 == WETH_ADDR:
+                self.reserves[pair][0] += amount_eth
+                self.reserves[pair][1] += amount_token
+            else:
+                self.reserves[pair][0] += amount_token
+                self.reserves[pair][1] += amount_eth
+            # Sisa ETH dikembalikan ke pengirim
+            self.eth[sender] += value - amount_eth
+            return abi_encode(["uint256", "uint256", "uint256"], [amount_token, amount_eth, amount_eth])
+        raise Revert(f"{name} tidak didukung")
+
+    # --- transaksi ---
+
+    def send_raw(self, raw_hex):
+        raw = bytes.fromhex(raw_hex[2:] if raw_hex.startswith("0x") else raw_hex)
+        tx_hash = "0x" + keccak(raw).hex()
+        sender = Account.recover_transaction(raw)
+        if raw[0] == 2:
+            fields = rlp.decode(raw[1:])
+            nonce, gas_price, gas, to, value, data = fields[1], fields[3], fields[4], fields[5], fields[6], fields[7]
+            tx_type = 2
+        else:
+            nonce, gas_price, gas, to, value, data = rlp.decode(raw)[:6]
+            tx_type = 0
+        nonce, gas_price, gas, value = (int.from_bytes(x, "big") for x in (nonce, gas_price, gas, value))
+        to = to_checksum_address(to)
+        with self.lock:
+            if tx_hash in self.receipts:
+                raise ValueError("already known")
+            expected = self.nonces[sender]
+            if nonce < expected:
+                raise ValueError("nonce too low")
+            if nonce > expected:
+                raise ValueError("nonce too high")
+            gas_used = min(gas, GAS_USED)
+            effective_price = min(gas_price, BASE_FEE + 10**5) if tx_type == 2 else gas_price
+            if self.eth[sender] < gas * gas_price + value:
+                raise ValueError("insufficient funds for gas * price + value")
+            self.nonces[sender] += 1
+            self.eth[sender] -= gas_used * effective_price
+            status = 1
+            snapshot = (dict(self.erc20), dict(self.allow), {k: list(v) for k, v in self.reserves.items()}, dict(self.eth))
+            try:
+                self.eth[sender] -= value
+                self.call(to, data, sender=sender, value=value, write=True)
+            except Revert:
+                # Revert: kembalikan state kecuali biaya gas
+                erc20, allow, reserves, eth = snapshot
+                self.erc20 = defaultdict(int, erc20)
+                self.allow = defaultdict(int, allow)
+                self.reserves = reserves
+                self.eth.clear()
+                self.eth.update(eth)
+                status = 0
+            self.block += 1
+            self.receipts[tx_hash] = {
+                "transactionHash": tx_hash,
+                "transactionIndex": "0x0",
+                "blockHash": "0x" + keccak(self.block.to_bytes(32, "big")).hex(),
+                "blockNumber": _hex(self.block),
+                "from": sender,
+                "to": to,
+                "cumulativeGasUsed": _hex(gas_used),
+                "gasUsed": _hex(gas_used),
+                "effectiveGasPrice": _hex(effective_price),
+                "contractAddress": None,
+                "logs": [],
+                "logsBloom": "0x" + "00" * 256,
+                "status": _hex(status),
+                "type": _hex(tx_type),
+            }
+        return tx_hash
+
+    # --- JSON-RPC ---
+
+    def _block(self, number):
+        return {
+            "number": _hex(number),
+            "hash": "0x" + keccak(number.to_bytes(32, "big")).hex(),
+            "parentHash": "0x" + keccak(max(number - 1, 0).to_bytes(32, "big")).hex(),
+            "timestamp": _hex(int(time.time())),
+            "baseFeePerGas": _hex(BASE_FEE),
+            "gasLimit": _hex(30_000_000),
+            "gasUsed": _hex(GAS_USED),
+            "miner": "0x" + "00" * 20,
+            "transactions": [],
+        }
+
+    def rpc(self, method, params):
+        self.calls[method] += 1
+        with self.lock:
+            if method == "eth_chainId":
+                return _hex(CHAIN_ID)
+            if method == "net_version":
+                return str(CHAIN_ID)
+            if method == "web3_clientVersion":
+                return "fake-chain/1.0"
+            if method == "eth_blockNumber":
+                return _hex(self.block)
+            if method == "eth_gasPrice":
+                return _hex(BASE_FEE)
+            if method == "eth_maxPriorityFeePerGas":
+                return _hex(10**5)
+            if method == "eth_getBalance":
+                return _hex(self.eth[to_checksum_address(params[0])])
+            if method == "eth_getTransactionCount":
+                return _hex(self.nonces[to_checksum_address(params[0])])
+            if method == "eth_getCode":
+                addr = to_checksum_address(params[0])
+                has_code = addr in (ROUTER_ADDR, FACTORY_ADDR, WETH_ADDR) or addr in self.tokens or addr in self.reserves
+                has_code = has_code or (addr == MULTICALL3_ADDR and self.multicall)
+                return "0x6080" if has_code else "0x"
+            if method == "eth_call":
+                tx = params[0]
+                data = bytes.fromhex(tx.get("data", tx.get("input", "0x"))[2:])
+                return "0x" + self.call(tx["to"], data).hex()
+            if method == "eth_estimateGas":
+                return _hex(GAS_USED)
+            if method == "eth_getTransactionReceipt":
+                return self.receipts.get(params[0])
+            if method == "eth_getBlockByNumber":
+                tag = params[0]
+                return self._block(self.block if tag in ("latest", "pending") else int(tag, 16))
+            if method == "eth_feeHistory":
+                count = int(params[0], 16) if isinstance(params[0], str) else int(params[0])
+                return {
+                    "oldestBlock": _hex(max(self.block - count + 1, 0)),
+                    "baseFeePerGas": [_hex(BASE_FEE)] * (count + 1),
+                    "gasUsedRatio": [0.5] * count,
+                    "reward": [[_hex(10**5) for _ in (params[2] if len(params) > 2 else [])] for _ in range(count)],
+                }
+        if method == "eth_sendRawTransaction":
+            return self.send_raw(params[0])
+        raise NotImplementedError(method)
+
+    def handle(self, request):
+        try:
+            result = self.rpc(request["method"], request.get("params") or [])
+            return {"jsonrpc": "2.0", "id": request.get("id"), "result": result}
+        except Revert as e:
+            return {"jsonrpc": "2.0", "id": request.get("id"), "error": {"code": 3, "message": f"execution reverted: {e}", "data": "0x"}}
+        except NotImplementedError as e:
+            return {"jsonrpc": "2.0", "id": request.get("id"), "error": {"code": -32601, "message": f"method {e} tidak didukung"}}
+        except ValueError as e:
+            return {"jsonrpc": "2.0", "id": request.get("id"), "error": {"code": -32000, "message": str(e)}}
+
+def serve(chain, host="127.0.0.1", port=0, latency=0.0):
+    """Jalankan server di thread background. Mengembalikan (server, url)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            with chain.lock:
+                chain.http_requests += 1
+            if latency:
+                # Simulasi round trip jaringan ke RPC publik
+                time.sleep(latency)
+            response = [chain.handle(r) for r in body] if isinstance(body, list) else chain.handle(body)
+            data = json.dumps(response).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-chain", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chain JSON-RPC palsu untuk benchmark offline")
+    parser.add_argument("--port", type=int, default=8545)
+    parser.add_argument("--tokens", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--no-multicall", action="store_true")
+    args = parser.parse_args()
+    _, url = serve(FakeChain(n_tokens=args.tokens, multicall=not args.no_multicall), port=args.port, latency=args.latency_ms / 1000)
+    print(f"Fake chain berjalan di {url} (chain id {CHAIN_ID}). Ctrl+C untuk berhenti.")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
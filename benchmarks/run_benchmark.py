@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Benchmark end-to-end pipeline swap + tambah likuiditas `auto_swap_liquidity.py`
+terhadap chain palsu lokal (benchmarks/fake_chain.py), tanpa testnet.
+
+Melaporkan dompet/menit, jumlah panggilan RPC per dompet (per metode dan per
+request HTTP) serta latensi p50/p95 tiap tahap.
+
+Contoh:
+    python benchmarks/run_benchmark.py --wallets 20 --concurrency 5 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from eth_account import Account
+from rich.console import Console
+from rich.table import Table
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from fake_chain import FakeChain, serve  # noqa: E402
+from metrics import percentile  # noqa: E402
+
+console = Console()
+
+def write_registry(chain, path):
+    """Registry token lokal agar startup tidak memanggil API market."""
+    tokens = {}
+    for addr, sym in chain.tokens.items():
+        tokens[sym] = {"address": addr, "decimals": 18, "last_seen": int(time.time()), "liquid": None, "verified": False}
+        if addr == chain.quote_token:
+            tokens[sym]["quote_token"] = True
+    with open(path, "w") as f:
+        json.dump({"updated_at": int(time.time()), "tokens": tokens}, f)
+
+def timed(stages, name, fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            stages[name].append(time.perf_counter() - start)
+    return wrapper
+
+def timed_async(stages, name, fn):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            stages[name].append(time.perf_counter() - start)
+    return wrapper
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline swap + likuiditas terhadap chain palsu")
+    parser.add_argument("--wallets", type=int, default=10)
+    parser.add_argument("--tokens", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=1, help="MAX_CONCURRENT_WALLETS")
+    parser.add_argument("--async-mode", action="store_true", help="ASYNC_MODE=true")
+    parser.add_argument("--pipeline-approve", action="store_true", help="PIPELINE_APPROVE=true")
+    parser.add_argument("--latency-ms", type=float, default=10, help="latensi simulasi per request HTTP")
+    parser.add_argument("--no-multicall", action="store_true")
+    parser.add_argument("--json", help="simpan hasil ke file JSON")
+    args = parser.parse_args()
+    json_path = os.path.abspath(args.json) if args.json else None
+
+    chain = FakeChain(n_tokens=args.tokens, multicall=not args.no_multicall)
+    server, url = serve(chain, latency=args.latency_ms / 1000)
+
+    keys = [Account.create().key.hex() for _ in range(args.wallets)]
+    workdir = tempfile.mkdtemp(prefix="gte-bench-")
+    os.chdir(workdir)
+    write_registry(chain, os.path.join(workdir, "token_registry.json"))
+    os.environ.update({
+        "TOKEN_REGISTRY_FILE": os.path.join(workdir, "token_registry.json"),
+        "POOL_INDEX_FILE": os.path.join(workdir, "pool_index.json"),
+        "RPC_URLS": url,
+        "PRIVATE_KEYS": ",".join(keys),
+        "WALLET_TARGET": "all",
+        "DELAY_BETWEEN_WALLETS": "0",
+        "DELAY_BETWEEN_OPERATIONS": "0",
+        "SWAP_AMOUNT_MIN": "0.002",
+        "SWAP_AMOUNT_MAX": "0.003",
+        "LIQUIDITY_AMOUNT_MIN": "0.0005",
+        "LIQUIDITY_AMOUNT_MAX": "0.001",
+        "MAX_CONCURRENT_WALLETS": str(args.concurrency),
+        "ASYNC_MODE": "true" if args.async_mode else "false",
+        "PIPELINE_APPROVE": "true" if args.pipeline_approve else "false",
+    })
+
+    import async_engine
+    import auto_swap_liquidity as bot
+    bot.console.quiet = True
+    async_engine.console.quiet = True
+
+    stages = defaultdict(list)
+    results = []
+    if args.async_mode:
+        engine_cls = async_engine.AsyncSwapEngine
+        engine_cls.do_swap = timed_async(stages, "swap", engine_cls.do_swap)
+        engine_cls.add_liquidity = timed_async(stages, "add_liquidity", engine_cls.add_liquidity)
+        process = timed_async(stages, "wallet", engine_cls.process_wallet)
+
+        async def recorded_process(*a, **kw):
+            ok = await process(*a, **kw)
+            results.append(ok)
+            return ok
+        engine_cls.process_wallet = recorded_process
+    else:
+        bot.do_swap = timed(stages, "swap", bot.do_swap)
+        bot.add_liquidity = timed(stages, "add_liquidity", bot.add_liquidity)
+        process = timed(stages, "wallet", bot.process_wallet)
+
+        def recorded_process(*a, **kw):
+            ok = process(*a, **kw)
+            results.append(ok)
+            return ok
+        bot.process_wallet = recorded_process
+
+    start = time.perf_counter()
+    bot.connect_rpc()
+    bot.fetch_and_load_tokens()
+    stages["startup"].append(time.perf_counter() - start)
+
+    calls_before, http_before = sum(chain.calls.values()), chain.http_requests
+    methods_before = dict(chain.calls)
+    run_start = time.perf_counter()
+    bot.automated_swap_and_liquidity()
+    duration = time.perf_counter() - run_start
+    rpc_calls = sum(chain.calls.values()) - calls_before
+    http_requests = chain.http_requests - http_before
+    server.shutdown()
+
+    wallets = args.wallets
+    report = {
+        "wallets": wallets,
+        "successful": sum(1 for ok in results if ok),
+        "duration_s": round(duration, 3),
+        "wallets_per_min": round(wallets / duration * 60, 2) if duration else 0,
+        "rpc_calls_per_wallet": round(rpc_calls / wallets, 2),
+        "http_requests_per_wallet": round(http_requests / wallets, 2),
+        "rpc_methods_per_wallet": {m: round((n - methods_before.get(m, 0)) / wallets, 2) for m, n in sorted(chain.calls.items()) if n - methods_before.get(m, 0)},
+        "stages": {name: {"n": len(v), "p50_ms": round(percentile(v, 50) * 1000, 1), "p95_ms": round(percentile(v, 95) * 1000, 1)} for name, v in stages.items()},
+        "config": vars(args),
+    }
+
+    table = Table(title="Hasil Benchmark", border_style="magenta", header_style="bold cyan")
+    table.add_column("Metrik", style="white")
+    table.add_column("Nilai", style="green", justify="right")
+    table.add_row("Dompet berhasil", f"{report['successful']}/{wallets}")
+    table.add_row("Durasi", f"{report['duration_s']} s")
+    table.add_row("Dompet/menit", str(report["wallets_per_min"]))
+    table.add_row("Panggilan RPC/dompet", str(report["rpc_calls_per_wallet"]))
+    table.add_row("Request HTTP/dompet", str(report["http_requests_per_wallet"]))
+    console.print(table)
+
+    stage_table = Table(title="Latensi per Tahap", border_style="cyan", header_style="bold cyan")
+    for col in ("Tahap", "n", "p50 (ms)", "p95 (ms)"):
+        stage_table.add_column(col, justify="right" if col != "Tahap" else "left")
+    for name, st in report["stages"].items():
+        stage_table.add_row(name, str(st["n"]), str(st["p50_ms"]), str(st["p95_ms"]))
+    console.print(stage_table)
+
+    method_table = Table(title="Metode RPC per Dompet", border_style="cyan", header_style="bold cyan")
+    method_table.add_column("Metode")
+    method_table.add_column("Rata-rata", justify="right")
+    for method, n in sorted(report["rpc_methods_per_wallet"].items(), key=lambda kv: -kv[1]):
+        method_table.add_row(method, str(n))
+    console.print(method_table)
+
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Checkpoint siklus otomatis di SQLite.
+Tahap tiap dompet dan tx hash swap/likuiditas dicatat segera setelah broadcast,
+sehingga jika proses restart di tengah siklus, siklus yang sama dilanjutkan:
+dompet yang sudah selesai dilewati dan tx yang belum punya receipt dicek ulang
+alih-alih dikirim ulang.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+CHECKPOINT_DB = os.getenv("CHECKPOINT_DB", "checkpoint.db")
+# Siklus yang terhenti lebih lama dari ini tidak dilanjutkan lagi, tetapi diganti siklus baru
+CHECKPOINT_MAX_AGE = float(os.getenv("CHECKPOINT_MAX_AGE", str(24 * 3600)))
+
+# Tahap dompet dalam satu siklus
+STAGE_SWAPPED = "swapped"
+STAGE_DONE = "done"
+STAGE_FAILED = "failed"
+# Status tx yang hilang dari mempool (tidak pernah masuk blok)
+TX_DROPPED = -1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cycles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE TABLE IF NOT EXISTS wallets (
+    cycle_id INTEGER NOT NULL,
+    wallet TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    token TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (cycle_id, wallet)
+);
+CREATE TABLE IF NOT EXISTS txs (
+    tx_hash TEXT PRIMARY KEY,
+    cycle_id INTEGER NOT NULL,
+    wallet TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    token TEXT,
+    status INTEGER,
+    sent_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS txs_wallet ON txs (cycle_id, wallet);
+"""
+
+def _hex(tx_hash):
+    return tx_hash if isinstance(tx_hash, str) else "0x" + bytes(tx_hash).hex()
+
+class Checkpoint:
+    """Checkpoint durable untuk siklus yang sedang berjalan. Semua method aman dipanggil dari banyak thread."""
+
+    def __init__(self, path=CHECKPOINT_DB):
+        self.path = path
+        self.cycle_id = None
+        self.started_at = None
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        # WAL: commit tetap aman jika proses mati mendadak, tanpa fsync per baca
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def begin_cycle(self, max_age=CHECKPOINT_MAX_AGE):
+        """Lanjutkan siklus yang belum selesai, atau mulai siklus baru. Mengembalikan True jika melanjutkan."""
+        rows = self._execute("SELECT id, started_at FROM cycles WHERE finished_at IS NULL ORDER BY id DESC LIMIT 1")
+        if rows and time.time() - rows[0][1] < max_age:
+            self.cycle_id, self.started_at = rows[0]
+            return True
+        # Siklus lama yang terhenti ditutup agar tidak dilanjutkan
+        self._execute("UPDATE cycles SET finished_at = ? WHERE finished_at IS NULL", (time.time(),))
+        self.started_at = time.time()
+        with self._lock:
+            self.cycle_id = self._db.execute("INSERT INTO cycles (started_at) VALUES (?)", (self.started_at,)).lastrowid
+        return False
+
+    def finish_cycle(self):
+        if self.cycle_id is None:
+            return
+        self._execute("UPDATE cycles SET finished_at = ? WHERE id = ?", (time.time(), self.cycle_id))
+        self.cycle_id = None
+
+    def last_cycle(self):
+        """(started_at, finished_at) siklus terakhir, atau None jika belum pernah ada."""
+        rows = self._execute("SELECT started_at, finished_at FROM cycles ORDER BY id DESC LIMIT 1")
+        return rows[0] if rows else None
+
+    def set_stage(self, wallet, stage, token=None):
+        if self.cycle_id is None:
+            return
+        self._execute(
+            "INSERT INTO wallets (cycle_id, wallet, stage, token, updated_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (cycle_id, wallet) DO UPDATE SET stage = excluded.stage, "
+            "token = COALESCE(excluded.token, wallets.token), updated_at = excluded.updated_at",
+            (self.cycle_id, wallet, stage, token, time.time()),
+        )
+
+    def wallet_state(self, wallet):
+        """(stage, token) dompet di siklus berjalan, atau (None, None)."""
+        if self.cycle_id is None:
+            return None, None
+        rows = self._execute("SELECT stage, token FROM wallets WHERE cycle_id = ? AND wallet = ?", (self.cycle_id, wallet))
+        return rows[0] if rows else (None, None)
+
+    def record_tx(self, wallet, kind, tx_hash, token=None):
+        """Catat tx yang baru di-broadcast (kind: 'swap' atau 'liquidity')."""
+        if self.cycle_id is None:
+            return
+        self._execute(
+            "INSERT OR IGNORE INTO txs (tx_hash, cycle_id, wallet, kind, token, sent_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (_hex(tx_hash), self.cycle_id, wallet, kind, token, time.time()),
+        )
+
+    def mark_tx(self, tx_hash, status):
+        """Simpan status receipt (1 sukses, 0 revert, TX_DROPPED). Tx yang tidak dicatat diabaikan."""
+        self._execute("UPDATE txs SET status = ? WHERE tx_hash = ?", (status, _hex(tx_hash)))
+
+    def pending_txs(self, wallet):
+        """List (kind, tx_hash, token) milik dompet yang belum punya status receipt."""
+        if self.cycle_id is None:
+            return []
+        return self._execute(
+            "SELECT kind, tx_hash, token FROM txs WHERE cycle_id = ? AND wallet = ? AND status IS NULL ORDER BY sent_at",
+            (self.cycle_id, wallet),
+        )
+
+    def confirmed_token(self, wallet, kind):
+        """Token dari tx `kind` yang sukses di siklus berjalan, atau None."""
+        if self.cycle_id is None:
+            return None
+        rows = self._execute(
+            "SELECT token FROM txs WHERE cycle_id = ? AND wallet = ? AND kind = ? AND status = 1 ORDER BY sent_at DESC LIMIT 1",
+            (self.cycle_id, wallet, kind),
+        )
+        return rows[0][0] if rows else None
+
+    def wallets_with_pending(self):
+        if self.cycle_id is None:
+            return []
+        return [r[0] for r in self._execute("SELECT DISTINCT wallet FROM txs WHERE cycle_id = ? AND status IS NULL", (self.cycle_id,))]
@@ -1,15 +1,19 @@
+import os
 import requests
 import time
 import threading
 import logging
 import sys
-from eth_account import Account
+from account_store import AccountStore
 from web3 import Web3
 from datetime import datetime, timedelta
 from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
 from rich.logging import RichHandler
+from rpc_pool import session_web3
+from multi_rpc import load_rpc_urls
+from scheduler import JobCancelled, Scheduler
 
 console = Console()
 logging.basicConfig(
@@ -39,7 +43,12 @@ APIKEY = load_captcha_key()
 TURNSTILE_SITEKEY = "0x4AAAAAABA4JXCaw9E2Py-9"
 TURNSTILE_PAGE_URL = "https://testnet.megaeth.com/"
 MEGAETH_API_URL = "https://carrot.megaeth.com/claim"
-RPC_URL = "https://carrot.megaeth.com/rpc"
+RPC_URLS = load_rpc_urls()
+
+# Jeda antar klaim untuk dompet yang sama
+CLAIM_INTERVAL = 24 * 3600
+# Jumlah klaim yang berjalan bersamaan di mode parallel, berapa pun jumlah kunci
+FAUCET_WORKERS = int(os.getenv("FAUCET_WORKERS", "16"))
 
 # URL untuk Anti-Captcha
 ANTICAPTCHA_CREATE_TASK_URL = "https://api.anti-captcha.com/createTask"
@@ -94,8 +103,8 @@ def submit_captcha(session, short_addr):
     except Exception as e:
         raise Exception(f"Error saat menghubungi Anti-Captcha: {e}")
 
-def get_captcha_result(session, task_id, short_addr):
-    """Mendapatkan hasil penyelesaian CAPTCHA dari Anti-Captcha."""
+def get_captcha_result(session, task_id, short_addr, stop_event):
+    """Mendapatkan hasil penyelesaian CAPTCHA dari Anti-Captcha. Berhenti segera jika `stop_event` di-set."""
     payload = {
         "clientKey": APIKEY,
         "taskId": task_id
@@ -104,7 +113,8 @@ def get_captcha_result(session, task_id, short_addr):
     log.info(f"[{short_addr}] Menunggu hasil Anti-Captcha...")
     # Timeout 120 detik (40 * 3 detik)
     for _ in range(40):
-        time.sleep(3)
+        if stop_event.wait(3):
+            raise JobCancelled("Dihentikan sebelum CAPTCHA selesai.")
         try:
             res = session.post(ANTICAPTCHA_GET_RESULT_URL, json=payload, timeout=20).json()
             
@@ -140,7 +150,7 @@ def claim(session, addr, token, short_addr):
     }
     payload = {"addr": addr, "token": token}
     try:
-        response = session.post(MEGAETH_API_URL, headers=headers, json=payload)
+        response = session.post(MEGAETH_API_URL, headers=headers, json=payload, timeout=30)
         response.raise_for_status()
         data = response.json()
         if data.get("success"):
@@ -155,47 +165,60 @@ def claim(session, addr, token, short_addr):
         log.error(f"[{short_addr}] Exception saat klaim: {e}")
     return False
 
-def check_balance(address, proxy, short_addr):
-    request_kwargs = {'proxies': {'http': f"http://{proxy}", 'https': f"http://{proxy}"}} if proxy else {}
-    web3 = Web3(Web3.HTTPProvider(RPC_URL, request_kwargs=request_kwargs))
-    if not web3.is_connected():
-        log.error(f"[{short_addr}] Gagal terhubung ke RPC.")
+def check_balance(session, address, short_addr):
+    # RPC lewat sesi (dan proxy) milik klaim ini; tidak ada provider yang disimpan per kunci/proxy
+    web3 = session_web3(RPC_URLS, session)
+    try:
+        balance_wei = web3.eth.get_balance(address)
+    except Exception as e:
+        log.error(f"[{short_addr}] Gagal terhubung ke RPC: {e}")
         return 0
-    balance_wei = web3.eth.get_balance(address)
     balance_eth = web3.from_wei(balance_wei, 'ether')
     log.info(f"[{short_addr}] Saldo: {balance_eth:.4f} ETH")
     return balance_eth
     
-def process_key_looping(private_key, proxy, thread_id, stop_event):
-    account = Account.from_key(private_key)
-    address = account.address
+def claim_for_key(store, index, proxy, stop_event):
+    """Satu putaran klaim (cek saldo, CAPTCHA, klaim) untuk dompet ke-`index`; dijadwalkan ulang oleh Scheduler."""
+    if stop_event.is_set():
+        raise JobCancelled("Dihentikan sebelum klaim dimulai.")
+    address = store.address(index)
+    thread_id = index + 1
     short_addr = f"{address[:6]}..{address[-4:]}"
     proxy_display = proxy.split('@')[-1] if proxy else "Tidak ada"
     log.info(f"Thread {thread_id}: Memulai wallet {short_addr} | Proxy: {proxy_display}")
     
-    while not stop_event.is_set():
-        session = requests.Session()
-        if proxy:
-            session.proxies.update({"http": f"http://{proxy}", "https": f"http://{proxy}"})
-        
-        try:
-            check_balance(address, proxy, short_addr)
-            cap_id = submit_captcha(session, short_addr)
-            cap_token = get_captcha_result(session, cap_id, short_addr)
-            claim(session, address, cap_token, short_addr)
-        except Exception as e:
-            log.error(f"[{short_addr}] Error pada siklus: {e}")
-        finally:
-            session.close()
+    session = requests.Session()
+    if proxy:
+        session.proxies.update({"http": f"http://{proxy}", "https": f"http://{proxy}"})
+    
+    try:
+        check_balance(session, address, short_addr)
+        cap_id = submit_captcha(session, short_addr)
+        cap_token = get_captcha_result(session, cap_id, short_addr, stop_event)
+        claim(session, address, cap_token, short_addr)
+    except JobCancelled:
+        log.info(f"[{short_addr}] Dihentikan sebelum klaim selesai. Klaim diulang saat bot jalan lagi.")
+        raise
+    except Exception as e:
+        log.error(f"[{short_addr}] Error pada siklus: {e}")
+    finally:
+        session.close()
 
-        wait_seconds = 86400
-        log.info(f"[{short_addr}] Siklus selesai. Menunggu 24 jam untuk klaim berikutnya.")
+    log.info(f"[{short_addr}] Siklus selesai. Menunggu 24 jam untuk klaim berikutnya.")
 
-        # Gunakan pendekatan sederhana tanpa console.status untuk menghindari konflik thread
-        for i in range(wait_seconds):
-            if stop_event.is_set(): 
-                break
-            time.sleep(1)
+def log_job_error(name, exc):
+    log.error(f"Job {name} gagal: {exc}")
+
+def run_until_stopped(scheduler, stop_event):
+    """Jalankan penjadwal sampai `stop_event` di-set (dari thread mana pun) atau Ctrl+C."""
+    # Satu thread yang diblokir event, tanpa polling: stop_event langsung membangunkan penjadwal
+    threading.Thread(target=lambda: (stop_event.wait(), scheduler.stop()), name="faucet-stop", daemon=True).start()
+    try:
+        scheduler.run()
+    finally:
+        # Job yang sedang berjalan melihat stop_event dan melempar JobCancelled: jadwalnya tidak dimajukan
+        stop_event.set()
+        scheduler.stop()
 
 def run_faucet_for_all_keys_sequential(stop_event):
     """Versi sequential - memproses wallet satu per satu"""
@@ -208,26 +231,30 @@ def run_faucet_for_all_keys_sequential(stop_event):
     proxies = load_proxies()
     if proxies and len(keys) > len(proxies):
         log.warning(f"Peringatan: Jumlah kunci ({len(keys)}) lebih banyak dari jumlah proxy ({len(proxies)}). Beberapa kunci akan dijalankan tanpa proxy.")
+    store = AccountStore(keys)
 
     cycle_count = 0
-    while not stop_event.is_set():
+    
+    def run_cycle():
+        nonlocal cycle_count
         cycle_count += 1
         log.info(f"=== MEMULAI SIKLUS {cycle_count} ===")
         
         successful_wallets = 0
         failed_wallets = 0
         
-        for i, key in enumerate(keys):
+        for i in range(len(keys)):
             if stop_event.is_set():
+                # Siklus belum selesai: jadwalnya tidak dimajukan, siklus diulang saat bot jalan lagi
+                store.save()
                 log.info("Sinyal berhenti diterima. Menghentikan proses...")
-                break
+                raise JobCancelled(f"Siklus {cycle_count} dihentikan di wallet {i+1}/{len(keys)}")
                 
             proxy = proxies[i] if proxies and i < len(proxies) else None
             log.info(f"Memproses wallet {i+1}/{len(keys)}")
             
             # Proses satu kali klaim untuk wallet ini
-            account = Account.from_key(key)
-            address = account.address
+            address = store.address(i)
             short_addr = f"{address[:6]}..{address[-4:]}"
             proxy_display = proxy.split('@')[-1] if proxy else "Tidak ada"
             log.info(f"Thread {i+1}: Memulai wallet {short_addr} | Proxy: {proxy_display}")
@@ -237,15 +264,18 @@ def run_faucet_for_all_keys_sequential(stop_event):
                 session.proxies.update({"http": f"http://{proxy}", "https": f"http://{proxy}"})
             
             try:
-                check_balance(address, proxy, short_addr)
+                check_balance(session, address, short_addr)
                 cap_id = submit_captcha(session, short_addr)
-                cap_token = get_captcha_result(session, cap_id, short_addr)
+                cap_token = get_captcha_result(session, cap_id, short_addr, stop_event)
                 if claim(session, address, cap_token, short_addr):
                     successful_wallets += 1
                     log.info(f"[{short_addr}] Wallet {i+1} berhasil diproses.")
                 else:
                     failed_wallets += 1
                     log.warning(f"[{short_addr}] Wallet {i+1} gagal diproses.")
+            except JobCancelled:
+                store.save()
+                raise
             except Exception as e:
                 failed_wallets += 1
                 log.error(f"[{short_addr}] Error pada siklus: {e}")
@@ -255,17 +285,17 @@ def run_faucet_for_all_keys_sequential(stop_event):
             # Jeda antar wallet (opsional)
             if i < len(keys) - 1 and not stop_event.is_set():
                 log.info(f"Menunggu 5 detik sebelum lanjut ke wallet berikutnya...")
-                time.sleep(5)
+                stop_event.wait(5)
         
-        # Setelah semua wallet diproses, tunggu 24 jam sebelum siklus berikutnya
-        if not stop_event.is_set():
-            log.info(f"=== SIKLUS {cycle_count} SELESAI ===")
-            log.info(f"Ringkasan: {successful_wallets} wallet berhasil, {failed_wallets} wallet gagal")
-            log.info("Semua wallet telah diproses. Menunggu 24 jam untuk siklus berikutnya...")
-            for i in range(86400):  # 24 jam
-                if stop_event.is_set():
-                    break
-                time.sleep(1)
+        store.save()
+        log.info(f"=== SIKLUS {cycle_count} SELESAI ===")
+        log.info(f"Ringkasan: {successful_wallets} wallet berhasil, {failed_wallets} wallet gagal")
+        log.info("Semua wallet telah diproses. Menunggu 24 jam untuk siklus berikutnya...")
+    
+    # Jadwal siklus disimpan di schedule.db: restart tidak mengulang klaim yang belum 24 jam
+    scheduler = Scheduler(workers=0, on_error=log_job_error)
+    scheduler.add("faucet:sequential", run_cycle, CLAIM_INTERVAL, after_finish=True)
+    run_until_stopped(scheduler, stop_event)
 
 def run_faucet_for_all_keys(stop_event):
     """Versi parallel - memproses semua wallet bersamaan"""
@@ -279,14 +309,18 @@ def run_faucet_for_all_keys(stop_event):
     if proxies and len(keys) > len(proxies):
         log.warning(f"Peringatan: Jumlah kunci ({len(keys)}) lebih banyak dari jumlah proxy ({len(proxies)}). Beberapa kunci akan dijalankan tanpa proxy.")
 
-    threads = []
-    for i, key in enumerate(keys):
+    # Satu job per dompet (jadwal bertahan setelah restart) di pool berukuran tetap:
+    # jumlah thread dan sesi HTTP tidak tumbuh dengan jumlah kunci
+    workers = max(1, min(FAUCET_WORKERS, len(keys)))
+    log.info(f"Menjalankan {len(keys)} wallet dengan {workers} worker.")
+    scheduler = Scheduler(workers=workers, on_error=log_job_error)
+    # Alamat diambil dari address_cache.json; hanya kunci baru yang diturunkan
+    store = AccountStore(keys)
+    for i in range(len(store)):
         proxy = proxies[i] if proxies and i < len(proxies) else None
-        t = threading.Thread(target=process_key_looping, args=(key, proxy, i + 1, stop_event))
-        threads.append(t)
-        t.start()
-    for t in threads:
-        t.join()
+        scheduler.add(f"faucet:{store.address(i)}", lambda i=i, proxy=proxy: claim_for_key(store, i, proxy, stop_event), CLAIM_INTERVAL, after_finish=True)
+    store.save()
+    run_until_stopped(scheduler, stop_event)
 
 def main():
     title = Panel(
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Oracle biaya dan gas.
+Fee EIP-1559 dihitung dari `eth_feeHistory` (base fee blok berikutnya + median tip
+beberapa blok terakhir) dan di-cache sebentar; gas limit diestimasi per jenis panggilan
+lalu di-cache per (fungsi, token) dengan margin keamanan. Jika chain tidak mendukung
+EIP-1559 atau estimasi gagal, dipakai gas price legacy dan gas limit default.
+"""
+
+import os
+import threading
+import time
+
+from web3 import Web3
+
+FEE_HISTORY_BLOCKS = int(os.getenv("FEE_HISTORY_BLOCKS", "10"))
+FEE_REWARD_PERCENTILE = float(os.getenv("FEE_REWARD_PERCENTILE", "50"))
+FEE_CACHE_TTL = float(os.getenv("FEE_CACHE_TTL", "5"))
+# maxFeePerGas = base fee * pengali + tip, agar tx tetap valid meski base fee naik beberapa blok
+BASE_FEE_MULTIPLIER = float(os.getenv("BASE_FEE_MULTIPLIER", "2"))
+GAS_MARGIN = float(os.getenv("GAS_MARGIN", "1.2"))
+GAS_ESTIMATE_TTL = float(os.getenv("GAS_ESTIMATE_TTL", "3600"))
+FALLBACK_GAS_PRICE = Web3.to_wei(os.getenv("FALLBACK_GAS_PRICE_GWEI", "0.001"), 'gwei')
+
+def _fees_from_history(history):
+    """Fee EIP-1559 dari hasil eth_feeHistory, atau None jika chain tidak punya base fee."""
+    base_fees = history.get("baseFeePerGas") or []
+    if not base_fees or base_fees[-1] is None:
+        return None
+    # Elemen terakhir adalah base fee blok berikutnya
+    next_base = int(base_fees[-1])
+    rewards = sorted(int(r[0]) for r in history.get("reward") or [] if r)
+    tip = rewards[len(rewards) // 2] if rewards else 0
+    return {
+        "maxPriorityFeePerGas": tip,
+        "maxFeePerGas": int(next_base * BASE_FEE_MULTIPLIER) + tip,
+    }
+
+def fee_per_gas(tx):
+    """Harga gas terburuk yang bisa dibayar tx (maxFeePerGas atau gasPrice)."""
+    return tx.get("maxFeePerGas", tx.get("gasPrice", 0))
+
+def tx_cost(tx):
+    """Saldo ETH minimal agar tx diterima node: gas * harga gas maksimum + value."""
+    return tx["gas"] * fee_per_gas(tx) + tx.get("value", 0)
+
+class FeeOracle:
+    """Sumber fee dan gas limit bersama untuk semua dompet di satu chain. Thread-safe."""
+
+    def __init__(self, chain_id, fallback_gas_price=FALLBACK_GAS_PRICE, margin=GAS_MARGIN):
+        self.chain_id = chain_id
+        self.fallback_gas_price = fallback_gas_price
+        self.margin = margin
+        self._fees = None
+        self._fees_at = 0
+        self._gas = {}
+        self._lock = threading.Lock()
+
+    # --- fee ---
+
+    def _cached_fees(self):
+        with self._lock:
+            if self._fees is not None and time.time() - self._fees_at < FEE_CACHE_TTL:
+                return dict(self._fees)
+        return None
+
+    def _store_fees(self, fees):
+        with self._lock:
+            self._fees, self._fees_at = fees, time.time()
+        return dict(fees)
+
+    def fees(self, w3_instance):
+        """Field fee untuk tx: maxFeePerGas/maxPriorityFeePerGas, atau gasPrice jika chain legacy."""
+        fees = self._cached_fees()
+        if fees is not None:
+            return fees
+        try:
+            fees = _fees_from_history(w3_instance.eth.fee_history(FEE_HISTORY_BLOCKS, 'latest', [FEE_REWARD_PERCENTILE]))
+        except Exception:
+            fees = None
+        if fees is None:
+            try:
+                fees = {"gasPrice": max(w3_instance.eth.gas_price, self.fallback_gas_price)}
+            except Exception:
+                fees = {"gasPrice": self.fallback_gas_price}
+        return self._store_fees(fees)
+
+    async def async_fees(self, w3_instance):
+        """Versi AsyncWeb3 dari fees(); cache-nya dipakai bersama."""
+        fees = self._cached_fees()
+        if fees is not None:
+            return fees
+        try:
+            fees = _fees_from_history(await w3_instance.eth.fee_history(FEE_HISTORY_BLOCKS, 'latest', [FEE_REWARD_PERCENTILE]))
+        except Exception:
+            fees = None
+        if fees is None:
+            try:
+                fees = {"gasPrice": max(await w3_instance.eth.gas_price, self.fallback_gas_price)}
+            except Exception:
+                fees = {"gasPrice": self.fallback_gas_price}
+        return self._store_fees(fees)
+
+    # --- gas limit ---
+
+    def cached_gas(self, key):
+        """Gas limit (sudah termasuk margin) yang di-cache untuk key, atau None."""
+        with self._lock:
+            entry = self._gas.get(key)
+        if entry is None or time.time() - entry[1] > GAS_ESTIMATE_TTL:
+            return None
+        return entry[0]
+
+    def _store_gas(self, key, estimate):
+        gas = int(estimate * self.margin)
+        with self._lock:
+            self._gas[key] = (gas, time.time())
+        return gas
+
+    def reserve_gas(self, fn_name, default):
+        """Gas limit terbesar yang pernah diestimasi untuk fungsi ini (token apa pun), atau `default`."""
+        now = time.time()
+        with self._lock:
+            known = [gas for (name, _), (gas, at) in self._gas.items() if name == fn_name and now - at <= GAS_ESTIMATE_TTL]
+        return max(known) if known else default
+
+    def gas_limit(self, fn, params, key, default):
+        """Estimasi gas `fn` (ContractFunction) dengan margin, di-cache per key; `default` jika estimasi gagal."""
+        gas = self.cached_gas(key)
+        if gas is not None:
+            return gas
+        try:
+            return self._store_gas(key, fn.estimate_gas(params))
+        except Exception:
+            # Mis. swap yang approve-nya masih pending: estimasi revert, pakai batas aman
+            return self.reserve_gas(key[0], default)
+
+    async def async_gas_limit(self, fn, params, key, default):
+        gas = self.cached_gas(key)
+        if gas is not None:
+            return gas
+        try:
+            return self._store_gas(key, await fn.estimate_gas(params))
+        except Exception:
+            return self.reserve_gas(key[0], default)
+
+    # --- tx ---
+
+    def tx_params(self, w3_instance, fn, account, token, default_gas, value=0):
+        """Parameter build_transaction lengkap (gas, fee, chainId) sehingga tidak ada panggilan RPC tambahan."""
+        params = {'from': account}
+        if value:
+            params['value'] = value
+        params['gas'] = self.gas_limit(fn, dict(params), (fn.fn_name, token), default_gas)
+        params['chainId'] = self.chain_id
+        params.update(self.fees(w3_instance))
+        return params
+
+    async def async_tx_params(self, w3_instance, fn, account, token, default_gas, value=0):
+        params = {'from': account}
+        if value:
+            params['value'] = value
+        params['gas'] = await self.async_gas_limit(fn, dict(params), (fn.fn_name, token), default_gas)
+        params['chainId'] = self.chain_id
+        params.update(await self.async_fees(w3_instance))
+        return params
+
+    def reserve_cost(self, w3_instance, fn_name, default_gas):
+        """Perkiraan biaya gas maksimum satu tx `fn_name` untuk cek saldo sebelum tx dibuat."""
+        return self.reserve_gas(fn_name, default_gas) * fee_per_gas(self.fees(w3_instance))
+
+    async def async_reserve_cost(self, w3_instance, fn_name, default_gas):
+        return self.reserve_gas(fn_name, default_gas) * fee_per_gas(await self.async_fees(w3_instance))
@@ -5,13 +5,26 @@ import requests
 import random
 from dotenv import load_dotenv
 from web3 import Web3
-from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich.rule import Rule
 import web3
-
-console = Console()
+from abis import PAIR_ABI, FACTORY_ABI, ERC20_ABI, ROUTER_ABI
+from batch_reads import token_balances, allowances, eth_balances
+from nonce_manager import NonceManager
+from tx_pipeline import SIGN_PROCESS_MIN_WALLETS, TxPipeline
+from token_registry import TokenRegistry, format_units, parse_units
+from pool_index import PoolIndex
+from rpc_pool import get_contract
+from multi_rpc import load_rpc_urls
+from app_context import AppContext
+from fee_oracle import FeeOracle, tx_cost
+from quoter import Quoter
+from route_finder import RouteFinder
+from metrics import METRICS, METRICS_REPORT, timed, serve_prometheus
+from journal import JOURNAL, bind, make_console
+
+console = make_console()  # LOG_FORMAT=json untuk output JSONL tanpa rich
 
 def info(msg): console.print(f"[bold cyan][*][/bold cyan] {msg}")
 def success(msg): console.print(f"[bold green][+][/bold green] {msg}")
@@ -37,18 +50,19 @@ PROXY = load_proxy()
 def clear_screen():
     os.system('cls' if os.name == 'nt' else 'clear')
 
+@timed("wait_for_tx", ok=lambda receipt: receipt is not None)
 def wait_for_tx(tx_hash, message):
     with console.status(f"[bold green]{message} [dim]{tx_hash.hex()}[/dim][/bold green]", spinner="dots") as status:
-        try:
-            receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=180)
-            return receipt
+        try: receipt = CTX.receipts.wait(tx_hash, timeout=180)
         except Exception as e:
             error(f"Timeout atau error saat menunggu transaksi: {e}")
-            return None
+            receipt = None
+    JOURNAL.tx(tx_hash, receipt)
+    return receipt
 
-RPC = 'https://carrot.megaeth.com/rpc'
+RPC_URLS = load_rpc_urls()  # RPC_URLS=url1,url2 untuk routing latensi + failover
+RPC = RPC_URLS[0]
 CHAIN = 6342
-w3 = Web3(Web3.HTTPProvider(RPC, request_kwargs={"proxies": PROXY} if PROXY else {}))
 
 def load_private_keys():
     pk_list = []
@@ -73,75 +87,70 @@ def load_private_keys():
         exit()
     return pk_list
 
-PK_LIST = load_private_keys()
-accounts = [w3.eth.account.from_key(pk) for pk in PK_LIST]
 mass_swap_enabled = False
 A, PK = None, None
 
-PAIR_ABI = json.loads("""[{"constant":true,"inputs":[],"name":"getReserves","outputs":[{"internalType":"uint112","name":"_reserve0","type":"uint112"},{"internalType":"uint112","name":"_reserve1","type":"uint112"},{"internalType":"uint32","name":"_blockTimestampLast","type":"uint32"}],"stateMutability":"view","type":"function"}]""")
-FACTORY_ABI = json.loads("""[{"constant":true,"inputs":[{"name":"tokenA","type":"address"},{"name":"tokenB","type":"address"}],"name":"getPair","outputs":[{"name":"pair","type":"address"}],"stateMutability":"view","type":"function"}]""")
-ERC20_ABI = json.loads("""[{"constant":true,"inputs":[{"name":"owner","type":"address"}],"name":"balanceOf","outputs":[{"name":"","type":"uint256"}],"type":"function"},{"constant":true,"inputs":[{"name":"owner","type":"address"},{"name":"spender","type":"address"}],"name":"allowance","outputs":[{"name":"","type":"uint256"}],"type":"function"},{"constant":false,"inputs":[{"name":"spender","type":"address"},{"name":"amount","type":"uint256"}],"name":"approve","outputs":[{"name":"","type":"bool"}],"type":"function"},{"constant":true,"inputs":[],"name":"decimals","outputs":[{"name":"","type":"uint8"}],"type":"function"},{"constant":true,"inputs":[],"name":"symbol","outputs":[{"name":"","type":"string"}],"type":"function"}]""")
-ROUTER_ABI = json.loads("""[{"constant":true,"inputs":[{"name":"amountIn","type":"uint256"},{"name":"path","type":"address[]"}],"name":"getAmountsOut","outputs":[{"name":"","type":"uint256[]"}],"type":"function"},{"inputs":[{"internalType":"uint256","name":"amountIn","type":"uint256"},{"internalType":"uint256","name":"amountOutMin","type":"uint256"},{"internalType":"address[]","name":"path","type":"address[]"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"swapExactTokensForTokens","outputs":[{"internalType":"uint256[]","name":"","type":"uint256[]"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"uint256","name":"amountOutMin","type":"uint256"},{"internalType":"address[]","name":"path","type":"address[]"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"swapExactETHForTokens","outputs":[{"internalType":"uint256[]","name":"","type":"uint256[]"}],"stateMutability":"payable","type":"function"},{"inputs":[{"internalType":"uint256","name":"amountIn","type":"uint256"},{"internalType":"uint256","name":"amountOutMin","type":"uint256"},{"internalType":"address[]","name":"path","type":"address[]"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"swapExactTokensForETH","outputs":[{"internalType":"uint256[]","name":"","type":"uint256[]"}],"stateMutability":"nonpayable","type":"function"},{"constant":true,"inputs":[],"name":"WETH","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"constant":true,"inputs":[],"name":"factory","outputs":[{"internalType":"address","name":"","type":"address"}],"stateMutability":"view","type":"function"},{"inputs":[{"internalType":"address","name":"tokenA","type":"address"},{"internalType":"address","name":"tokenB","type":"address"},{"internalType":"uint256","name":"amountADesired","type":"uint256"},{"internalType":"uint256","name":"amountBDesired","type":"uint256"},{"internalType":"uint256","name":"amountAMin","type":"uint256"},{"internalType":"uint256","name":"amountBMin","type":"uint256"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"addLiquidity","outputs":[{"internalType":"uint256","name":"amountA","type":"uint256"},{"internalType":"uint256","name":"amountB","type":"uint256"},{"internalType":"uint256","name":"liquidity","type":"uint256"}],"stateMutability":"nonpayable","type":"function"},{"inputs":[{"internalType":"address","name":"token","type":"address"},{"internalType":"uint256","name":"amountTokenDesired","type":"uint256"},{"internalType":"uint256","name":"amountTokenMin","type":"uint256"},{"internalType":"uint256","name":"amountETHMin","type":"uint256"},{"internalType":"address","name":"to","type":"address"},{"internalType":"uint256","name":"deadline","type":"uint256"}],"name":"addLiquidityETH","outputs":[{"internalType":"uint256","name":"amountToken","type":"uint256"},{"internalType":"uint256","name":"amountETH","type":"uint256"},{"internalType":"uint256","name":"liquidity","type":"uint256"}],"stateMutability":"payable","type":"function"}]""")
 WETH_DEPOSIT_ABI = [{"constant": False, "inputs": [], "name": "deposit", "outputs": [], "payable": True, "stateMutability": "payable", "type": "function"}]
 
-info("Menyambungkan ke RPC...")
-if not w3.is_connected(): error("Koneksi RPC gagal!"); exit()
-if w3.eth.chain_id != CHAIN: error(f"Chain ID tidak cocok: diharapkan {CHAIN}, didapat {w3.eth.chain_id}"); exit()
-success("RPC terhubung dengan sukses.")
-
 ROUTER_ADDR = Web3.to_checksum_address("0xa6b579684e943f7d00d616a48cf99b5147fc57a5")
-router = w3.eth.contract(address=ROUTER_ADDR, abi=ROUTER_ABI)
-WETH_ADDR = router.functions.WETH().call()
+# w3, router, WETH dan akun dibuat lazy saat pertama dipakai; import modul tidak menyentuh jaringan
+CTX = AppContext(RPC_URLS, CHAIN, ROUTER_ADDR, key_loader=load_private_keys, proxy=PROXY)
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
-GAS_P = w3.to_wei('0.001', 'gwei')
-GAS_AP, GAS_SW = 200_000, 500_000
+GAS_AP, GAS_SW = 200_000, 500_000  # batas aman jika estimasi gas gagal
+FEES = FeeOracle(CHAIN)  # fee EIP-1559 dari eth_feeHistory + estimasi gas yang di-cache
 SLIPPAGE = 0.11
 TOKENS = {}
+TOKEN_REGISTRY = TokenRegistry()
+POOLS = None
+QUOTER = None
+ROUTES = None
+NONCES = NonceManager()
+TXS = TxPipeline(NONCES, on_broadcast=lambda tx_hash: CTX.receipts.track(tx_hash))  # tanda tangan -> broadcast batch -> receipt
+PIPELINE_APPROVE = os.getenv("PIPELINE_APPROVE", "false").lower() == 'true'  # approve + swap dikirim tanpa menunggu receipt approve
+WALLET_SUMMARY_LIMIT = int(os.getenv("WALLET_SUMMARY_LIMIT", "20"))  # dompet yang ditampilkan (dan diturunkan) di ringkasan menu
+
+# Nama lama tetap bisa diakses dari luar modul (mis. gte.w3, gte.WETH_ADDR)
+_LAZY_ATTRS = {"w3": "w3", "router": "router", "WETH_ADDR": "weth_addr", "accounts": "accounts", "PK_LIST": "pk_list", "RECEIPTS": "receipts"}
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS: return getattr(CTX, _LAZY_ATTRS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def connect_rpc():
+    info("Menyambungkan ke RPC...")
+    try: CTX.connect()
+    except Exception as e: error(str(e)); exit()
+    success("RPC terhubung dengan sukses.")
 
 def fetch_and_load_tokens():
-    global TOKENS, router, WETH_ADDR, ZERO_ADDRESS
-    router = w3.eth.contract(address=ROUTER_ADDR, abi=ROUTER_ABI)
-    WETH_ADDR = router.functions.WETH().call()
-    ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
-    
-    API_URL = "https://api-testnet.gte.xyz/v1/markets?sortBy=volume&limit=100"
-    headers = {
-        'accept': 'application/json, text/plain, */*',
-        'origin': 'https://testnet.gte.xyz',
-        'referer': 'https://testnet.gte.xyz/',
-        'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36'
-    }
+    global TOKENS
     proxy_to_use = PROXY if PROXY else None
-    with console.status("[bold yellow]Memuat data token...[/bold yellow]", spinner="dots"):
-        try:
-            resp = requests.get(API_URL, headers=headers, timeout=10, proxies=proxy_to_use)
-            resp.raise_for_status()
-            markets = resp.json()
-            
-            if not isinstance(markets, list):
-                error("Format data market tidak terduga dari API.")
-                return
-
-            for market in markets:
-                for token_type in ['baseToken', 'quoteToken']:
-                    token_data = market.get(token_type)
-                    if token_data:
-                        sym = token_data.get("symbol", "").upper().strip()
-                        if not sym: continue
-                        # Validasi address
-                        addr_raw = token_data.get("address", "")
-                        if not (isinstance(addr_raw, str) and addr_raw.startswith('0x') and len(addr_raw) == 42):
-                            continue  # Lewati token dengan address tidak valid
-                        # Hanya tambahkan token jika belum ada di daftar
-                        if sym not in TOKENS:
-                            addr = Web3.to_checksum_address(addr_raw)
-                            TOKENS[sym] = {"address": addr, "decimals": token_data.get("decimals", 18)}
-            
-            TOKENS["ETH"] = {"address": None, "decimals": 18}
-            TOKENS["WETH"] = {"address": WETH_ADDR, "decimals": 18}
-        except Exception as e: error(f"Gagal memuat data token: {e}"); exit()
+    if TOKEN_REGISTRY.tokens:
+        # Pakai cache lokal, API hanya dicek di background jika cache kedaluwarsa
+        if TOKEN_REGISTRY.is_stale(): TOKEN_REGISTRY.refresh_in_background(proxy_to_use)
+    else:
+        with console.status("[bold yellow]Memuat data token...[/bold yellow]", spinner="dots"):
+            try: TOKEN_REGISTRY.refresh(proxy_to_use)
+            except Exception as e: error(f"Gagal memuat data token: {e}"); exit()
+    try: TOKEN_REGISTRY.verify_onchain(CTX.w3)  # decimals on-chain, cukup sekali per token
+    except Exception as e: warning(f"Gagal memverifikasi decimals token on-chain: {e}")
+    TOKENS = TOKEN_REGISTRY.token_map()
+    TOKENS["ETH"] = {"address": None, "decimals": 18}
+    TOKENS["WETH"] = {"address": CTX.weth_addr, "decimals": 18}
+    try: refresh_pool_index()  # reserve untuk quote off-chain
+    except Exception as e: warning(f"Gagal memuat indeks pool, quote memakai RPC: {e}")
     success(f"Berhasil memuat {len(TOKENS)} token.")
 
+def refresh_pool_index():
+    """Perbarui indeks pair token ke WETH/quote token dan tandai token yang likuid di registry."""
+    global POOLS, QUOTER, ROUTES
+    if POOLS is None:
+        POOLS = PoolIndex(CTX.w3, CTX.router.functions.factory().call()); QUOTER = Quoter(POOLS); ROUTES = RouteFinder(QUOTER)
+    tradable = {s: t['address'] for s, t in TOKENS.items() if s not in ['ETH', 'WETH'] and t.get('address')}
+    hubs = list(dict.fromkeys([CTX.weth_addr] + TOKEN_REGISTRY.quote_tokens()))  # hub rute multi-hop
+    POOLS.refresh([(addr, hub) for addr in tradable.values() for hub in hubs if addr != hub])
+    TOKEN_REGISTRY.set_liquidity({s: POOLS.is_liquid(addr, CTX.weth_addr) for s, addr in tradable.items()})
+
 def select_token_from_list(prompt_title, exclude_symbols=None):
     if exclude_symbols is None: exclude_symbols = []
     sorted_symbols = sorted(
@@ -168,39 +177,93 @@ def select_wallets():
     info("Pilih dompet yang akan digunakan untuk operasi berikutnya:")
     sel_str = prompt("Masukkan indeks (misal: 0 atau 0,2 atau 'all'): ").strip().lower()
     selected_indices = []
-    if sel_str in ('all', ''): selected_indices = list(range(len(accounts)))
+    if sel_str in ('all', ''): selected_indices = list(range(len(CTX.wallets)))
     else:
         for part in sel_str.split(','):
             try:
                 i = int(part.strip())
-                if 0 <= i < len(accounts) and i not in selected_indices: selected_indices.append(i)
+                if 0 <= i < len(CTX.wallets) and i not in selected_indices: selected_indices.append(i)
             except ValueError: pass
     if not selected_indices: warning("Pilihan tidak valid, menggunakan dompet 0 secara default."); selected_indices = [0]
-    sel_accounts = [accounts[i] for i in selected_indices]; sel_pks = [PK_LIST[i] for i in selected_indices]
+    sel_accounts = CTX.wallets.select(selected_indices); sel_pks = [w.key for w in sel_accounts]  # hanya dompet terpilih yang diturunkan
     addresses = ", ".join(f"[cyan]{acc.address}[/cyan]" for acc in sel_accounts)
     success(f"Dompet terpilih untuk proses ini: {addresses}")
     return sel_accounts, sel_pks
 
+def quote_amounts_out(amt, path):
+    """Quote dari reserve yang di-cache (tanpa RPC), fallback ke router.getAmountsOut."""
+    if QUOTER is not None:
+        try:
+            amounts = QUOTER.amounts_out(amt, path)
+            if amounts and amounts[-1] > 0: return amounts
+        except Exception: pass
+    return CTX.router.functions.getAmountsOut(amt, path).call()
+
+def quote_liquidity_amount(eth_wei, token_addr):
+    """Jumlah token untuk addLiquidityETH sesuai rumus router, fallback ke router.getAmountsOut."""
+    if QUOTER is not None:
+        try:
+            token_wei = QUOTER.liquidity_amount(eth_wei, CTX.weth_addr, token_addr)
+            if token_wei: return token_wei
+        except Exception: pass
+    return CTX.router.functions.getAmountsOut(eth_wei, [CTX.weth_addr, token_addr]).call()[-1]
+
+def find_route(amt, src_addr, dst_addr):
+    """Rute terbaik 1-3 hop dari graf pool, fallback ke path langsung. Mengembalikan (path, amount_out)."""
+    if ROUTES is not None:
+        try:
+            route = ROUTES.best_route(src_addr, dst_addr, amt)
+            if route: return route
+        except Exception: pass
+    try: return [src_addr, dst_addr], quote_amounts_out(amt, [src_addr, dst_addr])[-1]
+    except Exception: return None, None
+
 def chk_native(need):
-    balance = w3.eth.get_balance(A)
-    if balance < need: error(f"Saldo ETH tidak cukup. Butuh: {w3.from_wei(need, 'ether')} ETH"); return False
+    balance = CTX.w3.eth.get_balance(A)
+    if balance < need: error(f"Saldo ETH tidak cukup. Butuh: {CTX.w3.from_wei(need, 'ether')} ETH"); return False
     return True
 
-def ensure_approve(token_addr, amt):
-    if token_addr is None: return True
-    c = w3.eth.contract(address=token_addr, abi=ERC20_ABI)
-    alw = c.functions.allowance(A, ROUTER_ADDR).call()
-    if alw < amt:
-        info(f"Mengirim transaksi approve untuk token...")
-        tx = c.functions.approve(ROUTER_ADDR, 2**256 - 1).build_transaction({'from': A, 'nonce': w3.eth.get_transaction_count(A), 'gas': GAS_AP, 'gasPrice': GAS_P, 'chainId': CHAIN})
-        if not chk_native(tx['gas'] * tx['gasPrice']): return False
-        sig = w3.eth.account.sign_transaction(tx, PK); tx_hash = w3.eth.send_raw_transaction(sig.raw_transaction)
-        rec = wait_for_tx(tx_hash, "Menunggu konfirmasi approve...")
-        if rec and rec.status == 1: success(f"Approve berhasil: [yellow]{tx_hash.hex()}[/yellow]"); return True
-        else: error(f"Approve gagal: [yellow]{tx_hash.hex()}[/yellow]"); return False
-    return True
+def send_approve(token_addr, amt, alw=None):
+    """Kirim approve jika allowance kurang tanpa menunggu receipt. Mengembalikan (ok, tx_hash)."""
+    if token_addr is None: return True, None
+    if alw is None and CTX.approvals.is_approved(A, token_addr, ROUTER_ADDR): return True, None  # approve tak terbatas tercatat
+    c = get_contract(CTX.w3, token_addr, ERC20_ABI)
+    if alw is None: alw = c.functions.allowance(A, ROUTER_ADDR).call()
+    CTX.approvals.record(A, token_addr, ROUTER_ADDR, alw)
+    if alw >= amt: return True, None
+    info(f"Mengirim transaksi approve untuk token...")
+    fn = c.functions.approve(ROUTER_ADDR, 2**256 - 1)
+    tx = fn.build_transaction(FEES.tx_params(CTX.w3, fn, A, token_addr, GAS_AP))
+    if not chk_native(tx_cost(tx)): return False, None
+    return True, TXS.send(CTX.w3, tx, PK)
+
+@timed("ensure_approve")
+def ensure_approve(token_addr, amt, alw=None):
+    ok, tx_hash = send_approve(token_addr, amt, alw)
+    if not ok or tx_hash is None: return ok
+    rec = wait_for_tx(tx_hash, "Menunggu konfirmasi approve...")
+    if rec and rec.status == 1: success(f"Approve berhasil: [yellow]{tx_hash.hex()}[/yellow]"); CTX.approvals.mark_approved(A, token_addr, ROUTER_ADDR); return True
+    else: error(f"Approve gagal: [yellow]{tx_hash.hex()}[/yellow]"); return False
+
+def confirm_after_approve(token_addr, approve_hash, tx_hash, message):
+    """Tunggu receipt approve lalu transaksi dependennya. Transaksi dependen gagal jika approve gagal; revert menghapus cache approve."""
+    if approve_hash is None:
+        rec = wait_for_tx(tx_hash, message)
+        if rec is not None and rec.status != 1 and token_addr is not None: CTX.approvals.invalidate(A, token_addr, ROUTER_ADDR)
+        return rec
+    CTX.receipts.track(approve_hash); CTX.receipts.track(tx_hash)
+    approve_rec = wait_for_tx(approve_hash, "Menunggu konfirmasi approve...")
+    rec = wait_for_tx(tx_hash, message)
+    if approve_rec and approve_rec.status == 1:
+        success(f"Approve berhasil: [yellow]{approve_hash.hex()}[/yellow]")
+        if rec is None or rec.status == 1: CTX.approvals.mark_approved(A, token_addr, ROUTER_ADDR)
+        return rec
+    error(f"Approve gagal: [yellow]{approve_hash.hex()}[/yellow]. Transaksi dependen ditandai gagal.")
+    if approve_rec is None: NONCES.reset(A)
+    return None
 
-def do_swap(src_sym, dst_sym, amt, mass_mode=False):
+@timed("do_swap")
+def do_swap(src_sym, dst_sym, amt, mass_mode=False, alw=None):
     global A, PK
     if A is None or PK is None:
         error("Wallet belum dipilih. Silakan pilih wallet terlebih dahulu.")
@@ -215,8 +278,8 @@ def do_swap(src_sym, dst_sym, amt, mass_mode=False):
     deadline = int(time.time()) + 120
 
     # --- Perbaikan: Jangan pernah masukkan None ke path ---
-    src_addr = src['address'] if src['address'] else WETH_ADDR
-    dst_addr = dst['address'] if dst['address'] else WETH_ADDR
+    src_addr = src['address'] if src['address'] else CTX.weth_addr
+    dst_addr = dst['address'] if dst['address'] else CTX.weth_addr
 
     # Jika swap ETH ke ETH, tolak
     if src_sym == 'ETH' and dst_sym == 'ETH':
@@ -227,60 +290,42 @@ def do_swap(src_sym, dst_sym, amt, mass_mode=False):
         error(f"Token tujuan {dst_sym} tidak memiliki address valid.")
         return False
 
-    # Path swap
-    if src_addr and dst_addr:
-        paths = [[src_addr, dst_addr]]
-    elif src_addr:
-        paths = [[src_addr, WETH_ADDR]]
-    else:
-        paths = [[WETH_ADDR, dst_addr]]
-
-    amount_out = None
-    chosen_path = None
-    
-    for p in paths:
-        # Validasi path tidak mengandung None
-        if None in p:
-            continue
-        try:
-            amounts = router.functions.getAmountsOut(amt, p).call()
-            amount_out, chosen_path = amounts[-1], p
-            break
-        except Exception as e:
-            if not mass_mode:
-                error(f"Tidak dapat menemukan pool likuid untuk swap {src_sym} -> {dst_sym}.")
-            continue
-            
+    # Path swap: rute terbaik 1-3 hop lewat WETH/quote token
+    chosen_path, amount_out = find_route(amt, src_addr, dst_addr)
     if amount_out is None:
         if not mass_mode:
             error(f"Tidak dapat menemukan pool likuid untuk swap {src_sym} -> {dst_sym}.")
         return False
+    if len(chosen_path) > 2: info(f"Rute {len(chosen_path) - 1} hop dipakai untuk {src_sym} -> {dst_sym}")
         
     min_out = int(amount_out * (1 - SLIPPAGE))
-    if not ensure_approve(src['address'], amt):
+    approve_hash = None
+    if PIPELINE_APPROVE:
+        ok, approve_hash = send_approve(src['address'], amt, alw)
+        if not ok:
+            return False
+    elif not ensure_approve(src['address'], amt, alw):
         return False
     
     if A is None:
         error(f"Variable A (alamat wallet) adalah None! Tidak bisa melakukan swap.")
         return False
-        
-    nonce = w3.eth.get_transaction_count(A)
 
-    tx_params = {'from': A, 'nonce': nonce, 'gas': GAS_SW, 'gasPrice': GAS_P}
+    value = 0
     if src_sym == "ETH":
-        fn = router.functions.swapExactETHForTokens(min_out, chosen_path, A, deadline)
-        tx_params['value'] = amt
+        fn = CTX.router.functions.swapExactETHForTokens(min_out, chosen_path, A, deadline)
+        value = amt
     elif dst_sym == "ETH":
-        fn = router.functions.swapExactTokensForETH(amt, min_out, chosen_path, A, deadline)
+        fn = CTX.router.functions.swapExactTokensForETH(amt, min_out, chosen_path, A, deadline)
     else:
-        fn = router.functions.swapExactTokensForTokens(amt, min_out, chosen_path, A, deadline)
+        fn = CTX.router.functions.swapExactTokensForTokens(amt, min_out, chosen_path, A, deadline)
 
-    tx = fn.build_transaction(tx_params)
-    if not chk_native(tx['gas'] * tx['gasPrice'] + tx.get('value', 0)):
+    tx = fn.build_transaction(FEES.tx_params(CTX.w3, fn, A, tuple(chosen_path), GAS_SW, value))
+    reserved = FEES.reserve_cost(CTX.w3, "approve", GAS_AP) if approve_hash else 0
+    if not chk_native(tx_cost(tx) + reserved):
         return False
-    sig = w3.eth.account.sign_transaction(tx, PK)
-    tx_hash = w3.eth.send_raw_transaction(sig.raw_transaction)
-    rec = wait_for_tx(tx_hash, f"Mengirim swap {src_sym} -> {dst_sym}...")
+    tx_hash = TXS.send(CTX.w3, tx, PK)
+    rec = confirm_after_approve(src['address'], approve_hash, tx_hash, f"Mengirim swap {src_sym} -> {dst_sym}...")
     if rec and rec.status == 1:
         success(f"Swap {src_sym} -> {dst_sym} berhasil! 🎉 Tx Hash: [yellow]{tx_hash.hex()}[/yellow]")
         return True
@@ -288,14 +333,16 @@ def do_swap(src_sym, dst_sym, amt, mass_mode=False):
         error(f"Swap {src_sym} -> {dst_sym} gagal! ❌ Tx Hash: [yellow]{tx_hash.hex()}[/yellow]")
         return False
 
+@timed("add_liquidity")
 def add_liquidity(token_sym, eth_wei):
     token_data = TOKENS[token_sym]; token_addr = token_data['address']; deadline = int(time.time()) + 120
-    info(f"Mencoba menambah likuiditas untuk {w3.from_wei(eth_wei, 'ether')} ETH dan {token_sym}...")
+    info(f"Mencoba menambah likuiditas untuk {CTX.w3.from_wei(eth_wei, 'ether')} ETH dan {token_sym}...")
     try:
-        _, amounts = router.functions.getAmountsOut(eth_wei, [WETH_ADDR, token_addr]).call(); token_wei = amounts
-    except Exception as e: error(f"Tidak dapat menghitung jumlah token. Mungkin pool belum ada. Error: {e}"); return
-    info(f"Dibutuhkan [bold]{w3.from_wei(token_wei, 'ether')} {token_sym}[/bold] untuk dipasangkan dengan {w3.from_wei(eth_wei, 'ether')} ETH.")
-    token_contract = w3.eth.contract(address=token_addr, abi=ERC20_ABI); token_balance = token_contract.functions.balanceOf(A).call()
+        token_wei = quote_liquidity_amount(eth_wei, token_addr)
+    except Exception as e: error(f"Tidak dapat menghitung jumlah token. Mungkin pool belum ada. Error: {e}"); return False
+    token_decimals = token_data.get('decimals', 18)
+    info(f"Dibutuhkan [bold]{format_units(token_wei, token_decimals)} {token_sym}[/bold] untuk dipasangkan dengan {CTX.w3.from_wei(eth_wei, 'ether')} ETH.")
+    token_contract = get_contract(CTX.w3, token_addr, ERC20_ABI); token_balance = token_contract.functions.balanceOf(A).call()
     
     # Periksa saldo dengan toleransi kecil
     if token_balance < token_wei:
@@ -305,8 +352,8 @@ def add_liquidity(token_sym, eth_wei):
         eth_min = int(eth_wei * (1 - LIQUIDITY_SLIPPAGE))
         
         if token_balance < token_min:
-            error(f"Saldo {token_sym} tidak cukup. Butuh minimal: {w3.from_wei(token_min, 'ether')}, Punya: {w3.from_wei(token_balance, 'ether')}")
-            return
+            error(f"Saldo {token_sym} tidak cukup. Butuh minimal: {format_units(token_min, token_decimals)}, Punya: {format_units(token_balance, token_decimals)}")
+            return False
         else:
             info(f"Saldo cukup dengan toleransi slippage 1%. Menggunakan jumlah yang tersedia.")
             token_wei = token_balance  # Gunakan saldo yang tersedia
@@ -316,15 +363,23 @@ def add_liquidity(token_sym, eth_wei):
         token_min = int(token_wei * (1 - LIQUIDITY_SLIPPAGE))
         eth_min = int(eth_wei * (1 - LIQUIDITY_SLIPPAGE))
     
-    if not ensure_approve(token_addr, token_wei): return
-    fn = router.functions.addLiquidityETH(token_addr, token_wei, token_min, eth_min, A, deadline)
-    tx_params = {'from': A, 'value': eth_wei, 'nonce': w3.eth.get_transaction_count(A), 'gas': GAS_SW, 'gasPrice': GAS_P}
-    tx = fn.build_transaction(tx_params)
-    if not chk_native(tx['gas'] * tx['gasPrice'] + tx.get('value', 0)): return
-    sig = w3.eth.account.sign_transaction(tx, PK); tx_hash = w3.eth.send_raw_transaction(sig.raw_transaction)
-    rec = wait_for_tx(tx_hash, "Menambah likuiditas...")
-    if rec and rec.status == 1: success(f"Likuiditas berhasil ditambah! Tx Hash: [yellow]{tx_hash.hex()}[/yellow]")
-    else: error(f"Gagal menambah likuiditas. Tx Hash: [yellow]{tx_hash.hex()}[/yellow]")
+    approve_hash = None
+    if PIPELINE_APPROVE:
+        ok, approve_hash = send_approve(token_addr, token_wei)
+        if not ok: return False
+    elif not ensure_approve(token_addr, token_wei): return False
+    fn = CTX.router.functions.addLiquidityETH(token_addr, token_wei, token_min, eth_min, A, deadline)
+    tx = fn.build_transaction(FEES.tx_params(CTX.w3, fn, A, token_addr, GAS_SW, eth_wei))
+    reserved = FEES.reserve_cost(CTX.w3, "approve", GAS_AP) if approve_hash else 0
+    if not chk_native(tx_cost(tx) + reserved): return False
+    tx_hash = TXS.send(CTX.w3, tx, PK)
+    rec = confirm_after_approve(token_addr, approve_hash, tx_hash, "Menambah likuiditas...")
+    if rec and rec.status == 1:
+        success(f"Likuiditas berhasil ditambah! Tx Hash: [yellow]{tx_hash.hex()}[/yellow]")
+        return True
+    else:
+        error(f"Gagal menambah likuiditas. Tx Hash: [yellow]{tx_hash.hex()}[/yellow]")
+        return False
 
 def main_manual_swap():
     global A, PK
@@ -334,10 +389,10 @@ def main_manual_swap():
     d = select_token_from_list("Pilih Token Tujuan (TO)", exclude_symbols=[s])
     if d is None: info("Swap dibatalkan."); return
     try:
-        raw_amt = float(prompt(f"Jumlah {s} yang akan di-swap: ").strip())
+        raw_amt = prompt(f"Jumlah {s} yang akan di-swap: ").strip()
         repeat = int(prompt("Ulangi berapa kali? (default 1): ") or 1)
         delay = float(prompt("Jeda antar swap (detik, default 1): ") or 1)
-        amount_wei = int(raw_amt * (10 ** TOKENS[s]['decimals']))
+        amount_wei = parse_units(raw_amt, TOKENS[s]['decimals'])
     except ValueError: error("Input numerik tidak valid."); return
     selected_wallets, selected_pks = select_wallets()
     for i, (acct, pk) in enumerate(zip(selected_wallets, selected_pks)):
@@ -348,6 +403,75 @@ def main_manual_swap():
             do_swap(s, d, amount_wei)
             if j < repeat - 1: info(f"Menunggu {delay} detik..."); time.sleep(delay)
 
+def sweep_wallet_to_eth():
+    """
+    Swap semua token dompet A ke ETH sekaligus: saldo & allowance dibaca dalam satu batch,
+    approve + swap dibangun dengan nonce berurutan, dikirim sebagai satu burst,
+    lalu semua receipt dikumpulkan di akhir.
+    """
+    sweep_tokens = {s: t for s, t in TOKENS.items() if s not in ["ETH", "WETH"] and t.get("address")}
+    try: balances = token_balances(CTX.w3, A, [t["address"] for t in sweep_tokens.values()])
+    except Exception as e: error(f"Gagal membaca saldo token: {e}"); return
+    held = {s: t for s, t in sweep_tokens.items() if balances.get(t["address"])}
+    if not held: info("Tidak ada token untuk di-swap."); return
+    # Hanya token yang approve-nya belum tercatat di cache yang dibaca on-chain
+    unknown = [t["address"] for t in held.values() if not CTX.approvals.is_approved(A, t["address"], ROUTER_ADDR)]
+    try: router_allowances = allowances(CTX.w3, A, unknown, ROUTER_ADDR) if unknown else {}
+    except Exception: router_allowances = {}
+    for addr, alw in router_allowances.items(): CTX.approvals.record(A, addr, ROUTER_ADDR, alw)
+
+    deadline = int(time.time()) + 300
+    tx_params = {'from': A, 'chainId': CHAIN, **FEES.fees(CTX.w3)}
+    rows, plan = {}, []  # plan: (simbol, jenis tx, tx)
+    for symbol, token_data in held.items():
+        addr, balance = token_data["address"], balances[token_data["address"]]
+        human_bal = f"{format_units(balance, token_data.get('decimals', 18)):.6f}"
+        path, amount_out = find_route(balance, addr, CTX.weth_addr)
+        if amount_out is None:
+            rows[symbol] = [symbol, human_bal, "-", "[red]Tidak ada rute[/red]", "-"]; continue
+        rows[symbol] = [symbol, human_bal, f"{len(path) - 1} hop", "[dim]Menunggu[/dim]", "-"]
+        fn = CTX.router.functions.swapExactTokensForETH(balance, int(amount_out * (1 - SLIPPAGE)), path, A, deadline)
+        if not CTX.approvals.is_approved(A, addr, ROUTER_ADDR) and (router_allowances.get(addr) or 0) < balance:
+            c = get_contract(CTX.w3, addr, ERC20_ABI)
+            plan.append((symbol, "approve", c.functions.approve(ROUTER_ADDR, 2**256 - 1).build_transaction({**tx_params, 'gas': FEES.reserve_gas("approve", GAS_AP)})))
+            # Approve masih pending di burst yang sama, estimasi swap pasti revert: pakai estimasi ter-cache
+            swap_gas = FEES.reserve_gas(fn.fn_name, GAS_SW)
+        else: swap_gas = FEES.gas_limit(fn, {'from': A}, (fn.fn_name, tuple(path)), GAS_SW)
+        plan.append((symbol, "swap", fn.build_transaction({**tx_params, 'gas': swap_gas})))
+
+    if plan:
+        if not chk_native(sum(tx_cost(tx) for _, _, tx in plan)): return
+        for _, _, tx in plan: tx['nonce'] = NONCES.allocate(CTX.w3, A)
+        info(f"Mengirim {len(plan)} transaksi untuk {len({s for s, _, _ in plan})} token sekaligus...")
+        futures = [TXS.submit(CTX.w3, tx, PK) for _, _, tx in plan]
+        results = [(None, f.exception()) if f.exception() else (f.result(), None) for f in futures]
+        sent = [(symbol, kind, tx_hash) for (symbol, kind, _), (tx_hash, _) in zip(plan, results) if tx_hash is not None]
+        rejected = [(symbol, err) for (symbol, _, _), (tx_hash, err) in zip(plan, results) if tx_hash is None]
+        if rejected:
+            # Nonce setelah transaksi yang ditolak tidak bisa dipercaya lagi
+            NONCES.reset(A)
+            for symbol, err in rejected: rows[symbol][3] = "[red]Ditolak node[/red]"; warning(f"{symbol}: {err}")
+        receipts, wait_until = {}, time.time() + 180  # satu batas waktu untuk seluruh burst
+        with console.status(f"[bold green]Menunggu {len(sent)} receipt...[/bold green]", spinner="dots"):
+            for symbol, kind, tx_hash in sent:
+                try: receipts[(symbol, kind)] = CTX.receipts.wait(tx_hash, timeout=max(1, wait_until - time.time()))
+                except Exception: receipts[(symbol, kind)] = None
+        for symbol, kind, tx_hash in sent:
+            rec, addr = receipts[(symbol, kind)], held[symbol]["address"]
+            if rec is not None and kind == "approve" and rec.status == 1: CTX.approvals.mark_approved(A, addr, ROUTER_ADDR)
+            if rec is not None and kind == "swap" and rec.status != 1: CTX.approvals.invalidate(A, addr, ROUTER_ADDR)
+            if kind == "swap": rows[symbol][4] = tx_hash.hex()
+            if rows[symbol][3] != "[dim]Menunggu[/dim]": continue  # status gagal pertama yang ditampilkan
+            if rec is None: rows[symbol][3] = f"[yellow]Timeout {kind}[/yellow]"; NONCES.reset(A)
+            elif rec.status != 1: rows[symbol][3] = f"[red]Gagal {kind}[/red]"
+            elif kind == "swap": rows[symbol][3] = "[green]Berhasil[/green]"
+
+    table = Table(title=f"Sweep Token ke ETH - {A}", border_style="magenta", show_header=True, header_style="bold cyan")
+    for col, style in [("Token", "white"), ("Saldo", "green"), ("Rute", "cyan"), ("Status", "white"), ("Tx Swap", "dim")]:
+        table.add_column(col, style=style)
+    for row in rows.values(): table.add_row(*row)
+    console.print(table)
+
 def main_swap_all_to_eth():
     global A, PK
     info("Memulai Swap SEMUA Token ke ETH...")
@@ -355,17 +479,8 @@ def main_swap_all_to_eth():
     for i, (acct, pk) in enumerate(zip(selected_wallets, selected_pks)):
         A, PK = acct.address, pk
         console.print(Rule(f"Memproses Dompet {i+1}/{len(selected_wallets)}: {A}", style="bold green"))
-        for symbol, token_data in TOKENS.items():
-            if symbol in ["ETH", "WETH"] or not token_data.get("address"): continue
-            try:
-                contract = w3.eth.contract(address=token_data["address"], abi=ERC20_ABI)
-                balance = contract.functions.balanceOf(A).call()
-                if balance > 0:
-                    human_bal = balance / (10**token_data.get('decimals', 18))
-                    info(f"Menemukan {human_bal:.6f} [bold]{symbol}[/bold]. Melakukan swap ke ETH...")
-                    do_swap(symbol, "ETH", balance, mass_mode=True)
-                    time.sleep(2)
-            except Exception as e: error(f"Tidak dapat memproses {symbol}: {e}")
+        try: sweep_wallet_to_eth()
+        except Exception as e: error(f"Sweep gagal untuk dompet {A}: {e}")
 
 def main_add_liquidity():
     global A, PK
@@ -377,7 +492,7 @@ def main_add_liquidity():
     if token_sym is None: info("Operasi tambah likuiditas dibatalkan."); return
     try:
         eth_amt_str = prompt(f"Jumlah ETH yang akan ditambahkan untuk pasangan {token_sym}: ").strip()
-        eth_wei = w3.to_wei(float(eth_amt_str), 'ether')
+        eth_wei = CTX.w3.to_wei(float(eth_amt_str), 'ether')
     except ValueError: error("Jumlah ETH tidak valid."); return
     selected_wallets, selected_pks = select_wallets()
     for i, (acct, pk) in enumerate(zip(selected_wallets, selected_pks)):
@@ -385,6 +500,58 @@ def main_add_liquidity():
         console.print(Rule(f"Memproses Dompet {i+1}/{len(selected_wallets)}: {A}", style="bold green"))
         add_liquidity(token_sym, eth_wei)
 
+def main_pre_approve_all():
+    """
+    Approve semua token ke router untuk semua dompet dalam satu putaran: allowance tiap dompet dibaca
+    dalam satu batch, approve yang kurang dikirim lewat pipeline, lalu hasilnya dicatat di cache approve
+    sehingga swap dan tambah likuiditas berikutnya tidak perlu membaca allowance lagi.
+    """
+    tokens = [t["address"] for s, t in TOKENS.items() if s not in ["ETH", "WETH"] and t.get("address")]
+    if not tokens: info("Tidak ada token untuk di-approve."); return
+    wallets = CTX.wallets.all()
+    TXS.use_processes(len(wallets) >= SIGN_PROCESS_MIN_WALLETS)
+    try: balances = eth_balances(CTX.w3, [w.address for w in wallets])
+    except Exception: balances = {}
+    rows, pending = {}, []  # pending: (dompet, token, future tx hash)
+    for wallet in wallets:
+        addr, pk = wallet.address, wallet.key
+        unknown = [t for t in tokens if not CTX.approvals.is_approved(addr, t, ROUTER_ADDR)]
+        rows[addr] = [addr, str(len(tokens) - len(unknown)), "0", "-", "-"]
+        if not unknown: continue
+        try: alws = allowances(CTX.w3, addr, unknown, ROUTER_ADDR)
+        except Exception as e: rows[addr][3] = "[red]Gagal baca allowance[/red]"; warning(f"{addr}: {e}"); continue
+        for t, alw in alws.items(): CTX.approvals.record(addr, t, ROUTER_ADDR, alw)
+        missing = [t for t in unknown if not CTX.approvals.is_approved(addr, t, ROUTER_ADDR)]
+        rows[addr][1:3] = [str(len(tokens) - len(missing)), str(len(missing))]
+        if not missing: continue
+        plan = []
+        for t in missing:
+            fn = get_contract(CTX.w3, t, ERC20_ABI).functions.approve(ROUTER_ADDR, 2**256 - 1)
+            plan.append((t, fn.build_transaction(FEES.tx_params(CTX.w3, fn, addr, t, GAS_AP))))
+        if balances.get(addr) is not None and balances[addr] < sum(tx_cost(tx) for _, tx in plan):
+            rows[addr][3] = "[red]Saldo ETH kurang[/red]"; continue
+        for t, tx in plan:
+            tx['nonce'] = NONCES.allocate(CTX.w3, addr)
+            pending.append((addr, t, TXS.submit(CTX.w3, tx, pk)))
+    if pending:
+        info(f"Mengirim {len(pending)} approve untuk {len({a for a, _, _ in pending})} dompet sekaligus...")
+        counts = {a: [0, 0] for a, _, _ in pending}  # dompet -> [berhasil, gagal]
+        wait_until = time.time() + 180  # satu batas waktu untuk seluruh putaran
+        with console.status(f"[bold green]Menunggu {len(pending)} receipt approve...[/bold green]", spinner="dots"):
+            for addr, t, fut in pending:
+                try: rec = CTX.receipts.wait(fut.result(), timeout=max(1, wait_until - time.time()))
+                except Exception: rec = None
+                if rec is not None and rec.status == 1: CTX.approvals.mark_approved(addr, t, ROUTER_ADDR); counts[addr][0] += 1
+                else: counts[addr][1] += 1
+        for addr, (ok, failed) in counts.items():
+            rows[addr][3:5] = [f"[green]{ok}[/green]", f"[red]{failed}[/red]" if failed else "0"]
+            if failed: NONCES.reset(addr)  # nonce setelah approve yang gagal/pending tidak bisa dipercaya
+    table = Table(title=f"Pre-approve {len(tokens)} Token", border_style="magenta", show_header=True, header_style="bold cyan")
+    for col, style in [("Dompet", "white"), ("Sudah Approve", "green"), ("Perlu Approve", "yellow"), ("Berhasil", "white"), ("Gagal", "white")]:
+        table.add_column(col, style=style)
+    for row in rows.values(): table.add_row(*row)
+    console.print(table)
+
 def main_toggle_mass_swap():
     global mass_swap_enabled
     mass_swap_enabled = not mass_swap_enabled
@@ -400,7 +567,9 @@ def main_toggle_proxy():
 
 def main_automated_swap():
     """Fungsi swap dan tambah likuiditas otomatis untuk Docker."""
+    global A, PK
     info("Menjalankan dalam mode otomatis...")
+    METRICS.begin_run()
     try:
         # --- Konfigurasi dari environment variables ---
         swap_amount_env = float(os.getenv("AUTOMATION_SWAP_AMOUNT", "0.0"))
@@ -411,69 +580,83 @@ def main_automated_swap():
         # --- Tentukan dompet mana yang akan diproses ---
         wallets_to_process = []
         if wallet_target.lower() == 'all':
-            wallets_to_process = accounts
+            wallets_to_process = CTX.wallets.all()
             info(f"Mode 'all' aktif. Memproses {len(wallets_to_process)} dompet.")
         else:
             try:
                 wallet_index = int(wallet_target)
-                if wallet_index >= len(accounts):
+                if not 0 <= wallet_index < len(CTX.wallets):
                     error(f"Indeks dompet {wallet_index} tidak valid.")
                     return
-                wallets_to_process.append(accounts[wallet_index])
+                wallets_to_process = CTX.wallets.select([wallet_index])
             except ValueError:
                 error(f"Target dompet '{wallet_target}' tidak valid. Gunakan nomor atau 'all'.")
                 return
         
+        # --- Indeks pool: hanya token dengan pair WETH likuid yang dicoba ---
+        target_tokens = [s for s in TOKENS if s not in ['ETH', 'WETH'] and TOKENS[s].get('address')]
+        try:
+            refresh_pool_index()
+            liquid_tokens = [s for s in target_tokens if POOLS.is_liquid(TOKENS[s]['address'], CTX.weth_addr)]
+            info(f"Indeks pool: {len(liquid_tokens)} dari {len(target_tokens)} token memiliki pool WETH likuid")
+            if liquid_tokens: target_tokens = liquid_tokens
+        except Exception as e:
+            warning(f"Gagal memperbarui indeks pool, mencoba semua token: {e}")
+
         # --- Loop untuk setiap dompet yang dipilih ---
         for i, wallet in enumerate(wallets_to_process):
             console.print(Rule(f"Memproses dompet {i+1}/{len(wallets_to_process)}", style="bold green"))
             
-            A, PK = wallet.address, PK_LIST[accounts.index(wallet)]
+            start = time.time()
+            with bind(wallet=wallet.address):
+                JOURNAL.event("wallet_start", index=i)
+                A, PK = wallet.address, wallet.key
             
-            console.print(Rule(f"Menggunakan dompet: {A}", style="bold green"))
+                console.print(Rule(f"Menggunakan dompet: {A}", style="bold green"))
 
-            # Tentukan jumlah swap
-            if swap_amount_env > 0.0:
-                swap_amount_eth = swap_amount_env
-            else:
-                swap_amount_eth = random.uniform(0.0001, 0.01)
+                # Tentukan jumlah swap
+                if swap_amount_env > 0.0:
+                    swap_amount_eth = swap_amount_env
+                else:
+                    swap_amount_eth = random.uniform(0.0001, 0.01)
             
-            info(f"Jumlah dasar untuk operasi: {swap_amount_eth:.6f} ETH")
+                info(f"Jumlah dasar untuk operasi: {swap_amount_eth:.6f} ETH")
 
-            # --- Langkah 1: Automated Swap ---
-            src_sym = "ETH"
-            target_tokens = [s for s in TOKENS if s not in ['ETH', 'WETH'] and TOKENS[s].get('address')]
-            if not target_tokens:
-                error("Tidak ada token tujuan yang tersedia.")
-                continue
+                # --- Langkah 1: Automated Swap ---
+                src_sym = "ETH"
+                if not target_tokens:
+                    error("Tidak ada token tujuan yang tersedia.")
+                    continue
 
-            random.shuffle(target_tokens)
+                random.shuffle(target_tokens)
             
-            swap_successful = False
-            successful_dst_sym = None
-            for dst_sym in target_tokens:
-                info(f"Mencoba swap: {src_sym} -> {dst_sym}")
-                amount_wei = w3.to_wei(swap_amount_eth, 'ether')
+                swap_successful = False
+                successful_dst_sym = None
+                for dst_sym in target_tokens:
+                    info(f"Mencoba swap: {src_sym} -> {dst_sym}")
+                    amount_wei = CTX.w3.to_wei(swap_amount_eth, 'ether')
                 
-                if do_swap(src_sym, dst_sym, amount_wei, mass_mode=True):
-                    swap_successful = True
-                    successful_dst_sym = dst_sym
-                    break
-                else:
-                    info(f"Swap ke {dst_sym} tidak berhasil. Mencoba token berikutnya...")
-                    time.sleep(2)
-
-            # --- Langkah 2: Automated Add Liquidity (jika swap berhasil) ---
-            if swap_successful and add_liquidity_enabled:
-                info(f"Swap berhasil. Menunggu 5 detik sebelum menambah likuiditas...")
-                time.sleep(5)
+                    if do_swap(src_sym, dst_sym, amount_wei, mass_mode=True):
+                        swap_successful = True
+                        successful_dst_sym = dst_sym
+                        break
+                    else:
+                        info(f"Swap ke {dst_sym} tidak berhasil. Mencoba token berikutnya...")
+                        time.sleep(2)
+
+                # --- Langkah 2: Automated Add Liquidity (jika swap berhasil) ---
+                if swap_successful and add_liquidity_enabled:
+                    info(f"Swap berhasil. Menunggu 5 detik sebelum menambah likuiditas...")
+                    time.sleep(5)
                 
-                info(f"Menambah likuiditas untuk pasangan ETH / {successful_dst_sym}...")
-                liquidity_eth_wei = w3.to_wei(swap_amount_eth, 'ether')
-                add_liquidity(successful_dst_sym, liquidity_eth_wei)
-
-            elif not swap_successful:
-                error(f"Gagal menemukan token yang bisa di-swap untuk dompet {A}.")
+                    info(f"Menambah likuiditas untuk pasangan ETH / {successful_dst_sym}...")
+                    liquidity_eth_wei = CTX.w3.to_wei(swap_amount_eth, 'ether')
+                    ok = add_liquidity(successful_dst_sym, liquidity_eth_wei)
+                else:
+                    ok = swap_successful
+                    if not swap_successful:
+                        error(f"Gagal menemukan token yang bisa di-swap untuk dompet {A}.")
+                JOURNAL.event("wallet_done", level="info" if ok else "warning", ok=ok, duration_ms=round((time.time() - start) * 1000, 1))
 
             # Jeda antar dompet
             if len(wallets_to_process) > 1 and i < len(wallets_to_process) - 1:
@@ -483,6 +666,11 @@ def main_automated_swap():
     except Exception as e:
         error(f"Terjadi error dalam mode otomatis: {e}")
     finally:
+        try:
+            report = METRICS.write_json(METRICS_REPORT)
+            info(f"Metrik run: {report['rpc']['calls']} panggilan RPC, {report['rpc']['retries']} retry")
+        except Exception as e:
+            warning(f"Gagal menulis laporan metrik: {e}")
         info("Operasi otomatis selesai.")
 
 def display_wallet_summary():
@@ -490,13 +678,18 @@ def display_wallet_summary():
     table.add_column("Indeks", style="cyan", width=6)
     table.add_column("Alamat Dompet", style="white")
     table.add_column("Saldo ETH", style="green", justify="right")
-    for idx, acc in enumerate(accounts):
-        try:
-            bal_wei = w3.eth.get_balance(acc.address); bal_eth = w3.from_wei(bal_wei, 'ether')
-            table.add_row(str(idx), acc.address, f"{bal_eth:.6f} ETH")
-        except Exception:
-            table.add_row(str(idx), acc.address, "[red]Gagal[/red]")
+    wallets = CTX.wallets.select(range(min(len(CTX.wallets), WALLET_SUMMARY_LIMIT)))  # sisa dompet baru diturunkan saat dipilih
+    try: balances = eth_balances(CTX.w3, [acc.address for acc in wallets])
+    except Exception: balances = {}
+    for acc in wallets:
+        bal_wei = balances.get(acc.address)
+        if bal_wei is not None:
+            bal_eth = CTX.w3.from_wei(bal_wei, 'ether')
+            table.add_row(str(acc.index), acc.address, f"{bal_eth:.6f} ETH")
+        else:
+            table.add_row(str(acc.index), acc.address, "[red]Gagal[/red]")
     console.print(table)
+    if len(CTX.wallets) > len(wallets): info(f"{len(CTX.wallets) - len(wallets)} dompet lainnya tidak ditampilkan (indeks {len(wallets)}-{len(CTX.wallets) - 1}).")
 
 def display_main_menu():
     mass_swap_state = "[bold green]ON[/bold green]" if mass_swap_enabled else "[bold red]OFF[/bold red]"
@@ -505,16 +698,19 @@ def display_main_menu():
 [yellow]2.[/yellow] [white]Swap SEMUA Token ke ETH[/white]
 [yellow]3.[/yellow] [white]Tambah Likuiditas (Pasangan ETH)[/white]
 [yellow]4.[/yellow] [white]Toggle Mode Mass Swap (Saat ini: {mass_swap_state})[/white]
-[yellow]5.[/yellow] [white]Keluar[/white]
+[yellow]5.[/yellow] [white]Pre-approve Semua Token (Semua Dompet)[/white]
+[yellow]6.[/yellow] [white]Keluar[/white]
 """
     console.print(Panel(menu_text, title="[bold]PILIH AKSI[/bold]", border_style="cyan", expand=False))
 
 if __name__ == "__main__":
     try:
+        connect_rpc()
         fetch_and_load_tokens()
 
         # Periksa apakah mode otomatis diaktifkan
         if os.getenv('AUTOMATION_MODE', 'false').lower() == 'true':
+            serve_prometheus()
             main_automated_swap()
         else:
             # Jalankan loop interaktif seperti biasa
@@ -523,24 +719,25 @@ if __name__ == "__main__":
                 console.print(Rule("[bold magenta]Mega Testnet Trading Bot v2.3 (Proxy Enabled)[/bold magenta]"))
                 display_wallet_summary()
                 display_main_menu()
-                choice = prompt("Masukkan pilihan Anda (1-5): ")
+                choice = prompt("Masukkan pilihan Anda (1-6): ")
                 
                 actions = {
                     '1': main_manual_swap,
                     '2': main_swap_all_to_eth,
                     '3': main_add_liquidity,
                     '4': main_toggle_proxy,
+                    '5': main_pre_approve_all,
                 }
 
                 if choice in actions:
                     actions[choice]()
-                elif choice == '5':
+                elif choice == '6':
                     info("Keluar dari bot. Sampai jumpa!")
                     break
                 else:
                     error("Pilihan tidak valid, silakan coba lagi.")
                 
-                if choice != '5':
+                if choice != '6':
                     prompt("\nOperasi selesai. Tekan Enter untuk kembali ke menu utama...")
     except Exception as e:
         error(f"[CRITICAL] Error utama dalam program: {e}")
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Jurnal run berformat JSONL untuk mode otomatis/headless.
+Dengan LOG_FORMAT=json, console rich diganti HeadlessConsole: setiap pesan dan event
+(dompet, tahap, tx hash, gas terpakai, durasi) ditulis sebagai satu baris JSON ringkas
+lewat writer ber-buffer, tanpa render markup, spinner maupun tabel rich.
+"""
+
+import atexit
+import contextvars
+import functools
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+from rich.console import Console
+from rich.errors import StyleSyntaxError
+from rich.style import Style
+
+load_dotenv()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "rich").lower()
+HEADLESS = LOG_FORMAT == "json"
+JOURNAL_BUFFER_LINES = int(os.getenv("JOURNAL_BUFFER_LINES", "256"))
+JOURNAL_FLUSH_INTERVAL = float(os.getenv("JOURNAL_FLUSH_INTERVAL", "1.0"))
+
+# Penanda level dari helper info/success/error/warning di tiap skrip
+_LEVEL_MARKERS = {"[*]": "info", "[+]": "success", "[!]": "error", "[-]": "warning"}
+_TAG_RE = re.compile(r"\[(/?)([^\[\]]*)\]")
+
+_context = contextvars.ContextVar("journal_context", default={})
+
+@functools.lru_cache(maxsize=256)
+def _is_style(content):
+    try:
+        Style.parse(content)
+    except StyleSyntaxError:
+        return False
+    return True
+
+def _strip_tag(match):
+    closing, content = match.groups()
+    if closing or content.startswith(("link=", "@")) or (content.strip() and _is_style(content)):
+        return ""
+    # Bukan style rich, mis. [do_swap] atau penanda level [*]: biarkan apa adanya
+    return match.group(0)
+
+def strip_markup(text):
+    """Buang tag markup rich ([bold], [/yellow], ...) tanpa merender; teks berkurung lain tetap utuh."""
+    return _TAG_RE.sub(_strip_tag, text)
+
+class JournalWriter:
+    """Writer JSONL thread-safe; baris ditahan di buffer dan ditulis per batch."""
+
+    def __init__(self, stream=None, max_lines=JOURNAL_BUFFER_LINES, flush_interval=JOURNAL_FLUSH_INTERVAL):
+        self.stream = stream or sys.stdout
+        self.max_lines = max_lines
+        self.flush_interval = flush_interval
+        self.enabled = HEADLESS
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flusher = None
+        atexit.register(self.flush)
+
+    def _start_flusher(self):
+        # Baris tetap keluar saat bot idle (mis. menunggu siklus berikutnya)
+        def loop():
+            while True:
+                time.sleep(self.flush_interval)
+                self.flush()
+        self._flusher = threading.Thread(target=loop, daemon=True)
+        self._flusher.start()
+
+    def event(self, event, level="info", **fields):
+        """Catat satu event. Field konteks dari bind() ikut disertakan."""
+        if not self.enabled:
+            return
+        record = {"ts": round(time.time(), 3), "level": level, "event": event, **_context.get(), **fields}
+        line = json.dumps(record, separators=(",", ":"), default=str)
+        with self._lock:
+            self._buffer.append(line)
+            full = len(self._buffer) >= self.max_lines
+            if self._flusher is None:
+                self._start_flusher()
+        if full or level == "error":
+            self.flush()
+
+    def log(self, level, msg):
+        self.event("log", level=level, msg=msg)
+
+    def tx(self, tx_hash, receipt):
+        """Event hasil transaksi: hash, status, gas terpakai dan blok (receipt None = timeout)."""
+        if not self.enabled:
+            return
+        tx_hex = "0x" + bytes(tx_hash).hex()
+        if receipt is None:
+            self.event("tx", level="warning", tx=tx_hex, status=None)
+            return
+        self.event("tx", level="info" if receipt.status == 1 else "warning", tx=tx_hex,
+                   status=receipt.status, gas_used=receipt.gasUsed, block=receipt.blockNumber)
+
+    def flush(self):
+        with self._lock:
+            if not self._buffer:
+                return
+            lines, self._buffer = self._buffer, []
+        try:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+        except Exception:
+            pass
+
+JOURNAL = JournalWriter()
+
+@contextmanager
+def bind(**fields):
+    """
+    Ikat field (mis. wallet, stage) ke semua event di dalam blok, per thread/task.
+    Field yang sudah terikat di scope luar tidak ditimpa.
+    """
+    current = _context.get()
+    token = _context.set({**fields, **current})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+class _NullStatus:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def update(self, *args, **kwargs):
+        pass
+
+class HeadlessConsole:
+    """Pengganti rich Console untuk mode headless: setiap print menjadi event jurnal."""
+
+    def __init__(self, journal=JOURNAL):
+        self.journal = journal
+        self.quiet = False
+
+    def print(self, *objects, **kwargs):
+        if self.quiet:
+            return
+        for obj in objects:
+            if isinstance(obj, str):
+                text = strip_markup(obj).strip()
+                level = _LEVEL_MARKERS.get(text[:3])
+                if level:
+                    text = text[3:].strip()
+                self.journal.log(level or "info", text)
+            elif hasattr(obj, "columns") and hasattr(obj, "row_count"):
+                self._table(obj)
+            else:
+                title = getattr(obj, "title", None) or getattr(obj, "renderable", None)
+                if title:
+                    self.journal.event("section", title=strip_markup(str(title)).strip())
+
+    def _table(self, table):
+        headers = [strip_markup(str(col.header)) for col in table.columns]
+        rows = [
+            {h: strip_markup(str(cell)) for h, cell in zip(headers, cells)}
+            for cells in zip(*(col._cells for col in table.columns))
+        ]
+        self.journal.event("table", title=strip_markup(str(table.title or "")), rows=rows)
+
+    def status(self, *args, **kwargs):
+        return _NullStatus()
+
+    def input(self, prompt=""):
+        return input(strip_markup(prompt))
+
+    def rule(self, title="", **kwargs):
+        self.journal.event("section", title=strip_markup(str(title)).strip())
+
+def make_console():
+    """Console rich biasa, atau HeadlessConsole jika LOG_FORMAT=json."""
+    return HeadlessConsole() if HEADLESS else Console()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Instrumentasi RPC dan latensi per tahap.
+Middleware Web3 menghitung panggilan per metode RPC, hook sesi HTTP menghitung byte
+dan retry, dan timer tahap (ensure_approve, do_swap, add_liquidity, wait_for_tx)
+mencatat durasi. Hasilnya bisa ditulis sebagai laporan JSON per run atau
+diekspor dalam format teks Prometheus.
+"""
+
+import asyncio
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from web3.middleware.base import Web3Middleware
+
+from journal import JOURNAL, bind
+
+METRICS_REPORT = os.getenv("METRICS_REPORT", "metrics_report.json")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRIC_PREFIX = "gte"
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+class Metrics:
+    """
+    Penampung metrik thread-safe. Counter bersifat kumulatif (untuk Prometheus),
+    laporan JSON berisi selisih sejak begin_run() dan sampel latensi run tersebut.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rpc_calls = defaultdict(int)
+        self.rpc_errors = defaultdict(int)
+        self.rpc_seconds = defaultdict(float)
+        self.totals = defaultdict(int)  # http_requests, request_bytes, response_bytes, retries
+        self.stage_count = defaultdict(int)
+        self.stage_failures = defaultdict(int)
+        self.stage_seconds = defaultdict(float)
+        self._run_samples = defaultdict(list)
+        self._baseline = self._counters()
+        self._run_started = time.time()
+
+    def _counters(self):
+        return {
+            "rpc_calls": dict(self.rpc_calls),
+            "rpc_errors": dict(self.rpc_errors),
+            "totals": dict(self.totals),
+            "stage_failures": dict(self.stage_failures),
+        }
+
+    def begin_run(self):
+        """Mulai run baru: laporan berikutnya hanya berisi aktivitas setelah titik ini."""
+        with self._lock:
+            self._baseline = self._counters()
+            self._run_samples.clear()
+            self._run_started = time.time()
+
+    def record_rpc(self, method, elapsed, failed=False):
+        with self._lock:
+            self.rpc_calls[method] += 1
+            self.rpc_seconds[method] += elapsed
+            if failed:
+                self.rpc_errors[method] += 1
+
+    def record_http(self, sent, received, retries=0):
+        with self._lock:
+            self.totals["http_requests"] += 1
+            self.totals["request_bytes"] += sent
+            self.totals["response_bytes"] += received
+            self.totals["retries"] += retries
+
+    def record_stage(self, name, elapsed, ok=True):
+        with self._lock:
+            self.stage_count[name] += 1
+            self.stage_seconds[name] += elapsed
+            if not ok:
+                self.stage_failures[name] += 1
+            self._run_samples[name].append(elapsed)
+        JOURNAL.event("stage", level="info" if ok else "warning", stage=name, ok=ok, duration_ms=round(elapsed * 1000, 1))
+
+    @contextmanager
+    def stage(self, name):
+        """Catat durasi blok sebagai satu sampel tahap; exception dihitung sebagai gagal."""
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.record_stage(name, time.perf_counter() - start, ok)
+
+    def timed(self, name, ok=None):
+        """
+        Decorator timer tahap untuk fungsi sync maupun async. Tahap dihitung gagal jika fungsi
+        melempar exception atau mengembalikan False; `ok(result)` menggantikan aturan ini, mis. untuk
+        fungsi yang menandai gagal dengan None. Event jurnal di dalam fungsi diberi field `stage`
+        (tahap terluar yang menang).
+        """
+        succeeded = ok or (lambda result: result is not False)
+
+        def decorator(fn):
+            if asyncio.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    start = time.perf_counter()
+                    passed = False
+                    try:
+                        with bind(stage=name):
+                            result = await fn(*args, **kwargs)
+                        passed = succeeded(result)
+                        return result
+                    finally:
+                        self.record_stage(name, time.perf_counter() - start, passed)
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                passed = False
+                try:
+                    with bind(stage=name):
+                        result = fn(*args, **kwargs)
+                    passed = succeeded(result)
+                    return result
+                finally:
+                    self.record_stage(name, time.perf_counter() - start, passed)
+            return wrapper
+        return decorator
+
+    def report(self, **extra):
+        """Laporan terstruktur untuk run yang sedang berjalan (sejak begin_run)."""
+        with self._lock:
+            base = self._baseline
+            calls = {m: n - base["rpc_calls"].get(m, 0) for m, n in self.rpc_calls.items()}
+            errors = {m: n - base["rpc_errors"].get(m, 0) for m, n in self.rpc_errors.items()}
+            totals = {k: self.totals.get(k, 0) - base["totals"].get(k, 0) for k in ("http_requests", "request_bytes", "response_bytes", "retries")}
+            stages = {
+                name: {
+                    "count": len(samples),
+                    "failures": self.stage_failures.get(name, 0) - base["stage_failures"].get(name, 0),
+                    "total_s": round(sum(samples), 3),
+                    "p50_ms": round(percentile(samples, 50) * 1000, 1),
+                    "p95_ms": round(percentile(samples, 95) * 1000, 1),
+                    "max_ms": round(max(samples) * 1000, 1),
+                }
+                for name, samples in self._run_samples.items() if samples
+            }
+            started = self._run_started
+        return {
+            "started_at": int(started),
+            "duration_s": round(time.time() - started, 3),
+            "rpc": {
+                "calls": sum(calls.values()),
+                "errors": sum(errors.values()),
+                "by_method": {m: {"calls": n, "errors": errors.get(m, 0)} for m, n in sorted(calls.items(), key=lambda kv: -kv[1]) if n},
+                **totals,
+            },
+            "stages": stages,
+            **extra,
+        }
+
+    def write_json(self, path=METRICS_REPORT, **extra):
+        """Tulis laporan run ke file JSON. Mengembalikan dict laporan."""
+        data = self.report(**extra)
+        if path:
+            with open(path, "w") as f:
+                json.dump(data, f, indent=2)
+        return data
+
+    def prometheus_text(self):
+        """Metrik kumulatif dalam format teks eksposisi Prometheus."""
+        p = METRIC_PREFIX
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {p}_{name} {help_text}")
+            lines.append(f"# TYPE {p}_{name} {kind}")
+            for labels, value in samples:
+                label_str = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{p}_{name}{{{label_str}}} {value}" if label_str else f"{p}_{name} {value}")
+
+        with self._lock:
+            metric("rpc_calls_total", "counter", "Jumlah panggilan JSON-RPC per metode",
+                   [({"method": m}, n) for m, n in sorted(self.rpc_calls.items())])
+            metric("rpc_errors_total", "counter", "Jumlah respons error JSON-RPC per metode",
+                   [({"method": m}, n) for m, n in sorted(self.rpc_errors.items())])
+            metric("rpc_seconds_total", "counter", "Total waktu panggilan JSON-RPC per metode",
+                   [({"method": m}, round(s, 6)) for m, s in sorted(self.rpc_seconds.items())])
+            metric("http_requests_total", "counter", "Jumlah request HTTP ke endpoint RPC", [({}, self.totals["http_requests"])])
+            metric("rpc_request_bytes_total", "counter", "Byte body request RPC yang dikirim", [({}, self.totals["request_bytes"])])
+            metric("rpc_response_bytes_total", "counter", "Byte body respons RPC yang diterima", [({}, self.totals["response_bytes"])])
+            metric("rpc_retries_total", "counter", "Jumlah retry HTTP ke endpoint RPC", [({}, self.totals["retries"])])
+            # Kuantil dihitung dari sampel run berjalan, _sum dan _count kumulatif
+            metric("stage_seconds", "summary", "Durasi tahap pipeline dompet", [])
+            for stage in sorted(self.stage_count):
+                samples = self._run_samples.get(stage, [])
+                for q in (0.5, 0.95):
+                    lines.append(f'{p}_stage_seconds{{stage="{stage}",quantile="{q}"}} {round(percentile(samples, q * 100), 6)}')
+                lines.append(f'{p}_stage_seconds_sum{{stage="{stage}"}} {round(self.stage_seconds[stage], 6)}')
+                lines.append(f'{p}_stage_seconds_count{{stage="{stage}"}} {self.stage_count[stage]}')
+            metric("stage_failures_total", "counter", "Jumlah tahap pipeline yang gagal",
+                   [({"stage": s}, n) for s, n in sorted(self.stage_failures.items())])
+        return "\n".join(lines) + "\n"
+
+METRICS = Metrics()
+timed = METRICS.timed
+
+class RpcMetricsMiddleware(Web3Middleware):
+    """Middleware Web3 yang mencatat jumlah, durasi dan error panggilan RPC ke METRICS."""
+
+    def wrap_make_request(self, make_request):
+        def middleware(method, params):
+            start = time.perf_counter()
+            response = None
+            try:
+                response = make_request(method, params)
+                return response
+            finally:
+                failed = not isinstance(response, dict) or "error" in response
+                METRICS.record_rpc(method, time.perf_counter() - start, failed)
+        return middleware
+
+    def wrap_make_batch_request(self, make_batch_request):
+        def middleware(requests_info):
+            start = time.perf_counter()
+            response = make_batch_request(requests_info)
+            _record_batch(requests_info, response, time.perf_counter() - start)
+            return response
+        return middleware
+
+    async def async_wrap_make_request(self, make_request):
+        async def middleware(method, params):
+            start = time.perf_counter()
+            response = None
+            try:
+                response = await make_request(method, params)
+                return response
+            finally:
+                failed = not isinstance(response, dict) or "error" in response
+                METRICS.record_rpc(method, time.perf_counter() - start, failed)
+        return middleware
+
+    async def async_wrap_make_batch_request(self, make_batch_request):
+        async def middleware(requests_info):
+            start = time.perf_counter()
+            response = await make_batch_request(requests_info)
+            _record_batch(requests_info, response, time.perf_counter() - start)
+            return response
+        return middleware
+
+def _record_batch(requests_info, response, elapsed):
+    # Durasi batch dibagi rata ke setiap request di dalamnya
+    share = elapsed / max(len(requests_info), 1)
+    responses = response if isinstance(response, list) else [response] * len(requests_info)
+    for (method, _), item in zip(requests_info, responses):
+        METRICS.record_rpc(method, share, not isinstance(item, dict) or "error" in item)
+
+def instrument_web3(w3_instance):
+    """Pasang RpcMetricsMiddleware sekali pada instance Web3/AsyncWeb3."""
+    if "rpc_metrics" not in w3_instance.middleware_onion:
+        w3_instance.middleware_onion.add(RpcMetricsMiddleware, "rpc_metrics")
+    return w3_instance
+
+def _count_http(response, *args, **kwargs):
+    body = response.request.body or b""
+    retries = getattr(response.raw, "retries", None)
+    METRICS.record_http(len(body), len(response.content), len(retries.history) if retries else 0)
+
+def instrument_session(session):
+    """Hook requests.Session untuk menghitung byte dan retry urllib3 tiap request HTTP."""
+    if _count_http not in session.hooks["response"]:
+        session.hooks["response"].append(_count_http)
+    return session
+
+def aiohttp_trace_config():
+    """TraceConfig aiohttp untuk menghitung byte request/respons sesi async."""
+    import aiohttp
+
+    sizes = {}
+
+    async def on_request_start(session, ctx, params):
+        sizes[id(ctx)] = [0, 0]
+
+    async def on_request_chunk_sent(session, ctx, params):
+        sizes.setdefault(id(ctx), [0, 0])[0] += len(params.chunk)
+
+    async def on_response_chunk_received(session, ctx, params):
+        sizes.setdefault(id(ctx), [0, 0])[1] += len(params.chunk)
+
+    async def on_request_end(session, ctx, params):
+        sent, received = sizes.pop(id(ctx), (0, 0))
+        METRICS.record_http(sent, received)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_chunk_sent.append(on_request_chunk_sent)
+    trace_config.on_response_chunk_received.append(on_response_chunk_received)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+class _PrometheusHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = METRICS.prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def serve_prometheus(port=METRICS_PORT, host="0.0.0.0"):
+    """Jalankan endpoint /metrics di thread daemon. Port 0 berarti nonaktif; mengembalikan server atau None."""
+    if not port:
+        return None
+    server = ThreadingHTTPServer((host, port), _PrometheusHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Provider Web3 dengan banyak endpoint RPC.
+Latensi dan tingkat error tiap endpoint dicatat (rata-rata bergerak), request baca
+dikirim ke endpoint tercepat yang sehat, transaksi satu akun selalu dikirim ke endpoint
+yang sama, dan endpoint yang gagal otomatis dilewati selama masa cooldown.
+"""
+
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+from eth_account import Account
+from web3 import Web3
+from web3.providers.base import JSONBaseProvider
+
+DEFAULT_RPC_URL = "https://carrot.megaeth.com/rpc"
+RPC_FAILOVER_COOLDOWN = float(os.getenv("RPC_FAILOVER_COOLDOWN", "30"))
+# Bobot sampel terbaru pada rata-rata bergerak latensi dan error
+EWMA_ALPHA = 0.2
+# Kode error JSON-RPC yang berasal dari kondisi endpoint (resource unavailable, method tidak didukung,
+# rate limit, error internal), bukan dari isi request; dihitung sebagai kegagalan endpoint
+PROVIDER_ERROR_CODES = (-32002, -32004, -32005, -32603)
+
+def load_rpc_urls(default=DEFAULT_RPC_URL):
+    """Daftar endpoint dari env RPC_URLS (dipisah koma), atau endpoint default."""
+    load_dotenv()
+    urls = [u.strip() for u in os.getenv("RPC_URLS", "").split(",") if u.strip()]
+    return urls or [default]
+
+def provider_error(response):
+    """Error payload pertama dengan kode dari PROVIDER_ERROR_CODES di respons tunggal maupun batch, atau None."""
+    for item in response if isinstance(response, list) else [response]:
+        err = item.get("error") if isinstance(item, dict) else None
+        if isinstance(err, dict) and err.get("code") in PROVIDER_ERROR_CODES:
+            return err
+    return None
+
+class MultiEndpointProvider(JSONBaseProvider):
+    """Membungkus beberapa HTTPProvider dengan routing berbasis latensi dan failover."""
+
+    def __init__(self, providers, cooldown=RPC_FAILOVER_COOLDOWN):
+        super().__init__()
+        self.providers = providers
+        self.endpoint_uri = providers[0].endpoint_uri
+        self.cooldown = cooldown
+        self.stats = [{"latency": None, "error_rate": 0.0, "down_until": 0.0, "calls": 0, "errors": 0} for _ in providers]
+        self._pins = {}
+        self._lock = threading.Lock()
+
+    def _score(self, i):
+        st = self.stats[i]
+        if st["latency"] is None:
+            # Belum pernah dicoba: didahulukan agar terukur; selalu gagal: paling akhir, juga setelah cooldown
+            return float("inf") if st["errors"] else 0.0
+        return st["latency"] / max(1.0 - st["error_rate"], 0.05)
+
+    def _ranked(self):
+        """Urutan endpoint: yang sehat berdasarkan skor, lalu yang sedang cooldown sebagai cadangan."""
+        now = time.time()
+        with self._lock:
+            healthy = [i for i, st in enumerate(self.stats) if st["down_until"] <= now]
+            cooling = [i for i, st in enumerate(self.stats) if st["down_until"] > now]
+            return sorted(healthy, key=self._score) + sorted(cooling, key=lambda i: self.stats[i]["down_until"])
+
+    def _record(self, i, elapsed=None):
+        with self._lock:
+            st = self.stats[i]
+            st["calls"] += 1
+            if elapsed is None:
+                st["errors"] += 1
+                st["error_rate"] += EWMA_ALPHA * (1.0 - st["error_rate"])
+                st["down_until"] = time.time() + self.cooldown
+            else:
+                st["error_rate"] -= EWMA_ALPHA * st["error_rate"]
+                st["latency"] = elapsed if st["latency"] is None else st["latency"] + EWMA_ALPHA * (elapsed - st["latency"])
+
+    def _call(self, order, fn):
+        """
+        Coba endpoint sesuai urutan sampai ada yang berhasil. Mengembalikan (indeks, hasil).
+        Jika semua endpoint menjawab dengan error endpoint, respons terakhir dikembalikan apa adanya.
+        """
+        last_error, last_response = None, None
+        for i in order:
+            start = time.monotonic()
+            try:
+                result = fn(self.providers[i])
+            except Exception as e:
+                self._record(i)
+                last_error = e
+                continue
+            if provider_error(result) is not None:
+                # Endpoint menjawab, tetapi gagal karena kondisinya sendiri (mis. rate limit)
+                self._record(i)
+                last_response = (i, result)
+                continue
+            self._record(i, time.monotonic() - start)
+            return i, result
+        if last_response is not None:
+            return last_response
+        raise last_error
+
+    def _pinned_order(self, account):
+        order = self._ranked()
+        with self._lock:
+            pinned = self._pins.get(account)
+        # Endpoint yang dipin hanya didahulukan selama tidak sedang cooldown
+        if pinned is not None and self.stats[pinned]["down_until"] <= time.time():
+            order.remove(pinned)
+            order.insert(0, pinned)
+        return order
+
+    def _account_for(self, method, params):
+        """Akun yang request-nya harus dipin: pengirim raw tx atau pemilik nonce pending."""
+        try:
+            if method == "eth_sendRawTransaction":
+                return Account.recover_transaction(params[0])
+            if method == "eth_getTransactionCount":
+                return Web3.to_checksum_address(params[0])
+        except Exception:
+            pass
+        return None
+
+    def make_request(self, method, params):
+        account = self._account_for(method, params)
+        if account is None:
+            return self._call(self._ranked(), lambda p: p.make_request(method, params))[1]
+        i, response = self._call(self._pinned_order(account), lambda p: p.make_request(method, params))
+        with self._lock:
+            self._pins[account] = i
+        return response
+
+    def make_batch_request(self, requests):
+        # Burst transaksi satu akun ikut endpoint yang dipin untuk akun tersebut
+        account = self._account_for(*requests[0]) if requests else None
+        if account is None:
+            return self._call(self._ranked(), lambda p: p.make_batch_request(requests))[1]
+        i, response = self._call(self._pinned_order(account), lambda p: p.make_batch_request(requests))
+        with self._lock:
+            self._pins[account] = i
+        return response
+
+    def snapshot(self):
+        """Statistik per endpoint untuk ditampilkan atau dicatat."""
+        with self._lock:
+            return [{"endpoint": p.endpoint_uri, **st} for p, st in zip(self.providers, self.stats)]
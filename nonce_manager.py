@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Nonce manager lokal per akun.
+Nonce diambil sekali dari pending transaction count, lalu dibagikan secara lokal
+sehingga approve, swap dan addLiquidityETH bisa dikirim berturut-turut
+tanpa satu panggilan RPC `get_transaction_count` per transaksi.
+"""
+
+import asyncio
+import threading
+
+# Potongan pesan error dari node yang menandakan nonce lokal sudah tidak sinkron
+NONCE_ERROR_MARKERS = (
+    "nonce too low",
+    "nonce too high",
+    "invalid nonce",
+    "replacement transaction underpriced",
+    "transaction underpriced",
+)
+ALREADY_KNOWN_MARKERS = ("already known", "known transaction", "already imported")
+
+def is_nonce_error(exc):
+    """Cek apakah exception dari node disebabkan nonce yang tidak sinkron."""
+    msg = str(exc).lower()
+    return any(marker in msg for marker in NONCE_ERROR_MARKERS)
+
+def is_already_known(exc):
+    """Cek apakah node menolak karena transaksi yang sama sudah ada di mempool."""
+    msg = str(exc).lower()
+    return any(marker in msg for marker in ALREADY_KNOWN_MARKERS)
+
+class NonceManager:
+    """Membagikan nonce secara lokal per akun dan sinkron ulang saat node menolak."""
+
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._locks = {}
+        self._next = {}
+
+    def _lock_for(self, account):
+        with self._guard:
+            if account not in self._locks:
+                self._locks[account] = threading.RLock()
+            return self._locks[account]
+
+    def resync(self, w3_instance, account):
+        """Ambil ulang nonce dari pending count node."""
+        with self._lock_for(account):
+            nonce = w3_instance.eth.get_transaction_count(account, 'pending')
+            self._next[account] = nonce
+            return nonce
+
+    def reset(self, account):
+        """Lupakan nonce lokal; pemanggilan berikutnya akan sinkron ulang dari node."""
+        with self._lock_for(account):
+            self._next.pop(account, None)
+
+    def allocate(self, w3_instance, account):
+        """Ambil nonce berikutnya untuk akun tanpa mengirim transaksi."""
+        with self._lock_for(account):
+            if account not in self._next:
+                self.resync(w3_instance, account)
+            nonce = self._next[account]
+            self._next[account] = nonce + 1
+            return nonce
+
+class AsyncNonceManager:
+    """Versi asyncio dari NonceManager untuk dipakai bersama AsyncWeb3 dalam satu event loop."""
+
+    def __init__(self):
+        self._locks = {}
+        self._next = {}
+
+    def _lock_for(self, account):
+        if account not in self._locks:
+            self._locks[account] = asyncio.Lock()
+        return self._locks[account]
+
+    def reset(self, account):
+        """Lupakan nonce lokal; pengiriman berikutnya akan sinkron ulang dari node."""
+        self._next.pop(account, None)
+
+    async def send(self, w3_instance, tx, pk):
+        """Isi nonce, tanda tangani dan kirim transaksi. Mengembalikan tx hash."""
+        account = tx['from']
+        async with self._lock_for(account):
+            for attempt in range(2):
+                if account not in self._next:
+                    self._next[account] = await w3_instance.eth.get_transaction_count(account, 'pending')
+                nonce = self._next[account]
+                tx['nonce'] = nonce
+                sig = w3_instance.eth.account.sign_transaction(tx, pk)
+                try:
+                    tx_hash = await w3_instance.eth.send_raw_transaction(sig.raw_transaction)
+                except Exception as e:
+                    if is_already_known(e):
+                        self._next[account] = nonce + 1
+                        return sig.hash
+                    self._next.pop(account, None)
+                    if is_nonce_error(e) and attempt == 0:
+                        continue
+                    raise
+                self._next[account] = nonce + 1
+                return tx_hash
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Indeks pool likuid berbasis `factory.getPair` dan `pair.getReserves`.
+Alamat pair disimpan di disk (pair tidak pernah berubah setelah dibuat), hanya pair
+yang belum ada dicek ulang, dan reserve semua pair dibaca dalam satu batch.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+from web3 import Web3
+
+from abis import FACTORY_ABI, PAIR_ABI
+from batch_reads import batch_call
+from rpc_pool import get_contract
+
+POOL_INDEX_FILE = os.getenv("POOL_INDEX_FILE", "pool_index.json")
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+# Reserve WETH minimal agar pool dianggap layak untuk swap
+MIN_POOL_WETH_RESERVE = Web3.to_wei(os.getenv("MIN_POOL_WETH_RESERVE", "0.001"), 'ether')
+
+def sort_tokens(token_a, token_b):
+    """Urutan token0/token1 seperti UniswapV2 (alamat terkecil lebih dulu)."""
+    return (token_a, token_b) if int(token_a, 16) < int(token_b, 16) else (token_b, token_a)
+
+def _pair_key(token_a, token_b):
+    return ":".join(sort_tokens(token_a, token_b))
+
+class PoolIndex:
+    """Peta pasangan token -> alamat pair beserta reserve terakhir yang diketahui."""
+
+    def __init__(self, w3_instance, factory_addr, path=POOL_INDEX_FILE):
+        self.w3 = w3_instance
+        self.factory = w3_instance.eth.contract(address=factory_addr, abi=FACTORY_ABI)
+        self.path = path
+        self.pairs = {}
+        self.reserves = {}
+        self.block = None
+        self.refreshed_at = 0
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                self.pairs = json.load(f).get("pairs", {})
+        except (FileNotFoundError, ValueError):
+            self.pairs = {}
+
+    def save(self):
+        with self._lock:
+            # Nama temp unik: gte.py dan auto_swap_liquidity.py bisa menulis indeks yang sama
+            with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp", delete=False) as f:
+                json.dump({"pairs": self.pairs}, f, indent=2)
+            os.replace(f.name, self.path)
+
+    def discover(self, token_pairs):
+        """Cari alamat pair untuk pasangan yang belum diketahui atau belum punya pool."""
+        keys, calls = [], []
+        for token_a, token_b in token_pairs:
+            key = _pair_key(token_a, token_b)
+            if key in keys or self.pairs.get(key, ZERO_ADDRESS) != ZERO_ADDRESS:
+                continue
+            keys.append(key)
+            calls.append((self.factory, "getPair", list(sort_tokens(token_a, token_b))))
+        if not calls:
+            return 0
+        found = 0
+        with self._lock:
+            for key, pair in zip(keys, batch_call(self.w3, calls)):
+                if pair is None:
+                    continue
+                self.pairs[key] = pair
+                found += pair != ZERO_ADDRESS
+        self.save()
+        return found
+
+    def refresh_reserves(self):
+        """Baca ulang reserve semua pair yang ada dalam satu batch."""
+        with self._lock:
+            known = [(key, pair) for key, pair in self.pairs.items() if pair != ZERO_ADDRESS]
+        calls = [(get_contract(self.w3, pair, PAIR_ABI), "getReserves", []) for _, pair in known]
+        block = self.w3.eth.block_number
+        results = batch_call(self.w3, calls)
+        with self._lock:
+            for (key, _), res in zip(known, results):
+                if res is not None:
+                    self.reserves[key] = (res[0], res[1])
+            self.block = block
+            self.refreshed_at = time.time()
+
+    def refresh(self, token_pairs):
+        self.discover(token_pairs)
+        self.refresh_reserves()
+
+    def get_reserves(self, token_a, token_b):
+        """Reserve (token_a, token_b) sesuai urutan argumen, atau None jika pool tidak ada."""
+        res = self.reserves.get(_pair_key(token_a, token_b))
+        if res is None:
+            return None
+        token0, _ = sort_tokens(token_a, token_b)
+        return res if token0 == token_a else (res[1], res[0])
+
+    def is_liquid(self, token, weth_addr, min_weth_reserve=MIN_POOL_WETH_RESERVE):
+        """Token punya pair WETH dengan reserve yang cukup."""
+        res = self.get_reserves(weth_addr, token)
+        return bool(res) and res[0] >= min_weth_reserve and res[1] > 0
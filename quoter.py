@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Quote off-chain dengan rumus constant-product UniswapV2 (fee 0.3%)
+dari reserve yang di-cache di PoolIndex. Reserve diperbarui paling sering
+sekali per blok, sehingga quote untuk semua token tidak butuh panggilan RPC.
+"""
+
+import os
+import threading
+import time
+
+FEE_NUMERATOR, FEE_DENOMINATOR = 997, 1000
+# Umur maksimum reserve (detik) sebelum dibaca ulang, kurang lebih satu blok
+QUOTE_MAX_AGE = float(os.getenv("QUOTE_MAX_AGE", "1.0"))
+
+def get_amount_out(amount_in, reserve_in, reserve_out):
+    """Sama dengan UniswapV2Library.getAmountOut."""
+    if amount_in <= 0 or reserve_in <= 0 or reserve_out <= 0:
+        return 0
+    amount_in_with_fee = amount_in * FEE_NUMERATOR
+    return (amount_in_with_fee * reserve_out) // (reserve_in * FEE_DENOMINATOR + amount_in_with_fee)
+
+def get_amount_in(amount_out, reserve_in, reserve_out):
+    """Sama dengan UniswapV2Library.getAmountIn."""
+    if amount_out <= 0 or reserve_in <= 0 or amount_out >= reserve_out:
+        return None
+    return (reserve_in * amount_out * FEE_DENOMINATOR) // ((reserve_out - amount_out) * FEE_NUMERATOR) + 1
+
+def quote(amount_a, reserve_a, reserve_b):
+    """Sama dengan UniswapV2Library.quote (tanpa fee), dipakai router saat addLiquidity."""
+    if amount_a <= 0 or reserve_a <= 0 or reserve_b <= 0:
+        return 0
+    return (amount_a * reserve_b) // reserve_a
+
+class Quoter:
+    """Quote swap dan jumlah likuiditas dari reserve PoolIndex."""
+
+    def __init__(self, pool_index, max_age=QUOTE_MAX_AGE):
+        self.pools = pool_index
+        self.max_age = max_age
+        self._lock = threading.Lock()
+
+    def ensure_fresh(self):
+        # Satu thread yang me-refresh, thread lain menunggu hasilnya
+        with self._lock:
+            if time.time() - self.pools.refreshed_at > self.max_age:
+                self.pools.refresh_reserves()
+
+    def amounts_out(self, amount_in, path):
+        """Setara router.getAmountsOut. None jika ada pair di path yang tidak dikenal."""
+        self.ensure_fresh()
+        amounts = [amount_in]
+        for token_in, token_out in zip(path, path[1:]):
+            res = self.pools.get_reserves(token_in, token_out)
+            if res is None:
+                return None
+            amounts.append(get_amount_out(amounts[-1], res[0], res[1]))
+        return amounts
+
+    def amount_out(self, amount_in, path):
+        amounts = self.amounts_out(amount_in, path)
+        return amounts[-1] if amounts else None
+
+    def quote_all(self, amount_in, src, targets):
+        """Quote satu hop dari `src` ke banyak token sekaligus. Mengembalikan dict token -> amount out."""
+        self.ensure_fresh()
+        out = {}
+        for token in targets:
+            res = self.pools.get_reserves(src, token)
+            if res is not None:
+                out[token] = get_amount_out(amount_in, res[0], res[1])
+        return out
+
+    def liquidity_amount(self, amount_a, token_a, token_b):
+        """Jumlah token_b yang dibutuhkan untuk dipasangkan dengan amount_a token_a (rumus router)."""
+        self.ensure_fresh()
+        res = self.pools.get_reserves(token_a, token_b)
+        if res is None:
+            return None
+        return quote(amount_a, res[0], res[1])
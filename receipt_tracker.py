@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Pelacak receipt terpusat.
+Satu thread polling per blok untuk semua tx hash yang sedang ditunggu, dengan
+`eth_getTransactionReceipt` yang di-batch, lalu menyelesaikan future masing-masing.
+N transaksi pending tidak lagi berarti N loop polling terpisah.
+Hash yang ditinggal penunggunya atau melewati batas umur dikeluarkan dari polling.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from hexbytes import HexBytes
+from web3 import Web3
+from web3._utils.method_formatters import receipt_formatter
+from web3.datastructures import AttributeDict
+from web3.exceptions import TransactionNotFound
+
+RECEIPT_BATCH_CHUNK = 100
+# Batas umur (detik) hash di polling jika tidak ada yang menunggunya lebih lama, mis. tx yang di-drop node
+RECEIPT_TRACK_TTL = float(os.getenv("RECEIPT_TRACK_TTL", "600"))
+
+def _key(tx_hash):
+    return Web3.to_hex(HexBytes(tx_hash))
+
+class ReceiptTracker:
+    """Menunggu banyak transaksi sekaligus dengan satu polling per blok baru."""
+
+    def __init__(self, w3_instance, poll_interval=0.25, ttl=RECEIPT_TRACK_TTL):
+        self.w3 = w3_instance
+        self.poll_interval = poll_interval
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._deadlines = {}
+        self._thread = None
+        self._last_block = None
+        self._dirty = False
+
+    def track(self, tx_hash, ttl=None):
+        """
+        Daftarkan tx hash dan kembalikan Future yang berisi receipt-nya. Jika receipt belum ada
+        setelah `ttl` detik (default `self.ttl`), hash dilepas dan Future berisi TimeoutError.
+        """
+        key = _key(tx_hash)
+        deadline = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            fut = self._pending.get(key)
+            if fut is None:
+                fut = Future()
+                self._pending[key] = fut
+                # Hash baru mungkin sudah masuk blok yang sudah pernah dipoll
+                self._dirty = True
+            self._deadlines[key] = max(deadline, self._deadlines.get(key, 0))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="receipt-tracker", daemon=True)
+                self._thread.start()
+        return fut
+
+    def wait(self, tx_hash, timeout=180):
+        """Tunggu receipt satu transaksi. Raise TimeoutError jika tidak terkonfirmasi."""
+        fut = self.track(tx_hash, ttl=timeout)
+        try:
+            return fut.result(timeout=timeout)
+        except FutureTimeout:
+            self._untrack(tx_hash, fut)
+            raise TimeoutError(f"Transaksi {_key(tx_hash)} belum terkonfirmasi setelah {timeout} detik")
+
+    async def wait_async(self, tx_hash, timeout=180):
+        """Versi asyncio dari wait(): receipt diambil oleh polling batch yang sama, event loop tidak tertahan."""
+        fut = self.track(tx_hash, ttl=timeout)
+        try:
+            # shield: pembatalan penunggu ini tidak boleh membatalkan Future yang juga dipakai penunggu lain
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(fut)), timeout)
+        except asyncio.TimeoutError:
+            self._untrack(tx_hash, fut)
+            raise TimeoutError(f"Transaksi {_key(tx_hash)} belum terkonfirmasi setelah {timeout} detik") from None
+        except asyncio.CancelledError:
+            self._untrack(tx_hash, fut)
+            raise
+
+    def _untrack(self, tx_hash, fut):
+        # Penunggu pergi: hash tidak perlu dipoll lagi
+        key = _key(tx_hash)
+        with self._lock:
+            if self._pending.get(key) is fut:
+                del self._pending[key]
+                self._deadlines.pop(key, None)
+
+    def _expire(self):
+        now = time.monotonic()
+        for key in [k for k, deadline in self._deadlines.items() if deadline < now]:
+            del self._deadlines[key]
+            fut = self._pending.pop(key, None)
+            if fut is not None and not fut.done():
+                fut.set_exception(TimeoutError(f"Transaksi {key} belum terkonfirmasi, dilepas dari polling"))
+
+    def _run(self):
+        while True:
+            with self._lock:
+                self._expire()
+                if not self._pending:
+                    self._thread = None
+                    return
+                hashes = list(self._pending)
+                dirty, self._dirty = self._dirty, False
+            try:
+                block = self.w3.eth.block_number
+                if block == self._last_block and not dirty:
+                    time.sleep(self.poll_interval)
+                    continue
+                self._last_block = block
+                receipts = self._fetch(hashes)
+            except Exception:
+                time.sleep(self.poll_interval)
+                continue
+            with self._lock:
+                for key, receipt in receipts.items():
+                    fut = self._pending.pop(key, None)
+                    self._deadlines.pop(key, None)
+                    if fut is not None and not fut.done():
+                        fut.set_result(receipt)
+
+    def _fetch(self, hashes):
+        """Ambil receipt untuk hash yang sudah masuk blok. Mengembalikan dict hash -> receipt."""
+        receipts = {}
+        for i in range(0, len(hashes), RECEIPT_BATCH_CHUNK):
+            chunk = hashes[i:i + RECEIPT_BATCH_CHUNK]
+            try:
+                responses = self.w3.provider.make_batch_request([("eth_getTransactionReceipt", [h]) for h in chunk])
+            except Exception:
+                responses = None
+            if not isinstance(responses, list):
+                # Endpoint tidak mendukung batch, cek satu per satu
+                return self._fetch_sequential(hashes)
+            for h, r in zip(chunk, responses):
+                if r.get("result"):
+                    # Format sama dengan w3.eth.get_transaction_receipt, tanpa request kedua
+                    receipts[h] = AttributeDict.recursive(receipt_formatter(r["result"]))
+        return receipts
+
+    def _fetch_sequential(self, hashes):
+        receipts = {}
+        for h in hashes:
+            try:
+                receipts[h] = self.w3.eth.get_transaction_receipt(h)
+            except TransactionNotFound:
+                continue
+        return receipts
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Pencarian rute swap multi-hop di atas graf pool PoolIndex.
+Token adalah node, pair adalah edge, dan output tiap hop dihitung dari reserve
+dengan rumus constant-product. Rute terbaik (1-3 hop) di-cache per
+(src, dst, bucket jumlah) sehingga swap berulang tidak mencari ulang.
+"""
+
+import os
+import threading
+import time
+
+from quoter import get_amount_out
+
+MAX_HOPS = 3
+ROUTE_CACHE_TTL = int(os.getenv("ROUTE_CACHE_TTL", "30"))
+
+def amount_bucket(amount):
+    """Jumlah dengan orde besaran yang sama (kelipatan dua) memakai rute cache yang sama."""
+    return int(amount).bit_length()
+
+class RouteFinder:
+    """Cari path dengan output terbesar dari `src` ke `dst` lewat pair yang terindeks."""
+
+    def __init__(self, quoter, max_hops=MAX_HOPS, cache_ttl=ROUTE_CACHE_TTL):
+        self.quoter = quoter
+        self.pools = quoter.pools
+        self.max_hops = max_hops
+        self.cache_ttl = cache_ttl
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _graph(self):
+        """Adjacency list dari pair yang punya reserve di kedua sisi."""
+        graph = {}
+        for key, (reserve0, reserve1) in list(self.pools.reserves.items()):
+            if reserve0 <= 0 or reserve1 <= 0:
+                continue
+            token0, token1 = key.split(":")
+            graph.setdefault(token0, []).append(token1)
+            graph.setdefault(token1, []).append(token0)
+        return graph
+
+    def _search(self, src, dst, amount_in):
+        graph = self._graph()
+        best_path, best_out = None, 0
+        # DFS terbatas: tiap langkah membawa jumlah output sementara, token tidak boleh diulang
+        stack = [([src], amount_in)]
+        while stack:
+            path, amount = stack.pop()
+            for nxt in graph.get(path[-1], []):
+                if nxt in path:
+                    continue
+                res = self.pools.get_reserves(path[-1], nxt)
+                out = get_amount_out(amount, res[0], res[1]) if res else 0
+                if out <= 0:
+                    continue
+                if nxt == dst:
+                    if out > best_out:
+                        best_path, best_out = path + [nxt], out
+                elif len(path) < self.max_hops:
+                    stack.append((path + [nxt], out))
+        return best_path, best_out
+
+    def best_route(self, src, dst, amount_in):
+        """Mengembalikan (path, amount_out) terbaik, atau None jika tidak ada rute."""
+        if src == dst or amount_in <= 0:
+            return None
+        self.quoter.ensure_fresh()
+        key = (src, dst, amount_bucket(amount_in))
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached and time.time() - cached[1] < self.cache_ttl:
+            amounts = self.quoter.amounts_out(amount_in, cached[0])
+            if amounts and amounts[-1] > 0:
+                return cached[0], amounts[-1]
+        path, amount_out = self._search(src, dst, amount_in)
+        if path is None:
+            return None
+        with self._lock:
+            self._cache[key] = (path, time.time())
+        return path, amount_out
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Pool koneksi HTTP untuk RPC.
+Satu `requests.Session` (keep-alive, ukuran pool bisa diatur, retry dengan backoff)
+per kombinasi endpoint + proxy, satu instance Web3 per sesi, dan cache objek kontrak,
+sehingga dompet yang memakai endpoint/proxy yang sama tidak handshake TCP/TLS ulang.
+Request pengiriman tx hanya diulang jika koneksi gagal dibuka, tidak pada error HTTP.
+"""
+
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from web3 import Web3
+from web3.providers.rpc.utils import REQUEST_RETRY_ALLOWLIST, ExceptionRetryConfiguration
+
+from metrics import instrument_session, instrument_web3
+from multi_rpc import MultiEndpointProvider
+
+RPC_POOL_SIZE = int(os.getenv("RPC_POOL_SIZE", "32"))
+RPC_RETRIES = int(os.getenv("RPC_RETRIES", "3"))
+RPC_BACKOFF = float(os.getenv("RPC_BACKOFF", "0.3"))
+RPC_TIMEOUT = float(os.getenv("RPC_TIMEOUT", "30"))
+
+_lock = threading.Lock()
+_sessions = {}
+_web3 = {}
+_contracts = {}
+
+# Method JSON-RPC yang tidak aman diulang: respons 5xx/timeout bisa datang setelah tx diterima node
+SEND_METHODS = ("eth_sendRawTransaction", "eth_sendTransaction")
+# Retry bawaan HTTPProvider juga tidak boleh mengulang pengiriman tx
+WEB3_RETRY = ExceptionRetryConfiguration(
+    errors=(requests.ConnectionError, requests.HTTPError, requests.Timeout),
+    method_allowlist=[m for m in REQUEST_RETRY_ALLOWLIST if m not in SEND_METHODS],
+)
+
+def _proxy_key(proxy):
+    return proxy.get("https") or proxy.get("http") if proxy else None
+
+def _is_send(request):
+    body = request.body or b""
+    if isinstance(body, str):
+        body = body.encode()
+    return any(f'"{method}"'.encode() in body for method in SEND_METHODS)
+
+class _RpcAdapter(HTTPAdapter):
+    """
+    HTTPAdapter dengan dua kebijakan retry: request baca diulang untuk 429/5xx dan error koneksi,
+    request yang mengirim tx (termasuk batch) hanya diulang jika koneksi belum tersambung.
+    """
+
+    def __init__(self, read_retry, send_retry, pool_size=RPC_POOL_SIZE):
+        super().__init__(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=read_retry)
+        self._send_adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=send_retry)
+
+    def send(self, request, *args, **kwargs):
+        if _is_send(request):
+            return self._send_adapter.send(request, *args, **kwargs)
+        return super().send(request, *args, **kwargs)
+
+    def close(self):
+        self._send_adapter.close()
+        super().close()
+
+def _adapter(retries):
+    if not retries:
+        return HTTPAdapter(pool_connections=RPC_POOL_SIZE, pool_maxsize=RPC_POOL_SIZE, max_retries=0)
+    read_retry = Retry(
+        total=RPC_RETRIES,
+        backoff_factor=RPC_BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=None,  # JSON-RPC selalu POST
+        raise_on_status=False,
+    )
+    send_retry = Retry(
+        total=RPC_RETRIES,
+        connect=RPC_RETRIES,
+        read=0,
+        status=0,
+        other=0,
+        backoff_factor=RPC_BACKOFF,
+        allowed_methods=None,
+        raise_on_status=False,
+    )
+    return _RpcAdapter(read_retry, send_retry)
+
+def get_session(endpoint, proxy=None, retries=True):
+    """
+    Sesi HTTP bersama untuk endpoint + proxy. `proxy` berformat dict requests {"http": ..., "https": ...}.
+    Dengan `retries=False` request tidak diulang sama sekali (failover diurus MultiEndpointProvider).
+    """
+    key = (endpoint, _proxy_key(proxy), retries)
+    with _lock:
+        session = _sessions.get(key)
+        if session is None:
+            adapter = _adapter(retries)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            if proxy:
+                session.proxies.update(proxy)
+            _sessions[key] = instrument_session(session)
+        return session
+
+def _http_provider(endpoint, proxy, retries=True):
+    return Web3.HTTPProvider(endpoint, session=get_session(endpoint, proxy, retries), request_kwargs={"timeout": RPC_TIMEOUT},
+                             exception_retry_configuration=WEB3_RETRY if retries else None)
+
+def get_web3(endpoints, proxy=None):
+    """
+    Instance Web3 yang di-cache per endpoint + proxy, memakai sesi dari get_session.
+    `endpoints` boleh satu URL atau list URL; lebih dari satu URL memakai MultiEndpointProvider.
+    """
+    endpoints = (endpoints,) if isinstance(endpoints, str) else tuple(endpoints)
+    key = (endpoints, _proxy_key(proxy))
+    with _lock:
+        w3_instance = _web3.get(key)
+    if w3_instance is None:
+        if len(endpoints) == 1:
+            provider = _http_provider(endpoints[0], proxy)
+        else:
+            # Endpoint gagal langsung dilewati ke endpoint berikutnya, bukan diulang di tempat
+            provider = MultiEndpointProvider([_http_provider(endpoint, proxy, retries=False) for endpoint in endpoints])
+        with _lock:
+            w3_instance = _web3.setdefault(key, instrument_web3(Web3(provider)))
+    return w3_instance
+
+def session_web3(endpoints, session):
+    """
+    Web3 di atas `session` milik pemanggil, tidak di-cache. Untuk pekerjaan jarang per dompet
+    (mis. klaim faucet harian) agar tidak ada sesi/provider yang tersimpan per proxy.
+    """
+    endpoints = (endpoints,) if isinstance(endpoints, str) else tuple(endpoints)
+    retry = WEB3_RETRY if len(endpoints) == 1 else None
+    providers = [Web3.HTTPProvider(endpoint, session=session, request_kwargs={"timeout": RPC_TIMEOUT}, exception_retry_configuration=retry)
+                 for endpoint in endpoints]
+    return instrument_web3(Web3(providers[0] if len(providers) == 1 else MultiEndpointProvider(providers)))
+
+def get_contract(w3_instance, address, abi):
+    """Objek kontrak yang di-cache per (Web3, alamat, ABI)."""
+    key = (id(w3_instance), address, id(abi))
+    contract = _contracts.get(key)
+    if contract is None:
+        # Kontrak menyimpan referensi ke w3_instance, jadi id-nya tidak akan dipakai ulang
+        contract = _contracts.setdefault(key, w3_instance.eth.contract(address=address, abi=abi))
+    return contract
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Penjadwal job berkala yang persisten.
+Waktu jalan berikutnya tiap job disimpan di SQLite dan diantrekan di heap; satu thread
+tidur sampai job terdekat jatuh tempo lalu menjalankannya di pool worker. Setelah restart,
+job yang jadwalnya sudah lewat dijalankan sekali, sedangkan job yang belum jatuh tempo
+menunggu sisa waktunya (tidak diulang dan tidak terlewat). Job yang dibatalkan lewat
+JobCancelled tidak dijadwalkan ulang, sehingga dijalankan lagi setelah restart.
+"""
+
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+SCHEDULE_DB = os.getenv("SCHEDULE_DB", "schedule.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    name TEXT PRIMARY KEY,
+    next_run REAL NOT NULL,
+    last_start REAL,
+    last_finish REAL
+);
+"""
+
+class JobCancelled(Exception):
+    """Dilempar job yang berhenti di tengah jalan (mis. bot dihentikan); jadwalnya tidak dimajukan."""
+
+class _Job:
+    __slots__ = ("name", "fn", "interval", "after_finish")
+
+    def __init__(self, name, fn, interval, after_finish):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.after_finish = after_finish
+
+class Scheduler:
+    """
+    Heap (next_run, job) dengan jadwal persisten. `on_idle(name, next_run)` dipanggil tiap kali
+    penjadwal mulai menunggu job berikutnya; `on_error(name, exc)` saat job melempar exception.
+    Dengan `workers=0` job dijalankan langsung di thread yang memanggil run().
+    """
+
+    def __init__(self, path=SCHEDULE_DB, workers=1, on_idle=None, on_error=None):
+        self.path = path
+        self.workers = workers
+        self.on_idle = on_idle
+        self.on_error = on_error
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._jobs = {}
+        self._stopped = False
+
+    def _execute(self, sql, params=()):
+        with self._db_lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def next_run(self, name):
+        """Waktu jalan berikutnya yang tersimpan untuk job, atau None."""
+        rows = self._execute("SELECT next_run FROM jobs WHERE name = ?", (name,))
+        return rows[0][0] if rows else None
+
+    def add(self, name, fn, interval, first_run=None, after_finish=False):
+        """
+        Daftarkan job berkala. Jadwal tersimpan dari run sebelumnya diutamakan; jika belum ada,
+        job pertama kali jalan pada `first_run` (default: sekarang). Interval dihitung dari mulai job,
+        atau dari selesainya job jika `after_finish`.
+        """
+        next_run = self.next_run(name)
+        if next_run is None:
+            next_run = time.time() if first_run is None else first_run
+            self._execute("INSERT INTO jobs (name, next_run) VALUES (?, ?)", (name, next_run))
+        with self._cond:
+            self._jobs[name] = _Job(name, fn, interval, after_finish)
+            heapq.heappush(self._heap, (next_run, next(self._seq), name))
+            self._cond.notify()
+        return next_run
+
+    def stop(self):
+        """Hentikan penjadwal; job yang sedang berjalan dibiarkan selesai, sisanya tidak dijalankan."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def run(self):
+        """Blok sampai stop(): tidur hingga job terdekat jatuh tempo lalu jalankan di pool worker."""
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scheduler") if self.workers else None
+        announced = None
+        try:
+            while True:
+                with self._cond:
+                    while not self._stopped:
+                        if not self._heap:
+                            self._cond.wait()
+                            continue
+                        next_run, _, name = self._heap[0]
+                        delay = next_run - time.time()
+                        if delay <= 0:
+                            break
+                        if self.on_idle is not None and announced != (name, next_run):
+                            announced = (name, next_run)
+                            self.on_idle(name, next_run)
+                        self._cond.wait(delay)
+                    if self._stopped:
+                        return
+                    _, _, name = heapq.heappop(self._heap)
+                    job = self._jobs[name]
+                if executor is None: self._run_job(job)
+                else: executor.submit(self._run_job, job)
+        finally:
+            if executor is not None: executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run_job(self, job):
+        started = time.time()
+        self._execute("UPDATE jobs SET last_start = ? WHERE name = ?", (started, job.name))
+        try:
+            job.fn()
+        except JobCancelled:
+            # Jadwal lama tetap tersimpan: job yang belum selesai diulang saat penjadwal jalan lagi
+            return
+        except Exception as e:
+            if self.on_error is not None: self.on_error(job.name, e)
+            else: traceback.print_exc()
+        finished = time.time()
+        # Jadwal baru disimpan setelah job selesai: mati di tengah job berarti job diulang, bukan terlewat
+        next_run = max((finished if job.after_finish else started) + job.interval, finished)
+        self._execute("UPDATE jobs SET next_run = ?, last_finish = ? WHERE name = ?", (next_run, finished, job.name))
+        with self._cond:
+            heapq.heappush(self._heap, (next_run, next(self._seq), job.name))
+            self._cond.notify()
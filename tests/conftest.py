@@ -0,0 +1,33 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from fake_chain import FACTORY_ADDR, WETH_ADDR, FakeChain, serve  # noqa: E402
+from pool_index import PoolIndex  # noqa: E402
+from rpc_pool import get_web3  # noqa: E402
+
+@pytest.fixture
+def chain():
+    """FakeChain baru yang dilayani server JSON-RPC lokal. Mengembalikan (chain, w3)."""
+    fake = FakeChain(n_tokens=3, n_quote_only=1)
+    server, url = serve(fake)
+    try:
+        yield fake, get_web3(url)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+@pytest.fixture
+def pools(chain, tmp_path):
+    """PoolIndex atas `chain` dengan semua pair WETH/token dan quote token/token QT yang sudah dibaca."""
+    fake_chain, w3 = chain
+    pairs = [(WETH_ADDR, t) for t, sym in fake_chain.tokens.items() if not sym.startswith("QT")]
+    pairs += [(fake_chain.quote_token, t) for t, sym in fake_chain.tokens.items() if sym.startswith("QT")]
+    index = PoolIndex(w3, FACTORY_ADDR, path=str(tmp_path / "pool_index.json"))
+    index.refresh(pairs)
+    return index
@@ -0,0 +1,37 @@
+import json
+
+import account_store
+from account_store import AccountStore
+from eth_account import Account
+
+KEYS = ["0x" + f"{i:02x}" * 32 for i in range(1, 6)]
+
+def test_select_derives_only_chosen_wallets(tmp_path):
+    cache = tmp_path / "address_cache.json"
+    store = AccountStore(KEYS, cache_path=str(cache))
+    wallets = store.select([1, 3])
+    assert [(w.index, w.address) for w in wallets] == [(i, Account.from_key(KEYS[i]).address) for i in (1, 3)]
+    assert store._addresses.count(None) == 3
+    data = json.loads(cache.read_text())
+    assert sorted(data.values()) == sorted(w.address for w in wallets)
+    # Hanya hash key yang disimpan, bukan private key
+    assert not any(k[2:] in json.dumps(data) for k in KEYS)
+    assert [p.name for p in tmp_path.iterdir()] == ["address_cache.json"]
+
+def test_cached_addresses_are_not_derived_again(tmp_path, monkeypatch):
+    cache = str(tmp_path / "address_cache.json")
+    expected = [w.address for w in AccountStore(KEYS, cache_path=cache).all()]
+
+    def fail(key):
+        raise AssertionError("alamat diturunkan ulang")
+
+    monkeypatch.setattr(account_store.Account, "from_key", fail)
+    assert [w.address for w in AccountStore(KEYS, cache_path=cache).all()] == expected
+
+def test_unreadable_cache_is_ignored(tmp_path):
+    cache = tmp_path / "address_cache.json"
+    cache.write_text("{rusak")
+    store = AccountStore(KEYS, cache_path=str(cache))
+    assert store.address(0) == Account.from_key(KEYS[0]).address
+    store.save()
+    assert json.loads(cache.read_text())
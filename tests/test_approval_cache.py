@@ -0,0 +1,27 @@
+from approval_cache import UNLIMITED_ALLOWANCE, ApprovalCache
+
+ACCOUNT = "0x" + "Aa" * 20
+TOKEN = "0x" + "Bb" * 20
+ROUTER = "0x" + "Cc" * 20
+
+def test_unlimited_allowance_is_remembered_across_restarts(tmp_path):
+    path = str(tmp_path / "approvals.db")
+    cache = ApprovalCache(path)
+    assert not cache.is_approved(ACCOUNT, TOKEN, ROUTER)
+    cache.record(ACCOUNT, TOKEN, ROUTER, 2**256 - 1)
+    # Alamat dibandingkan tanpa membedakan huruf besar/kecil
+    assert cache.is_approved(ACCOUNT.lower(), TOKEN.upper().replace("0X", "0x"), ROUTER)
+    assert ApprovalCache(path).is_approved(ACCOUNT, TOKEN, ROUTER)
+
+def test_limited_allowance_or_revert_invalidates(tmp_path):
+    path = str(tmp_path / "approvals.db")
+    cache = ApprovalCache(path)
+    cache.mark_approved(ACCOUNT, TOKEN, ROUTER)
+    cache.record(ACCOUNT, TOKEN, ROUTER, UNLIMITED_ALLOWANCE - 1)
+    assert not cache.is_approved(ACCOUNT, TOKEN, ROUTER)
+    assert not ApprovalCache(path).is_approved(ACCOUNT, TOKEN, ROUTER)
+
+    cache.mark_approved(ACCOUNT, TOKEN, ROUTER)
+    cache.invalidate(ACCOUNT, TOKEN, ROUTER)
+    cache.record(ACCOUNT, TOKEN, ROUTER, None)
+    assert not ApprovalCache(path).is_approved(ACCOUNT, TOKEN, ROUTER)
@@ -0,0 +1,59 @@
+from checkpoint import STAGE_DONE, STAGE_SWAPPED, Checkpoint
+
+WALLET_A = "0x" + "aa" * 20
+WALLET_B = "0x" + "bb" * 20
+HASH_A = bytes.fromhex("01" * 32)
+HASH_B = "0x" + "02" * 32
+
+def _interrupted_cycle(path):
+    cp = Checkpoint(str(path))
+    assert cp.begin_cycle() is False
+    cp.set_stage(WALLET_A, STAGE_SWAPPED, "TK1")
+    cp.record_tx(WALLET_A, "swap", HASH_A, "TK1")
+    cp.mark_tx("0x" + HASH_A.hex(), 1)
+    cp.record_tx(WALLET_B, "swap", HASH_B, "TK2")
+    return cp.cycle_id
+
+def test_restart_resumes_unfinished_cycle(tmp_path):
+    path = tmp_path / "checkpoint.db"
+    cycle_id = _interrupted_cycle(path)
+
+    cp = Checkpoint(str(path))
+    assert cp.begin_cycle() is True
+    assert cp.cycle_id == cycle_id
+    assert cp.wallet_state(WALLET_A) == (STAGE_SWAPPED, "TK1")
+    assert cp.confirmed_token(WALLET_A, "swap") == "TK1"
+    assert cp.confirmed_token(WALLET_A, "liquidity") is None
+    assert cp.wallets_with_pending() == [WALLET_B]
+    assert cp.pending_txs(WALLET_B) == [("swap", HASH_B, "TK2")]
+    assert cp.pending_txs(WALLET_A) == []
+
+def test_finished_cycle_is_not_resumed(tmp_path):
+    path = tmp_path / "checkpoint.db"
+    _interrupted_cycle(path)
+    cp = Checkpoint(str(path))
+    cp.begin_cycle()
+    cp.set_stage(WALLET_B, STAGE_DONE)
+    cp.finish_cycle()
+    started, finished = cp.last_cycle()
+    assert finished is not None and finished >= started
+
+    cp = Checkpoint(str(path))
+    assert cp.begin_cycle() is False
+    assert cp.wallet_state(WALLET_A) == (None, None)
+    assert cp.wallets_with_pending() == []
+
+def test_stale_cycle_is_replaced(tmp_path):
+    path = tmp_path / "checkpoint.db"
+    cycle_id = _interrupted_cycle(path)
+    cp = Checkpoint(str(path))
+    assert cp.begin_cycle(max_age=0) is False
+    assert cp.cycle_id != cycle_id
+    assert cp.confirmed_token(WALLET_A, "swap") is None
+
+def test_stage_keeps_token_when_not_given(tmp_path):
+    cp = Checkpoint(str(tmp_path / "checkpoint.db"))
+    cp.begin_cycle()
+    cp.set_stage(WALLET_A, STAGE_SWAPPED, "TK1")
+    cp.set_stage(WALLET_A, STAGE_DONE)
+    assert cp.wallet_state(WALLET_A) == (STAGE_DONE, "TK1")
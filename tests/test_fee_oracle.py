@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from fee_oracle import BASE_FEE_MULTIPLIER, FeeOracle, _fees_from_history, tx_cost
+
+class _Eth:
+    def __init__(self, history=None, gas_price=7):
+        self.history = history
+        self.gas_price = gas_price
+        self.calls = 0
+
+    def fee_history(self, blocks, newest, percentiles):
+        self.calls += 1
+        if self.history is None:
+            raise ValueError("method eth_feeHistory tidak didukung")
+        return self.history
+
+class _W3:
+    def __init__(self, eth):
+        self.eth = eth
+
+class _Estimate:
+    def __init__(self, gas=None, fn_name="swapExactETHForTokens"):
+        self.gas = gas
+        self.fn_name = fn_name
+        self.calls = 0
+
+    def estimate_gas(self, params):
+        self.calls += 1
+        if self.gas is None:
+            raise ValueError("execution reverted")
+        return self.gas
+
+HISTORY = {"baseFeePerGas": [90, 100, 110], "reward": [[5], [1], [3]]}
+
+def test_fees_from_history_uses_next_base_fee_and_median_tip():
+    assert _fees_from_history(HISTORY) == {"maxPriorityFeePerGas": 3, "maxFeePerGas": int(110 * BASE_FEE_MULTIPLIER) + 3}
+    assert _fees_from_history({"baseFeePerGas": [None]}) is None
+    assert tx_cost({"gas": 10, "maxFeePerGas": 5, "value": 1}) == 51
+    assert tx_cost({"gas": 10, "gasPrice": 2}) == 20
+
+def test_fees_are_cached_and_fall_back_to_legacy_gas_price():
+    eth = _Eth(HISTORY)
+    oracle = FeeOracle(chain_id=1)
+    first = oracle.fees(_W3(eth))
+    assert oracle.fees(_W3(eth)) == first
+    assert eth.calls == 1
+
+    legacy = FeeOracle(chain_id=1, fallback_gas_price=5)
+    assert legacy.fees(_W3(_Eth(None, gas_price=7))) == {"gasPrice": 7}
+    assert FeeOracle(chain_id=1, fallback_gas_price=9).fees(_W3(_Eth(None, gas_price=7))) == {"gasPrice": 9}
+
+def test_gas_limit_is_cached_per_key_with_margin():
+    oracle = FeeOracle(chain_id=1, margin=1.5)
+    fn = _Estimate(gas=100_000)
+    assert oracle.gas_limit(fn, {}, (fn.fn_name, "TK1"), default=300_000) == 150_000
+    assert oracle.gas_limit(fn, {}, (fn.fn_name, "TK1"), default=300_000) == 150_000
+    assert fn.calls == 1
+    # Estimasi gagal (mis. approve masih pending): pakai estimasi terbesar fungsi yang sama
+    failing = _Estimate()
+    assert oracle.gas_limit(failing, {}, (failing.fn_name, "TK2"), default=300_000) == 150_000
+    other = _Estimate(fn_name="addLiquidityETH")
+    assert oracle.gas_limit(other, {}, (other.fn_name, "TK2"), default=300_000) == 300_000
+
+def test_async_fees_share_the_cache():
+    eth = _Eth(HISTORY)
+    oracle = FeeOracle(chain_id=1)
+    sync_fees = oracle.fees(_W3(eth))
+
+    class _AsyncEth:
+        async def fee_history(self, *args):
+            pytest.fail("cache tidak dipakai")
+
+    assert asyncio.run(oracle.async_fees(_W3(_AsyncEth()))) == sync_fees
@@ -0,0 +1,64 @@
+import io
+import json
+
+from rich.table import Table
+
+from journal import HeadlessConsole, JournalWriter, bind, strip_markup
+
+def _journal():
+    journal = JournalWriter(stream=io.StringIO(), max_lines=1000, flush_interval=60)
+    journal.enabled = True
+    return journal
+
+def _records(journal):
+    journal.flush()
+    return [json.loads(line) for line in journal.stream.getvalue().splitlines()]
+
+def test_strip_markup_keeps_non_style_brackets():
+    assert strip_markup("[bold cyan][*][/bold cyan] Mengirim [do_swap] [dim]0xab[/dim]") == "[*] Mengirim [do_swap] 0xab"
+    assert strip_markup("[red]Gagal[/red] [TK1] [/]") == "Gagal [TK1] "
+    assert strip_markup("[link=https://testnet.gte.xyz]GTE[/link]") == "GTE"
+
+def test_console_print_maps_level_markers():
+    journal = _journal()
+    console = HeadlessConsole(journal)
+    console.print("[bold red][!][/bold red] Swap gagal di [do_swap]")
+    console.print("[bold green][+][/bold green] Berhasil")
+    console.print("tanpa penanda")
+    records = _records(journal)
+    assert [(r["level"], r["msg"]) for r in records] == [
+        ("error", "Swap gagal di [do_swap]"),
+        ("success", "Berhasil"),
+        ("info", "tanpa penanda"),
+    ]
+
+def test_bind_adds_context_without_overriding_outer_fields():
+    journal = _journal()
+    with bind(wallet="0xA", stage="swap"):
+        with bind(wallet="0xB", token="TK1"):
+            journal.event("step")
+    journal.event("after")
+    step, after = _records(journal)
+    assert (step["wallet"], step["stage"], step["token"]) == ("0xA", "swap", "TK1")
+    assert "wallet" not in after
+
+def test_table_becomes_single_event():
+    journal = _journal()
+    table = Table(title="[bold]Ringkasan Dompet[/bold]")
+    table.add_column("Indeks")
+    table.add_column("Saldo ETH")
+    table.add_row("0", "[red]Gagal[/red]")
+    HeadlessConsole(journal).print(table)
+    (record,) = _records(journal)
+    assert record["event"] == "table"
+    assert record["title"] == "Ringkasan Dompet"
+    assert record["rows"] == [{"Indeks": "0", "Saldo ETH": "Gagal"}]
+
+def test_buffer_flushes_when_full_or_on_error():
+    journal = JournalWriter(stream=io.StringIO(), max_lines=3, flush_interval=60)
+    journal.enabled = True
+    journal.event("a")
+    journal.event("b")
+    assert journal.stream.getvalue() == ""
+    journal.event("c", level="error")
+    assert len(journal.stream.getvalue().splitlines()) == 3
@@ -0,0 +1,65 @@
+import time
+
+from multi_rpc import MultiEndpointProvider
+from rpc_pool import get_web3
+
+# Port 1 selalu menolak koneksi
+DEAD_RPC = "http://127.0.0.1:1"
+
+class _StubProvider:
+    def __init__(self, endpoint_uri, response):
+        self.endpoint_uri = endpoint_uri
+        self.response = response
+
+    def make_request(self, method, params):
+        return self.response
+
+    def make_batch_request(self, requests):
+        return [self.response for _ in requests]
+
+def _stats(provider):
+    return {st["endpoint"]: (st["calls"], st["errors"]) for st in provider.snapshot()}
+
+def test_dead_endpoint_fails_over_immediately_and_stays_last(chain):
+    fake_chain, live = chain
+    w3 = get_web3([DEAD_RPC, live.provider.endpoint_uri])
+    w3.provider.cooldown = 0.2
+
+    start = time.monotonic()
+    assert w3.eth.block_number == fake_chain.block
+    # Tanpa retry per endpoint, koneksi yang ditolak langsung pindah ke endpoint berikutnya
+    assert time.monotonic() - start < 2
+    assert _stats(w3.provider)[DEAD_RPC] == (1, 1)
+
+    # Setelah cooldown habis, endpoint yang belum pernah sukses tetap di urutan terakhir
+    time.sleep(0.3)
+    for _ in range(3):
+        w3.eth.block_number
+    assert _stats(w3.provider)[DEAD_RPC] == (1, 1)
+    assert _stats(w3.provider)[live.provider.endpoint_uri][0] == 4
+
+def test_untried_endpoint_is_measured_first():
+    fast = _StubProvider("a", {"jsonrpc": "2.0", "id": 1, "result": "0x1"})
+    fresh = _StubProvider("b", {"jsonrpc": "2.0", "id": 1, "result": "0x1"})
+    provider = MultiEndpointProvider([fast, fresh])
+    provider.make_request("eth_blockNumber", [])
+    provider.make_request("eth_blockNumber", [])
+    assert _stats(provider) == {"a": (1, 0), "b": (1, 0)}
+
+def test_provider_error_payload_counts_as_endpoint_error():
+    limited = _StubProvider("a", {"jsonrpc": "2.0", "id": 1, "error": {"code": -32005, "message": "limit exceeded"}})
+    healthy = _StubProvider("b", {"jsonrpc": "2.0", "id": 1, "result": "0x1"})
+    provider = MultiEndpointProvider([limited, healthy])
+    assert provider.make_request("eth_blockNumber", [])["result"] == "0x1"
+    assert provider.make_batch_request([("eth_blockNumber", [])])[0]["result"] == "0x1"
+    assert _stats(provider)["a"] == (1, 1)
+
+    # Semua endpoint menolak: respons error terakhir diteruskan apa adanya
+    only = MultiEndpointProvider([limited])
+    assert only.make_request("eth_blockNumber", [])["error"]["code"] == -32005
+
+def test_request_error_does_not_count_against_endpoint():
+    reverted = _StubProvider("a", {"jsonrpc": "2.0", "id": 1, "error": {"code": 3, "message": "execution reverted"}})
+    provider = MultiEndpointProvider([reverted])
+    assert provider.make_request("eth_call", [])["error"]["code"] == 3
+    assert _stats(provider)["a"] == (1, 0)
@@ -0,0 +1,24 @@
+from eth_account import Account
+
+from nonce_manager import NonceManager, is_already_known, is_nonce_error
+
+ACCOUNT = Account.from_key("0x" + "11" * 32)
+
+def test_error_classification():
+    assert is_nonce_error(ValueError("nonce too low"))
+    assert is_nonce_error("Replacement transaction underpriced")
+    assert not is_nonce_error(ValueError("insufficient funds"))
+    assert is_already_known({"message": "already known"})
+    assert not is_already_known(ValueError("nonce too low"))
+
+def test_allocate_resyncs_once_then_counts_locally(chain):
+    fake_chain, w3 = chain
+    fake_chain.nonces[ACCOUNT.address] = 5
+    nonces = NonceManager()
+    assert [nonces.allocate(w3, ACCOUNT.address) for _ in range(3)] == [5, 6, 7]
+    assert fake_chain.calls["eth_getTransactionCount"] == 1
+
+    fake_chain.nonces[ACCOUNT.address] = 9
+    nonces.reset(ACCOUNT.address)
+    assert nonces.allocate(w3, ACCOUNT.address) == 9
+    assert nonces.resync(w3, ACCOUNT.address) == 9
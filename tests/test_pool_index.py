@@ -0,0 +1,19 @@
+from fake_chain import FACTORY_ADDR, WETH_ADDR
+from pool_index import PoolIndex
+
+def test_known_pairs_are_not_looked_up_again(chain, tmp_path):
+    fake_chain, w3 = chain
+    path = tmp_path / "pool_index.json"
+    pairs = [(WETH_ADDR, t) for t in fake_chain.tokens]
+    index = PoolIndex(w3, FACTORY_ADDR, path=str(path))
+    index.refresh(pairs)
+    assert [p.name for p in tmp_path.iterdir()] == ["pool_index.json"]
+    liquid = {t for t in fake_chain.tokens if index.is_liquid(t, WETH_ADDR)}
+    # Token QT hanya punya pool dengan quote token
+    assert liquid == {t for t, sym in fake_chain.tokens.items() if not sym.startswith("QT")}
+
+    calls = fake_chain.calls["eth_call"]
+    reloaded = PoolIndex(w3, FACTORY_ADDR, path=str(path))
+    assert reloaded.pairs == index.pairs
+    assert reloaded.discover([(WETH_ADDR, t) for t in liquid]) == 0
+    assert fake_chain.calls["eth_call"] == calls
@@ -0,0 +1,30 @@
+from fake_chain import WETH_ADDR
+from quoter import Quoter, get_amount_in, get_amount_out, quote
+
+def _token(fake_chain, prefix):
+    return next(t for t, sym in fake_chain.tokens.items() if sym.startswith(prefix))
+
+def test_amount_math_matches_router_formula():
+    assert get_amount_out(10**18, 100 * 10**18, 100_000 * 10**18) == (10**18 * 997 * 100_000 * 10**18) // (100 * 10**18 * 1000 + 10**18 * 997)
+    assert get_amount_out(0, 1, 1) == 0
+    assert get_amount_out(1, 0, 1) == 0
+    assert quote(5, 10, 30) == 15
+
+def test_amount_in_is_inverse_of_amount_out():
+    reserve_in, reserve_out = 100 * 10**18, 250_000 * 10**18
+    for amount_out in (1, 10**15, 10**18, 10**21):
+        amount_in = get_amount_in(amount_out, reserve_in, reserve_out)
+        assert get_amount_out(amount_in, reserve_in, reserve_out) >= amount_out
+        assert get_amount_out(amount_in - 1, reserve_in, reserve_out) < amount_out
+    assert get_amount_in(reserve_out, reserve_in, reserve_out) is None
+
+def test_quoter_matches_on_chain_quote(chain, pools):
+    fake_chain, _ = chain
+    quoter = Quoter(pools, max_age=60)
+    token = _token(fake_chain, "TK")
+    for amount in (10**12, 10**18, 5 * 10**18):
+        assert quoter.amounts_out(amount, [WETH_ADDR, token]) == fake_chain._amounts_out(amount, [WETH_ADDR, token])
+        assert quoter.amounts_out(amount, [token, WETH_ADDR]) == fake_chain._amounts_out(amount, [token, WETH_ADDR])
+    _, reserve_weth, reserve_token = fake_chain._get_reserves(WETH_ADDR, token)
+    assert quoter.liquidity_amount(10**18, WETH_ADDR, token) == quote(10**18, reserve_weth, reserve_token)
+    assert quoter.amounts_out(10**18, [WETH_ADDR, "0x" + "12" * 20]) is None
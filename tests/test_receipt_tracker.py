@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from eth_abi import encode as abi_encode
+from eth_account import Account
+from eth_utils import function_signature_to_4byte_selector
+
+from fake_chain import CHAIN_ID, ROUTER_ADDR
+from receipt_tracker import ReceiptTracker
+from tx_pipeline import broadcast_batch, sign_raw
+
+ACCOUNT = Account.from_key("0x" + "22" * 32)
+UNKNOWN_TX = "0x" + "ab" * 32
+
+def _send_approvals(fake_chain, w3, count):
+    token = next(iter(fake_chain.tokens))
+    data = function_signature_to_4byte_selector("approve(address,uint256)") + abi_encode(["address", "uint256"], [ROUTER_ADDR, 2**256 - 1])
+    signed = []
+    for nonce in range(count):
+        tx = {"from": ACCOUNT.address, "to": token, "data": "0x" + data.hex(), "value": 0, "gas": 200_000, "gasPrice": 2 * 10**6, "chainId": CHAIN_ID, "nonce": nonce}
+        raw, tx_hash = sign_raw(tx, ACCOUNT.key)
+        signed.append((ACCOUNT.address, raw, tx_hash))
+    return [tx_hash for tx_hash, _ in broadcast_batch(w3, signed)]
+
+def test_receipts_are_fetched_once_per_tx(chain):
+    fake_chain, w3 = chain
+    hashes = _send_approvals(fake_chain, w3, 3)
+    tracker = ReceiptTracker(w3, poll_interval=0.05)
+    futures = [tracker.track(h) for h in hashes]
+    receipts = [fut.result(timeout=5) for fut in futures]
+    assert [r.transactionHash for r in receipts] == hashes
+    assert all(r.status == 1 for r in receipts)
+    # Receipt diformat dari batch pertama, tanpa request ulang lewat web3
+    assert fake_chain.calls["eth_getTransactionReceipt"] == 3
+
+def test_wait_timeout_stops_polling_hash(chain):
+    _, w3 = chain
+    tracker = ReceiptTracker(w3, poll_interval=0.05)
+    with pytest.raises(TimeoutError):
+        tracker.wait(UNKNOWN_TX, timeout=0.2)
+    assert tracker._pending == {}
+
+def test_unwaited_hash_expires_after_ttl(chain):
+    _, w3 = chain
+    tracker = ReceiptTracker(w3, poll_interval=0.05, ttl=0.2)
+    fut = tracker.track(UNKNOWN_TX)
+    with pytest.raises(TimeoutError):
+        fut.result(timeout=5)
+    assert tracker._pending == {}
+
+def test_wait_async_uses_shared_polling(chain):
+    fake_chain, w3 = chain
+    hashes = _send_approvals(fake_chain, w3, 2)
+    tracker = ReceiptTracker(w3, poll_interval=0.05)
+
+    async def wait_all():
+        return await asyncio.gather(*(tracker.wait_async(h, timeout=5) for h in hashes))
+
+    receipts = asyncio.run(wait_all())
+    assert [r.transactionHash for r in receipts] == hashes
+    assert fake_chain.calls["eth_getTransactionReceipt"] == 2
+
+def test_cancelled_async_waiter_leaves_other_waiters_running(chain):
+    _, w3 = chain
+    tracker = ReceiptTracker(w3, poll_interval=0.05)
+    fut = tracker.track(UNKNOWN_TX)
+
+    async def cancel_waiter():
+        task = asyncio.ensure_future(tracker.wait_async(UNKNOWN_TX, timeout=5))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_waiter())
+    assert not fut.cancelled()
+    assert tracker._pending == {}
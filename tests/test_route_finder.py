@@ -0,0 +1,29 @@
+from fake_chain import WETH_ADDR
+from quoter import Quoter
+from route_finder import RouteFinder
+
+def _token(fake_chain, prefix):
+    return next(t for t, sym in fake_chain.tokens.items() if sym.startswith(prefix))
+
+def test_route_finder_uses_multi_hop_when_no_direct_pool(chain, pools):
+    fake_chain, _ = chain
+    routes = RouteFinder(Quoter(pools, max_age=60))
+    token = _token(fake_chain, "QT")
+    path, amount_out = routes.best_route(WETH_ADDR, token, 10**18)
+    assert path == [WETH_ADDR, fake_chain.quote_token, token]
+    assert amount_out == fake_chain._amounts_out(10**18, path)[-1]
+    # Rute yang di-cache dipakai ulang dan di-quote ulang dengan jumlah baru
+    path2, amount_out2 = routes.best_route(WETH_ADDR, token, 10**18 + 1)
+    assert path2 == path
+    assert amount_out2 == fake_chain._amounts_out(10**18 + 1, path)[-1]
+
+def test_route_finder_prefers_direct_pool_and_rejects_invalid(chain, pools):
+    fake_chain, _ = chain
+    routes = RouteFinder(Quoter(pools, max_age=60))
+    token = _token(fake_chain, "TK")
+    path, amount_out = routes.best_route(WETH_ADDR, token, 10**17)
+    assert path == [WETH_ADDR, token]
+    assert amount_out == fake_chain._amounts_out(10**17, path)[-1]
+    assert routes.best_route(WETH_ADDR, WETH_ADDR, 10**17) is None
+    assert routes.best_route(WETH_ADDR, token, 0) is None
+    assert routes.best_route(WETH_ADDR, "0x" + "12" * 20, 10**17) is None
@@ -0,0 +1,72 @@
+import threading
+import time
+
+from scheduler import JobCancelled, Scheduler
+
+def _run_once(path, fn, interval=100, first_run=0, after_finish=False, on_error=None):
+    """Jalankan satu job yang sudah jatuh tempo lalu hentikan penjadwal."""
+    scheduler = Scheduler(str(path), workers=0, on_error=on_error)
+
+    def job():
+        scheduler.stop()
+        fn()
+
+    scheduler.add("job", job, interval, first_run=first_run, after_finish=after_finish)
+    scheduler.run()
+    return scheduler
+
+def test_next_run_is_persisted_after_job(tmp_path):
+    path = tmp_path / "schedule.db"
+    calls = []
+    before = time.time()
+    scheduler = _run_once(path, lambda: calls.append(1))
+    assert calls == [1]
+    assert before + 100 <= scheduler.next_run("job") <= time.time() + 100
+
+    # Setelah restart jadwal tersimpan menang atas first_run
+    restarted = Scheduler(str(path), workers=0)
+    assert restarted.add("job", lambda: None, 100, first_run=0) == scheduler.next_run("job")
+
+def test_after_finish_counts_interval_from_end(tmp_path):
+    path = tmp_path / "schedule.db"
+    scheduler = _run_once(path, lambda: time.sleep(0.2), interval=1, after_finish=True)
+    finished = scheduler._execute("SELECT last_finish FROM jobs WHERE name = 'job'")[0][0]
+    assert scheduler.next_run("job") == finished + 1
+
+def test_failed_job_is_rescheduled(tmp_path):
+    errors = []
+
+    def fail():
+        raise RuntimeError("gagal")
+
+    scheduler = _run_once(tmp_path / "schedule.db", fail, on_error=lambda name, exc: errors.append((name, str(exc))))
+    assert errors == [("job", "gagal")]
+    assert scheduler.next_run("job") > time.time()
+
+def test_cancelled_job_keeps_its_schedule(tmp_path):
+    path = tmp_path / "schedule.db"
+
+    def cancel():
+        raise JobCancelled("dihentikan")
+
+    scheduler = _run_once(path, cancel, first_run=123.0)
+    assert scheduler.next_run("job") == 123.0
+    assert scheduler._execute("SELECT last_finish FROM jobs WHERE name = 'job'")[0][0] is None
+
+    # Job yang dibatalkan langsung jalan lagi setelah restart
+    calls = []
+    _run_once(path, lambda: calls.append(1), first_run=time.time() + 3600)
+    assert calls == [1]
+
+def test_job_not_due_waits_after_restart(tmp_path):
+    path = tmp_path / "schedule.db"
+    _run_once(path, lambda: None, interval=3600)
+    calls, idle = [], []
+    scheduler = Scheduler(str(path), workers=0, on_idle=lambda name, next_run: idle.append((name, next_run)))
+    scheduler.add("job", lambda: calls.append(1), 3600)
+    timer = threading.Timer(0.2, scheduler.stop)
+    timer.start()
+    scheduler.run()
+    timer.join()
+    assert calls == []
+    assert idle == [("job", scheduler.next_run("job"))]
@@ -0,0 +1,72 @@
+import json
+from decimal import Decimal
+
+import pytest
+from web3 import Web3
+
+import token_registry
+from token_registry import TokenRegistry, format_units, parse_units
+
+BASE = "0x" + "aa" * 20
+QUOTE = "0x" + "bb" * 20
+
+class _Response:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+def _market(base_sym, base_addr, quote_sym=None, quote_addr=None):
+    market = {"baseToken": {"symbol": base_sym, "address": base_addr, "decimals": 18}}
+    if quote_sym:
+        market["quoteToken"] = {"symbol": quote_sym, "address": quote_addr, "decimals": 6}
+    return market
+
+def test_units_round_trip():
+    assert parse_units("1.5", 6) == 1_500_000
+    assert format_units(1_500_000, 6) == Decimal("1.5")
+    with pytest.raises(ValueError):
+        parse_units("satu", 18)
+
+def test_refresh_merges_markets_and_persists(tmp_path, monkeypatch):
+    path = tmp_path / "token_registry.json"
+    markets = [_market("aaa", BASE, "USDQ", QUOTE), _market("BAD", "0x123")]
+    monkeypatch.setattr(token_registry.requests, "get", lambda *a, **kw: _Response(markets))
+    registry = TokenRegistry(path=str(path))
+    assert registry.is_stale()
+    assert registry.refresh() == 2
+    assert registry.token_map() == {
+        "AAA": {"address": Web3.to_checksum_address(BASE), "decimals": 18},
+        "USDQ": {"address": Web3.to_checksum_address(QUOTE), "decimals": 6},
+    }
+    assert registry.quote_tokens() == [Web3.to_checksum_address(QUOTE)]
+    assert not registry.is_stale()
+    assert [p.name for p in tmp_path.iterdir()] == ["token_registry.json"]
+
+    # Simbol yang sama dengan alamat lain tidak menimpa entri yang sudah ada
+    markets[:] = [_market("AAA", "0x" + "cc" * 20)]
+    assert registry.refresh() == 0
+    reloaded = TokenRegistry(path=str(path))
+    assert reloaded.token_map() == registry.token_map()
+
+def test_corrupt_registry_starts_empty(tmp_path):
+    path = tmp_path / "token_registry.json"
+    path.write_text("{rusak")
+    registry = TokenRegistry(path=str(path))
+    assert registry.tokens == {} and registry.is_stale()
+
+def test_verify_onchain_reads_decimals_once(chain, tmp_path):
+    fake_chain, w3 = chain
+    path = tmp_path / "token_registry.json"
+    tokens = {sym: {"address": addr, "decimals": 6, "verified": False} for addr, sym in fake_chain.tokens.items()}
+    path.write_text(json.dumps({"updated_at": 0, "tokens": tokens}))
+    registry = TokenRegistry(path=str(path))
+    assert registry.verify_onchain(w3) == len(tokens)
+    assert all(t["decimals"] == 18 for t in registry.token_map().values())
+    calls = sum(fake_chain.calls.values())
+    assert registry.verify_onchain(w3) == 0
+    assert sum(fake_chain.calls.values()) == calls
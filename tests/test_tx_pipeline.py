@@ -0,0 +1,78 @@
+import threading
+
+import pytest
+from eth_abi import encode as abi_encode
+from eth_account import Account
+from eth_utils import function_signature_to_4byte_selector
+
+from fake_chain import CHAIN_ID, ROUTER_ADDR
+from nonce_manager import NonceManager
+import tx_pipeline
+from tx_pipeline import NOT_SENT, BroadcastError, TxPipeline, broadcast_batch, sign_raw
+
+ACCOUNT = Account.from_key("0x" + "11" * 32)
+
+def _approve_tx(fake_chain):
+    token = next(iter(fake_chain.tokens))
+    data = function_signature_to_4byte_selector("approve(address,uint256)") + abi_encode(["address", "uint256"], [ROUTER_ADDR, 2**256 - 1])
+    return {"from": ACCOUNT.address, "to": token, "data": "0x" + data.hex(), "value": 0, "gas": 200_000, "gasPrice": 2 * 10**6, "chainId": CHAIN_ID}
+
+def test_pipeline_send_resyncs_and_retries_after_nonce_error(chain):
+    fake_chain, w3 = chain
+    nonces = NonceManager()
+    pipeline = TxPipeline(nonces, workers=2)
+    # Nonce lokal mendahului node (mis. tx sebelumnya hilang dari mempool)
+    nonces.allocate(w3, ACCOUNT.address)
+    nonces.allocate(w3, ACCOUNT.address)
+
+    tx_hash = pipeline.send(w3, _approve_tx(fake_chain), ACCOUNT.key)
+    assert fake_chain.nonces[ACCOUNT.address] == 1
+    assert fake_chain.receipts["0x" + bytes(tx_hash).hex()]["status"] == "0x1"
+    assert fake_chain.calls["eth_getTransactionCount"] == 2
+    assert nonces.allocate(w3, ACCOUNT.address) == 1
+
+def test_pipeline_send_raises_non_nonce_errors(chain):
+    fake_chain, w3 = chain
+    fake_chain.eth[ACCOUNT.address] = 0
+    pipeline = TxPipeline(NonceManager(), workers=2)
+    with pytest.raises(BroadcastError, match="insufficient funds"):
+        pipeline.send(w3, _approve_tx(fake_chain), ACCOUNT.key)
+    assert fake_chain.nonces[ACCOUNT.address] == 0
+
+def test_rebroadcast_of_known_tx_returns_its_hash(chain):
+    fake_chain, w3 = chain
+    tx = dict(_approve_tx(fake_chain), nonce=0)
+    raw, tx_hash = sign_raw(tx, ACCOUNT.key)
+    assert broadcast_batch(w3, [(ACCOUNT.address, raw, tx_hash)]) == [(tx_hash, None)]
+    assert broadcast_batch(w3, [(ACCOUNT.address, raw, tx_hash)]) == [(tx_hash, None)]
+    assert fake_chain.nonces[ACCOUNT.address] == 1
+
+def test_batch_reports_later_txs_of_rejected_sender_as_failed(chain):
+    fake_chain, w3 = chain
+    # Nonce 1 ditolak node, tx nonce 0 sesudahnya tidak boleh dilaporkan terkirim
+    signed = []
+    for nonce in (1, 0):
+        raw, tx_hash = sign_raw(dict(_approve_tx(fake_chain), nonce=nonce), ACCOUNT.key)
+        signed.append((ACCOUNT.address, raw, tx_hash))
+    results = broadcast_batch(w3, signed)
+    assert results[0][0] is None and "nonce" in str(results[0][1])
+    assert results[1] == (None, NOT_SENT)
+
+def test_pipeline_send_times_out_and_resyncs(chain, monkeypatch):
+    fake_chain, w3 = chain
+    release = threading.Event()
+
+    def stuck_broadcast(w3_instance, signed):
+        release.wait(5)
+        return [(None, "dibatalkan")] * len(signed)
+
+    monkeypatch.setattr(tx_pipeline, "broadcast_batch", stuck_broadcast)
+    nonces = NonceManager()
+    pipeline = TxPipeline(nonces, workers=2, send_timeout=0.2)
+    try:
+        with pytest.raises(TimeoutError):
+            pipeline.send(w3, _approve_tx(fake_chain), ACCOUNT.key)
+        assert nonces.allocate(w3, ACCOUNT.address) == 0
+        assert fake_chain.calls["eth_getTransactionCount"] == 2
+    finally:
+        release.set()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Registry token yang disimpan di disk.
+Startup langsung memakai cache lokal (simbol, alamat checksum, decimals,
+terakhir terlihat, status likuiditas); API market GTE hanya dipanggil di
+background saat cache sudah melewati TTL.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from decimal import Decimal, InvalidOperation
+
+import requests
+from web3 import Web3
+
+from abis import ERC20_ABI
+from batch_reads import batch_call
+from rpc_pool import get_contract
+
+REGISTRY_FILE = os.getenv("TOKEN_REGISTRY_FILE", "token_registry.json")
+REGISTRY_TTL = int(os.getenv("TOKEN_REGISTRY_TTL", str(6 * 3600)))
+
+API_URL = "https://api-testnet.gte.xyz/v1/markets?sortBy=volume&limit=100"
+API_HEADERS = {
+    'accept': 'application/json, text/plain, */*',
+    'origin': 'https://testnet.gte.xyz',
+    'referer': 'https://testnet.gte.xyz/',
+    'user-agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36'
+}
+
+def format_units(raw, decimals):
+    """Ubah jumlah mentah (wei/unit terkecil) menjadi Decimal sesuai decimals token."""
+    return Decimal(raw) / (Decimal(10) ** decimals)
+
+def parse_units(amount, decimals):
+    """Ubah jumlah yang dibaca manusia (str/float/Decimal) menjadi unit terkecil token."""
+    try:
+        return int(Decimal(str(amount)) * (Decimal(10) ** decimals))
+    except InvalidOperation:
+        raise ValueError(f"Jumlah tidak valid: {amount}")
+
+class TokenRegistry:
+    """Cache token persisten dengan TTL dan refresh inkremental dari API market."""
+
+    def __init__(self, path=REGISTRY_FILE, ttl=REGISTRY_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.tokens = {}
+        self.updated_at = 0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.tokens = data.get("tokens", {})
+            self.updated_at = data.get("updated_at", 0)
+        except (FileNotFoundError, ValueError):
+            self.tokens, self.updated_at = {}, 0
+
+    def save(self):
+        with self._lock:
+            data = {"updated_at": self.updated_at, "tokens": self.tokens}
+            # Nama temp unik: gte.py dan auto_swap_liquidity.py bisa menulis registry yang sama
+            with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp", delete=False) as f:
+                json.dump(data, f, indent=2)
+            os.replace(f.name, self.path)
+
+    def is_stale(self):
+        return time.time() - self.updated_at > self.ttl
+
+    def token_map(self):
+        """Salinan registry dalam format TOKENS: simbol -> {address, decimals}."""
+        with self._lock:
+            return {sym: {"address": t["address"], "decimals": t.get("decimals", 18)} for sym, t in self.tokens.items()}
+
+    def quote_tokens(self):
+        """Alamat token yang dipakai sebagai quote token market (hub untuk rute multi-hop)."""
+        with self._lock:
+            return [t["address"] for t in self.tokens.values() if t.get("quote_token")]
+
+    def refresh(self, proxy=None):
+        """Ambil market dari API lalu gabungkan ke registry. Mengembalikan jumlah token baru."""
+        resp = requests.get(API_URL, headers=API_HEADERS, timeout=10, proxies=proxy)
+        resp.raise_for_status()
+        markets = resp.json()
+        if not isinstance(markets, list):
+            raise ValueError("Format data market tidak terduga dari API.")
+
+        now = int(time.time())
+        added = 0
+        with self._lock:
+            for market in markets:
+                for token_type in ['baseToken', 'quoteToken']:
+                    token_data = market.get(token_type)
+                    if not token_data:
+                        continue
+                    sym = token_data.get("symbol", "").upper().strip()
+                    if not sym: continue
+                    addr_raw = token_data.get("address", "")
+                    if not (isinstance(addr_raw, str) and addr_raw.startswith('0x') and len(addr_raw) == 42):
+                        continue
+                    addr = Web3.to_checksum_address(addr_raw)
+                    entry = self.tokens.get(sym)
+                    if entry is None:
+                        self.tokens[sym] = {"address": addr, "decimals": token_data.get("decimals", 18), "last_seen": now, "liquid": None, "verified": False}
+                        added += 1
+                    elif entry["address"] == addr:
+                        entry["last_seen"] = now
+                    else:
+                        continue
+                    if token_type == 'quoteToken':
+                        self.tokens[sym]["quote_token"] = True
+            self.updated_at = now
+        self.save()
+        return added
+
+    def verify_onchain(self, w3_instance):
+        """
+        Baca `decimals()` dan `symbol()` on-chain untuk token yang belum diverifikasi
+        dalam satu pass batch, lalu simpan ke registry. Mengembalikan jumlah token yang diverifikasi.
+        """
+        with self._lock:
+            pending = [sym for sym, t in self.tokens.items() if not t.get("verified")]
+        if not pending:
+            return 0
+        calls = []
+        for sym in pending:
+            c = get_contract(w3_instance, self.tokens[sym]["address"], ERC20_ABI)
+            calls.append((c, "decimals", []))
+            calls.append((c, "symbol", []))
+        results = batch_call(w3_instance, calls)
+        verified = 0
+        with self._lock:
+            for i, sym in enumerate(pending):
+                decimals, onchain_symbol = results[2 * i], results[2 * i + 1]
+                if decimals is None:
+                    # Token non-standar, tetap pakai decimals dari API
+                    continue
+                entry = self.tokens[sym]
+                entry["decimals"] = int(decimals)
+                entry["onchain_symbol"] = onchain_symbol
+                entry["verified"] = True
+                verified += 1
+        if verified:
+            self.save()
+        return verified
+
+    def set_liquidity(self, flags):
+        """Simpan status likuiditas per simbol dari indeks pool."""
+        with self._lock:
+            for sym, liquid in flags.items():
+                if sym in self.tokens:
+                    self.tokens[sym]["liquid"] = liquid
+        self.save()
+
+    def refresh_in_background(self, proxy=None):
+        """Refresh registry di thread terpisah tanpa memblokir startup."""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def worker():
+            try:
+                self.refresh(proxy)
+            except Exception:
+                pass
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=worker, name="token-registry-refresh", daemon=True).start()
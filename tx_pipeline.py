@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Pipeline transaksi: tanda tangan -> broadcast -> konfirmasi.
+Tanda tangan ECDSA dikerjakan di pool worker (process pool untuk set dompet besar),
+hasilnya dikirim oleh satu thread broadcast sebagai batch `eth_sendRawTransaction`
+(tx berurutan satu dompet dalam satu request), lalu hash-nya langsung didaftarkan ke
+pelacak receipt. Jumlah tx yang sedang di dalam pipeline dibatasi, sehingga
+pemanggil tertahan (backpressure) jika broadcast tertinggal.
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from eth_account import Account
+from hexbytes import HexBytes
+from web3 import Web3
+
+from nonce_manager import is_already_known, is_nonce_error
+
+SIGN_WORKERS = int(os.getenv("SIGN_WORKERS", str(os.cpu_count() or 2)))
+# Mulai jumlah dompet ini, tanda tangan dikerjakan di process pool (tidak terhalang GIL)
+SIGN_PROCESS_MIN_WALLETS = int(os.getenv("SIGN_PROCESS_MIN_WALLETS", "50"))
+BROADCAST_BATCH_SIZE = int(os.getenv("BROADCAST_BATCH_SIZE", "50"))
+# Lama broadcast menunggu tx lain untuk digabung ke batch yang sama (detik)
+BROADCAST_BATCH_WAIT = float(os.getenv("BROADCAST_BATCH_WAIT", "0.02"))
+# Batas tx yang sedang ditandatangani atau menunggu broadcast
+PIPELINE_MAX_INFLIGHT = int(os.getenv("PIPELINE_MAX_INFLIGHT", "256"))
+# Batas tunggu satu tx di pipeline (tanda tangan + broadcast) sebelum dianggap gagal (detik)
+PIPELINE_SEND_TIMEOUT = float(os.getenv("PIPELINE_SEND_TIMEOUT", "120"))
+
+# Error untuk tx yang menyusul tx ditolak dari dompet yang sama
+NOT_SENT = "tidak dikirim: tx sebelumnya dari dompet ini ditolak"
+
+def sign_raw(tx, pk):
+    """Tanda tangani tx. Mengembalikan (raw tx, hash) dalam bytes agar bisa dikirim antar proses."""
+    sig = Account.sign_transaction(tx, pk)
+    return bytes(sig.raw_transaction), bytes(sig.hash)
+
+def broadcast_batch(w3_instance, signed):
+    """
+    Kirim list (sender, raw tx, hash) dalam satu batch eth_sendRawTransaction.
+    Mengembalikan list (tx_hash, error) sesuai urutan. Setelah tx pertama sebuah dompet ditolak,
+    tx berikutnya dari dompet itu dilaporkan gagal walaupun node menerimanya, karena nonce-nya
+    sudah berlubang dan akan dialokasikan ulang setelah sinkron.
+    """
+    requests = [("eth_sendRawTransaction", [Web3.to_hex(raw)]) for _, raw, _ in signed]
+    try:
+        responses = w3_instance.provider.make_batch_request(requests)
+    except Exception:
+        responses = None
+    if not isinstance(responses, list):
+        return _broadcast_sequential(w3_instance, signed)
+    results, failed = [], set()
+    for (sender, _, tx_hash), resp in zip(signed, responses):
+        err = resp.get("error")
+        if sender in failed:
+            results.append((None, NOT_SENT))
+        elif err and not is_already_known(err.get("message", "")):
+            failed.add(sender)
+            results.append((None, err.get("message", err)))
+        else:
+            results.append((HexBytes(tx_hash), None))
+    return results
+
+def _broadcast_sequential(w3_instance, signed):
+    # Endpoint tidak mendukung batch: kirim satu per satu, tx dompet yang sudah ditolak tidak diteruskan
+    results, failed = [], set()
+    for sender, raw, tx_hash in signed:
+        if sender in failed:
+            results.append((None, NOT_SENT))
+            continue
+        try:
+            w3_instance.eth.send_raw_transaction(raw)
+            results.append((HexBytes(tx_hash), None))
+        except Exception as e:
+            if is_already_known(e):
+                results.append((HexBytes(tx_hash), None))
+                continue
+            failed.add(sender)
+            results.append((None, e))
+    return results
+
+class BroadcastError(Exception):
+    """Node menolak transaksi saat broadcast."""
+
+class _Job:
+    __slots__ = ("w3", "sender", "signing", "future")
+
+    def __init__(self, w3_instance, sender, signing):
+        self.w3 = w3_instance
+        self.sender = sender
+        self.signing = signing
+        self.future = Future()
+
+class TxPipeline:
+    """Tanda tangan paralel, broadcast ber-batch dan pendaftaran receipt untuk semua dompet."""
+
+    def __init__(self, nonces, on_broadcast=None, workers=SIGN_WORKERS, max_inflight=PIPELINE_MAX_INFLIGHT,
+                 batch_size=BROADCAST_BATCH_SIZE, batch_wait=BROADCAST_BATCH_WAIT, send_timeout=PIPELINE_SEND_TIMEOUT):
+        self.nonces = nonces
+        # Tahap konfirmasi: mis. ReceiptTracker.track, dipanggil untuk tiap tx yang diterima node
+        self.on_broadcast = on_broadcast
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.send_timeout = send_timeout
+        self._processes = False
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(max_inflight)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def use_processes(self, enabled):
+        """Pilih process pool (True) atau thread pool untuk tahap tanda tangan."""
+        with self._lock:
+            if enabled == self._processes:
+                return
+            old, self._executor, self._processes = self._executor, None, enabled
+        if old is not None:
+            old.shutdown(wait=True)
+
+    def _signer(self):
+        with self._lock:
+            if self._executor is None:
+                if self._processes:
+                    # Pool dibuat saat thread lain (broadcast, receipt, RPC) sudah jalan: fork bisa mewarisi
+                    # lock yang sedang dipegang thread tersebut, jadi worker dijalankan lewat spawn
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._broadcast_loop, name="tx-broadcast", daemon=True)
+                self._thread.start()
+            return self._executor
+
+    def submit(self, w3_instance, tx, pk):
+        """
+        Masukkan tx (nonce sudah terisi) ke pipeline. Mengembalikan Future berisi tx hash
+        setelah diterima node. Memblokir jika pipeline sedang penuh.
+        """
+        self._slots.acquire()
+        try:
+            job = _Job(w3_instance, tx['from'], self._signer().submit(sign_raw, tx, pk))
+        except Exception:
+            self._slots.release()
+            raise
+        # Antrian broadcast mengikuti urutan submit, bukan urutan selesai tanda tangan, agar nonce tetap berurutan
+        self._queue.put(job)
+        return job.future
+
+    def send(self, w3_instance, tx, pk):
+        """
+        Isi nonce dari NonceManager, tanda tangani dan broadcast lewat pipeline.
+        Jika node menolak karena nonce, sinkron ulang lalu coba sekali lagi. Mengembalikan tx hash.
+        Jika pipeline tidak selesai dalam `send_timeout` detik, nonce disinkron ulang dan TimeoutError dilempar.
+        """
+        account = tx['from']
+        for attempt in range(2):
+            tx['nonce'] = self.nonces.allocate(w3_instance, account)
+            try:
+                return self.submit(w3_instance, dict(tx), pk).result(timeout=self.send_timeout)
+            except Exception as e:
+                # Nonce lokal tidak lagi bisa dipercaya, paksa sinkron ulang
+                self.nonces.reset(account)
+                if is_nonce_error(e) and attempt == 0:
+                    continue
+                raise
+
+    def _next_batch(self):
+        jobs = [self._queue.get()]
+        while len(jobs) < self.batch_size:
+            try:
+                jobs.append(self._queue.get(timeout=self.batch_wait))
+            except queue.Empty:
+                break
+        return jobs
+
+    def _broadcast_loop(self):
+        while True:
+            jobs = self._next_batch()
+            # Satu batch per (w3, dompet): endpoint yang dipin untuk dompet menerima semua tx-nya
+            signed = {}  # (w3, sender) -> list (job, (sender, raw, hash))
+            for job in jobs:
+                try:
+                    raw, tx_hash = job.signing.result()
+                except Exception as e:
+                    job.future.set_exception(e)
+                    self._slots.release()
+                    continue
+                signed.setdefault((id(job.w3), job.sender), []).append((job, (job.sender, raw, tx_hash)))
+            for group in signed.values():
+                w3_instance = group[0][0].w3
+                try:
+                    results = broadcast_batch(w3_instance, [item for _, item in group])
+                except Exception as e:
+                    results = [(None, e)] * len(group)
+                for (job, _), (tx_hash, err) in zip(group, results):
+                    if tx_hash is not None and self.on_broadcast is not None:
+                        try:
+                            self.on_broadcast(tx_hash)
+                        except Exception:
+                            pass
+                    if tx_hash is None:
+                        job.future.set_exception(err if isinstance(err, Exception) else BroadcastError(err))
+                    else:
+                        job.future.set_result(tx_hash)
+                    self._slots.release()